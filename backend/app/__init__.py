@@ -4,7 +4,10 @@ SafeWalk AI Backend - Flask Application Factory
 from flask import Flask
 from flask_cors import CORS
 from flask_socketio import SocketIO
-from app.routes import safe_route, test_routes, sessions
+from app.routes import safe_route, test_routes, sessions, metrics, admin, tiles
+from app.services.weather_cache import weather_cache
+from app.services.weather_poller import weather_poller
+from config import WEATHER_API_KEY
 
 
 def create_app():
@@ -16,7 +19,7 @@ def create_app():
     CORS(app, resources={
         r"/*": {
             "origins": ["*"],  # In production, restrict to specific origins
-            "methods": ["GET", "POST", "OPTIONS"],
+            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
             "allow_headers": ["Content-Type", "Authorization"]
         }
     })
@@ -27,13 +30,44 @@ def create_app():
     # Set Socket.IO instance for sessions module
     sessions.set_socketio(socketio)
     
+    # Rebuild walks in progress from the session event log
+    sessions.recover_sessions()
+    
     # Register Socket.IO handlers for sessions
     sessions.register_socketio_handlers(socketio)
     
+    # Periodically evict finished walks so memory tracks active walkers
+    sessions.start_session_sweeper(socketio)
+    
+    # Index callbox locations for nearest-help lookups
+    sessions.start_callbox_index()
+    
+    # Keep alert zones for off-route / geofence detection current
+    sessions.start_alert_zone_refresher()
+    
+    # Requests sharing a cold weather bucket wait on green events
+    weather_cache.use_event_factory(socketio.server.eio.create_event)
+    
+    # Keep campus weather warm so route requests never wait on WeatherAPI
+    if WEATHER_API_KEY:
+        weather_poller.start()
+    
+    # Send room broadcasts through the prioritized event lanes
+    sessions.room_events.start(socketio)
+    
+    # Publish aggregated frames to security consoles
+    sessions.console.start(socketio, sessions.room_events.publish)
+    
+    # Deliver Auto-Notify messages from a background worker pool
+    sessions.notifier.start()
+    
     # Register blueprints
     app.register_blueprint(safe_route.bp)
     app.register_blueprint(test_routes.bp)
     app.register_blueprint(sessions.bp)
+    app.register_blueprint(metrics.bp)
+    app.register_blueprint(admin.bp)
+    app.register_blueprint(tiles.bp)
     
     # Root endpoint
     @app.route("/")
@@ -49,7 +83,12 @@ def create_app():
                 "session_by_share": "/api/sessions/share/<token> (GET)",
                 "update_location": "/api/sessions/<id>/location (POST)",
                 "panic": "/api/sessions/<id>/panic (POST)",
-                "arrive": "/api/sessions/<id>/arrive (POST)"
+                "arrive": "/api/sessions/<id>/arrive (POST)",
+                "resolve_panic": "/api/sessions/<id>/resolve (POST)",
+                "metrics": "/metrics (GET)",
+                "admin_nearby": "/api/admin/nearby (GET)",
+                "admin_responders": "/api/admin/responders/<id> (PUT, DELETE)",
+                "safety_tiles": "/tiles/safety/<z>/<x>/<y> (GET)"
             },
             "status": "running"
         }
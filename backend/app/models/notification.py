@@ -0,0 +1,41 @@
+"""
+Notification models for Auto-Notify and alert delivery.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Events delivered every time, even when they look like a repeat
+NEVER_DEDUPLICATED = frozenset({"panic"})
+
+# Events that may use the dispatcher's reserved queue capacity
+URGENT_EVENTS = frozenset({"panic"})
+
+
+@dataclass
+class Notification:
+    """A message to deliver to a walker's contact."""
+    session_id: str
+    event: str  # "arrival", "panic", "inactivity", "abandoned"
+    channel: str  # "sms", "email", "webhook"
+    recipient: str  # Phone number, email address or webhook URL
+    message: str
+    payload: dict = field(default_factory=dict)  # Structured data for webhook receivers
+    created_at: float = field(default_factory=time.time)
+    attempts: int = 0
+    occurrence: Optional[float] = None  # When the event happened (e.g. the status transition time)
+
+    @property
+    def urgent(self) -> bool:
+        """Whether the notification may use capacity reserved for urgent events."""
+        return self.event in URGENT_EVENTS
+
+    @property
+    def dedup_key(self) -> Optional[tuple]:
+        """
+        Key under which repeats of the same occurrence are suppressed, or None
+        for events that are never suppressed.
+        """
+        if self.event in NEVER_DEDUPLICATED:
+            return None
+        return (self.session_id, self.event, self.occurrence)
@@ -0,0 +1,227 @@
+"""
+Walk session model and lifecycle states.
+"""
+import time
+import uuid
+from enum import Enum
+from typing import Optional
+from app.utils.timestamps import isoformat
+from app.utils.route_progress import RouteProgress
+from app.utils.trail import LocationTrail
+
+
+class SessionStatus(str, Enum):
+    """Lifecycle states of a walk session."""
+    ACTIVE = "active"
+    PANIC = "panic"
+    PANIC_RESOLVED = "panic_resolved"
+    ARRIVED = "arrived"
+    ABANDONED = "abandoned"
+
+
+# States after which a session only waits to be evicted
+TERMINAL_STATUSES = frozenset({
+    SessionStatus.ARRIVED,
+    SessionStatus.PANIC_RESOLVED,
+    SessionStatus.ABANDONED,
+})
+
+
+class WalkSession:
+    """
+    A live walk session.
+
+    Uses __slots__ and epoch-second floats instead of a dict of nested dicts
+    and datetimes, so each live session costs a fixed, small amount of memory.
+    """
+
+    __slots__ = (
+        "id",
+        "share_token",
+        "user_name",
+        "start_location",
+        "end_location",
+        "status",
+        "created_at",
+        "last_update_at",
+        "last_lat",
+        "last_lng",
+        "eta",
+        "auto_notify",
+        "companion_enabled",
+        "companion_joined_at",
+        "arrived_at",
+        "status_changed_at",
+        "trail",
+        "last_seq",
+        "route_progress",
+        "eta_at",
+        "geofence",
+        "version",
+        "share_cache",
+    )
+
+    def __init__(
+        self,
+        user_name: str = "",
+        start_location: Optional[dict] = None,
+        end_location: Optional[dict] = None,
+        auto_notify: Optional[dict] = None,
+        companion_enabled: bool = False,
+        session_id: Optional[str] = None,
+        share_token: Optional[str] = None,
+        created_at: Optional[float] = None,
+        trail: Optional[LocationTrail] = None,
+        route_progress: Optional[RouteProgress] = None
+    ):
+        now = time.time()
+        self.id = session_id or str(uuid.uuid4())
+        self.share_token = share_token or uuid.uuid4().hex[:10]
+        self.user_name = user_name
+        self.start_location = start_location or {}
+        self.end_location = end_location or {}
+        self.status = SessionStatus.ACTIVE
+        self.created_at = created_at if created_at is not None else now
+        self.last_update_at = None
+        self.last_lat = None
+        self.last_lng = None
+        self.eta = None
+        self.auto_notify = auto_notify or {}
+        self.companion_enabled = companion_enabled
+        self.companion_joined_at = None
+        self.arrived_at = None
+        self.status_changed_at = self.created_at
+        self.trail = trail if trail is not None else LocationTrail()
+        self.last_seq = None  # Highest location report sequence number accepted
+        self.route_progress = route_progress  # Planned route and snapped position, if known
+        self.eta_at = None
+        self.geofence = None  # GeofenceState, created on the first evaluated fix
+        self.version = 0  # Bumped on every change visible to companions
+        self.share_cache = None  # (version, etag, body) of the last companion snapshot
+
+    @classmethod
+    def from_request(cls, data: dict, **kwargs) -> "WalkSession":
+        """Build a session from a POST /api/sessions request body."""
+        return cls(
+            user_name=data.get("userName", ""),
+            start_location=data.get("startLocation", {}),
+            end_location=data.get("endLocation", {}),
+            auto_notify=data.get("autoNotify", {}),
+            companion_enabled=data.get("liveCompanionEnabled", False),
+            **kwargs
+        )
+
+    @property
+    def last_location(self) -> Optional[dict]:
+        """Last reported location as {"lat", "lng"}, or None before the first fix."""
+        if self.last_lat is None:
+            return None
+        return {"lat": self.last_lat, "lng": self.last_lng}
+
+    @property
+    def last_activity_at(self) -> float:
+        """Time of the most recent location update or status change."""
+        return max(self.last_update_at or 0.0, self.status_changed_at)
+
+    @property
+    def is_terminal(self) -> bool:
+        """Whether the walk is over and the session is only kept until eviction."""
+        return self.status in TERMINAL_STATUSES
+
+    def touch(self):
+        """Bump the version after a change visible to companions."""
+        self.version += 1
+
+    def set_status(self, status: SessionStatus, now: Optional[float] = None):
+        """Move the session to a new lifecycle state."""
+        self.status = status
+        self.status_changed_at = now if now is not None else time.time()
+        self.touch()
+
+    def to_state(self) -> dict:
+        """
+        Serialize the session's durable state for the event log and snapshots.
+        Timestamps stay as epoch floats; derived state (pace, geofence) is not kept.
+        """
+        return {
+            "id": self.id,
+            "shareToken": self.share_token,
+            "userName": self.user_name,
+            "startLocation": self.start_location,
+            "endLocation": self.end_location,
+            "autoNotify": self.auto_notify,
+            "companionEnabled": self.companion_enabled,
+            "status": self.status.value,
+            "createdAt": self.created_at,
+            "statusChangedAt": self.status_changed_at,
+            "lastUpdateAt": self.last_update_at,
+            "lastLocation": [self.last_lat, self.last_lng] if self.last_lat is not None else None,
+            "lastSeq": self.last_seq,
+            "companionJoinedAt": self.companion_joined_at,
+            "arrivedAt": self.arrived_at,
+            "etaAt": self.eta_at,
+            "eta": self.eta,
+            "route": self.route_progress.coordinates() if self.route_progress else None,
+            "trail": self.trail.points(),
+            "trailCapacity": self.trail.capacity,
+            "trailTolerance": self.trail.tolerance_meters,
+            "version": self.version,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "WalkSession":
+        """Rebuild a session from to_state() output."""
+        trail = LocationTrail(state["trailCapacity"], state["trailTolerance"])
+        for lat, lng, timestamp in state.get("trail") or []:
+            trail.append(lat, lng, timestamp)
+        route = state.get("route")
+        session = cls(
+            user_name=state.get("userName", ""),
+            start_location=state.get("startLocation"),
+            end_location=state.get("endLocation"),
+            auto_notify=state.get("autoNotify"),
+            companion_enabled=state.get("companionEnabled", False),
+            session_id=state["id"],
+            share_token=state["shareToken"],
+            created_at=state["createdAt"],
+            trail=trail,
+            route_progress=RouteProgress(route) if route else None,
+        )
+        session.status = SessionStatus(state["status"])
+        session.status_changed_at = state["statusChangedAt"]
+        session.last_update_at = state.get("lastUpdateAt")
+        if state.get("lastLocation"):
+            session.last_lat, session.last_lng = state["lastLocation"]
+            if session.route_progress:
+                session.route_progress.snap(session.last_lat, session.last_lng)
+        session.last_seq = state.get("lastSeq")
+        session.companion_joined_at = state.get("companionJoinedAt")
+        session.arrived_at = state.get("arrivedAt")
+        session.eta_at = state.get("etaAt")
+        session.eta = state.get("eta")
+        session.version = state.get("version", 0)
+        return session
+
+    def to_dict(self) -> dict:
+        """Serialize the full session (used for archival)."""
+        return {
+            "id": self.id,
+            "shareToken": self.share_token,
+            "userName": self.user_name,
+            "startLocation": self.start_location,
+            "endLocation": self.end_location,
+            "status": self.status.value,
+            "createdAt": isoformat(self.created_at),
+            "lastUpdateAt": isoformat(self.last_update_at),
+            "lastLocation": self.last_location,
+            "eta": self.eta,
+            "etaAt": isoformat(self.eta_at),
+            "autoNotify": self.auto_notify,
+            "companion": {
+                "enabled": self.companion_enabled,
+                "joinedAt": isoformat(self.companion_joined_at),
+            },
+            "arrivedAt": isoformat(self.arrived_at),
+            "statusChangedAt": isoformat(self.status_changed_at),
+            "trail": self.trail.to_dict(),
+        }
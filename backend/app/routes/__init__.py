@@ -1,4 +1,4 @@
 """Route handlers for SafeWalk AI backend."""
-from app.routes import safe_route, test_routes, sessions
+from app.routes import safe_route, test_routes, sessions, metrics, admin, tiles
 
-__all__ = ['safe_route', 'test_routes', 'sessions']
+__all__ = ['safe_route', 'test_routes', 'sessions', 'metrics', 'admin', 'tiles']
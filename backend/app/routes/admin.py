@@ -0,0 +1,89 @@
+"""
+Admin routes for campus security: proximity queries and responder positions.
+"""
+import hmac
+from functools import wraps
+from flask import Blueprint, request, jsonify
+from app.routes.sessions import proximity
+from config import ADMIN_TOKEN
+
+bp = Blueprint('admin', __name__)
+
+MAX_NEARBY = 50  # Upper bound on results per kind
+
+
+def require_admin(view):
+    """
+    Reject requests without `Authorization: Bearer <ADMIN_TOKEN>`. The admin
+    API is disabled while no token is configured.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({"error": "Admin API disabled", "message": "ADMIN_TOKEN is not configured"}), 403
+        supplied = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(supplied.encode(), f"Bearer {ADMIN_TOKEN}".encode()):
+            return jsonify({"error": "Unauthorized"}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@bp.route('/api/admin/nearby', methods=['GET'])
+@require_admin
+def get_nearby():
+    """
+    Nearest callboxes, active walkers and on-duty responders around a point.
+    
+    Query parameters:
+        lat, lng: Query point
+        k: Results per kind (default 5)
+        radius: Only include results within this many meters (optional)
+    
+    Returns:
+        JSON with "callboxes", "walkers" and "responders", nearest first;
+        walkers carry their position, distance and userName but never their
+        session ID (which grants write access to the walk)
+    """
+    try:
+        lat = float(request.args["lat"])
+        lng = float(request.args["lng"])
+        k = min(int(request.args.get("k", 5)), MAX_NEARBY)
+        radius = request.args.get("radius")
+        radius = float(radius) if radius is not None else None
+    except (KeyError, ValueError):
+        return jsonify({"error": "lat and lng are required; k and radius must be numbers"}), 400
+    
+    return jsonify(proximity.nearby(lat, lng, k=k, radius_meters=radius, include_names=True)), 200
+
+
+@bp.route('/api/admin/responders/<responder_id>', methods=['PUT'])
+@require_admin
+def update_responder(responder_id):
+    """
+    Report an on-duty responder's position.
+    
+    Expected JSON:
+    {
+        "lat": 47.656,
+        "lng": -122.310,
+        "name": "Officer Lee"  // optional
+    }
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        lat = float(data["lat"])
+        lng = float(data["lng"])
+    except (KeyError, ValueError, TypeError):
+        return jsonify({"error": "lat and lng must be numbers"}), 400
+    
+    proximity.update_responder(responder_id, lat, lng, str(data.get("name", "")))
+    return jsonify({"ok": True}), 200
+
+
+@bp.route('/api/admin/responders/<responder_id>', methods=['DELETE'])
+@require_admin
+def remove_responder(responder_id):
+    """Take a responder off duty."""
+    if not proximity.remove_responder(responder_id):
+        return jsonify({"error": "Responder not on duty"}), 404
+    return jsonify({"ok": True}), 200
@@ -0,0 +1,18 @@
+"""
+Route handler for /metrics endpoint.
+"""
+from flask import Blueprint, jsonify
+from app.services import metrics
+
+bp = Blueprint('metrics', __name__)
+
+
+@bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Report in-process metrics from every registered subsystem.
+    
+    Returns:
+        JSON object keyed by subsystem name
+    """
+    return jsonify(metrics.collect()), 200
@@ -2,14 +2,11 @@
 Route handler for /safe-route endpoint.
 """
 from flask import Blueprint, request, jsonify
+from app.services.alert_zones import alert_zones
+from app.services.callbox_field import callbox_field
 from app.services.google_routes import get_candidate_routes
+from app.services.scoring_engine import RouteCandidate, ScoringContext, score_routes
 from app.services.weather import get_weather_visibility
-# Import from backend/services/ (relative to backend root)
-import sys
-from pathlib import Path
-backend_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(backend_root))
-from services.safety_score import score_route
 
 bp = Blueprint('safe_route', __name__)
 
@@ -91,20 +88,39 @@ def get_safe_route():
             weather = get_weather_visibility(midpoint_lat, midpoint_lng)
         except Exception as e:
             # Fallback to default weather if API fails
-            weather = {"visibility": 10000, "condition": "Clear"}
+            weather = {"visibility": 10000, "condition": "Clear", "cacheAgeSeconds": None}
         
-        # Score each route
-        scored_routes = []
+        # Score all candidate routes in one pass; the UW Alert zones along
+        # each route lower its score
+        candidates = []
         for route in routes:
             try:
-                route_score = score_route(route, weather)
-                scored_routes.append({
-                    "route": route,
-                    "score": route_score
-                })
-            except Exception as e:
-                # Skip routes that fail to score
+                candidates.append((route, RouteCandidate.from_google(route)))
+            except Exception:
+                # Skip routes that fail to parse
                 continue
+        context = ScoringContext(
+            visibility_meters=weather["visibility"],
+            weather_condition=weather["condition"],
+            alert_index=alert_zones,
+            field=callbox_field,
+        )
+        try:
+            scores = score_routes([candidate for _, candidate in candidates], context)
+            scored_routes = [
+                {"route": route, "score": score.to_dict()}
+                for (route, _), score in zip(candidates, scores)
+            ]
+        except Exception:
+            # One bad route fails the batch: score them one by one and skip
+            # the routes that fail to score
+            scored_routes = []
+            for route, candidate in candidates:
+                try:
+                    score = score_routes([candidate], context)[0]
+                except Exception:
+                    continue
+                scored_routes.append({"route": route, "score": score.to_dict()})
         
         if not scored_routes:
             return jsonify({
@@ -128,7 +144,9 @@ def get_safe_route():
                 "etaMinutes": score["etaMinutes"],
                 "polyline": score["polyline"],
                 "explanation": score["explanation"],
-                "tags": score["tags"]
+                "tags": score["tags"],
+                "alerts": score["alerts"],
+                "riskProfile": score["riskProfile"]
             })
         
         # Format response
@@ -139,14 +157,18 @@ def get_safe_route():
                 "etaMinutes": best_score["etaMinutes"],
                 "polyline": best_score["polyline"],
                 "explanation": best_score["explanation"],
-                "tags": best_score["tags"]
+                "tags": best_score["tags"],
+                "alerts": best_score["alerts"],
+                "riskProfile": best_score["riskProfile"]
             },
             "allRoutes": all_routes,
             "context": {
                 "weather": {
                     "visibility": weather["visibility"],
-                    "condition": weather["condition"]
-                }
+                    "condition": weather["condition"],
+                    "cacheAgeSeconds": weather.get("cacheAgeSeconds")
+                },
+                "alertsVersion": alert_zones.version
             }
         }
         
@@ -2,18 +2,128 @@
 Session management routes for walk sessions.
 Handles session creation, location updates, panic, and arrival.
 """
-import uuid
-from datetime import datetime, timedelta, timezone
+import hmac
+import json
+import math
+import time
+from datetime import datetime, timezone
 import threading
-from flask import Blueprint, request, jsonify
-from flask_socketio import join_room
+from contextlib import nullcontext
+import polyline
+from flask import Blueprint, Response, request, jsonify
+from flask_socketio import emit, join_room, leave_room
+from app.models.session import SessionStatus, WalkSession
+from app.models.notification import Notification
+from app.services import metrics
+from app.services.alert_join import AlertJoin
+from app.services.alert_zones import alert_zones
+from app.services.alerts_poller import alerts_poller
+from app.services.console_feed import ConsoleAggregator
+from app.services.geofence import GeofenceEngine
+from app.services.notification_service import RejectedRecipient, build_dispatcher, check_webhook_url
+from app.services.callbox_field import callbox_field
+from app.services.callbox_service import CallboxService
+from app.services.proximity import ProximityService
+from app.services.safety_tiles import safety_tiles
+from app.services.report_interval import recommend_report_interval
+from app.services.client_outbox import ClientOutboxes
+from app.services.room_events import COALESCED_EVENTS, PRIORITY_EVENTS, RoomEventDispatcher
+from app.services.session_feed import SessionFeed
+from app.services.session_log import open_session_log
+from app.services.session_store import SessionArchive, SessionStore
+from app.utils.route_progress import RouteProgress
+from app.utils.timestamps import isoformat
+from app.utils.trail import LocationTrail
+from config import (
+    SESSION_TTL_MINUTES,
+    SESSION_ABANDON_MINUTES,
+    SESSION_SWEEP_SECONDS,
+    SESSION_ARCHIVE_PATH,
+    TRAIL_CAPACITY,
+    TRAIL_TOLERANCE_METERS,
+    SESSION_LOG_DIR,
+    SESSION_LOG_FLUSH_MS,
+    SESSION_SNAPSHOT_SECONDS,
+    SMTP_HOST,
+    SMTP_PORT,
+    SMTP_SENDER,
+    NOTIFY_WORKERS,
+    NOTIFY_QUEUE_SIZE,
+    NOTIFY_RESERVED_SLOTS,
+    NOTIFY_WEBHOOK_ALLOWED_HOSTS,
+    COMPANION_FEED_BUFFER,
+    COMPANION_POLL_TIMEOUT_SECONDS,
+    COMPANION_SSE_KEEPALIVE_SECONDS,
+    ADMIN_TOKEN,
+    CONSOLE_FRAME_SECONDS,
+    CONSOLE_MAX_AREAS,
+    PROXIMITY_CELL_METERS,
+    PANIC_NEARBY_COUNT,
+    CLIENT_QUEUE_SIZE,
+    CLIENT_TRANSPORT_BACKLOG,
+    REPORT_INTERVAL_MIN_SECONDS,
+    REPORT_INTERVAL_MAX_SECONDS,
+    REPORT_DISTANCE_METERS,
+    REPORT_LOAD_BACKLOG,
+    ALERT_NEARBY_METERS,
+    ALERT_CORRIDOR_METERS,
+    ALERT_INDEX_CELL_METERS,
+    CALLBOX_REFRESH_SECONDS,
+)
 
 bp = Blueprint('sessions', __name__)
 
 # In-memory session storage (shared across requests)
-sessions = {}  # session_id -> session dict
+proximity = ProximityService(PROXIMITY_CELL_METERS)  # Live walker, responder and callbox positions
+metrics.register("proximity", proximity.metrics)
+console = ConsoleAggregator(CONSOLE_FRAME_SECONDS, CONSOLE_MAX_AREAS)  # Aggregated frames for the security console
+metrics.register("console", console.metrics)
+sessions = SessionStore(
+    archive=SessionArchive(SESSION_ARCHIVE_PATH),
+    ttl_seconds=SESSION_TTL_MINUTES * 60,
+    abandon_seconds=SESSION_ABANDON_MINUTES * 60,
+    on_abandon=lambda session, now: abandon_session(session, now),  # Defined below
+)
 inactivity_timers = {}  # session_id -> Timer
+geofence = GeofenceEngine()  # Off-route and alert zone detection
+alert_join = AlertJoin(  # Matches new alert zones to walkers and their remaining routes
+    ALERT_NEARBY_METERS, ALERT_CORRIDOR_METERS, ALERT_INDEX_CELL_METERS
+)
+metrics.register("alertJoin", alert_join.metrics)
+notifier = build_dispatcher(  # Delivers Auto-Notify messages off the request path
+    SMTP_HOST,
+    SMTP_PORT,
+    SMTP_SENDER,
+    webhook_allowed_hosts=NOTIFY_WEBHOOK_ALLOWED_HOSTS,
+    workers=NOTIFY_WORKERS,
+    queue_size=NOTIFY_QUEUE_SIZE,
+    reserved_slots=NOTIFY_RESERVED_SLOTS,
+)
+metrics.register("notifications", notifier.metrics)
+session_feed = SessionFeed(COMPANION_FEED_BUFFER)  # Replay buffers for SSE and long-poll companions
+metrics.register("companionFeed", session_feed.metrics)
+client_outboxes = ClientOutboxes(  # Bounded per-connection queues so one slow phone only backs up itself
+    PRIORITY_EVENTS,
+    COALESCED_EVENTS,
+    capacity=CLIENT_QUEUE_SIZE,
+    transport_backlog=CLIENT_TRANSPORT_BACKLOG,
+    resync_events={"console_frame": "console_resync"},
+)
+metrics.register("clientQueues", client_outboxes.metrics)
+room_events = RoomEventDispatcher(  # Prioritized outbound path for all room broadcasts
+    feed=session_feed,
+    outboxes=client_outboxes,
+)
+metrics.register("roomEvents", room_events.metrics)
+session_log = open_session_log(  # Durability only; sessions are always served from memory
+    SESSION_LOG_DIR,
+    flush_interval_seconds=SESSION_LOG_FLUSH_MS / 1000,
+    snapshot_interval_seconds=SESSION_SNAPSHOT_SECONDS,
+)
+if session_log:
+    metrics.register("sessionLog", session_log.metrics)
 INACTIVITY_MINUTES = 3
+MAX_FIXES_PER_REPORT = 50  # Upper bound on fixes accepted in one batched report
 
 # SocketIO instance (will be set by app factory)
 socketio = None
@@ -23,6 +133,7 @@ def set_socketio(instance):
     """Set the SocketIO instance for this module."""
     global socketio
     socketio = instance
+    room_events.socketio = instance
 
 
 def create_session(data):
@@ -33,33 +144,52 @@ def create_session(data):
         data: Dictionary containing session data (userName, startLocation, endLocation, etc.)
     
     Returns:
-        Dictionary representing the created session
-    """
-    session_id = str(uuid.uuid4())
-    share_token = uuid.uuid4().hex[:10]
-    
-    session = {
-        "id": session_id,
-        "shareToken": share_token,
-        "userName": data.get("userName", ""),
-        "startLocation": data.get("startLocation", {}),
-        "endLocation": data.get("endLocation", {}),
-        "status": "active",
-        "createdAt": datetime.now(timezone.utc),
-        "lastUpdateAt": None,
-        "lastLocation": None,
-        "eta": None,
-        "autoNotify": data.get("autoNotify", {}),
-        "companion": {
-            "enabled": data.get("liveCompanionEnabled", False),
-            "joinedAt": None,
-        },
-    }
-    
-    sessions[session_id] = session
+        The created WalkSession
+    """
+    trail = LocationTrail(TRAIL_CAPACITY, TRAIL_TOLERANCE_METERS)
+    route_progress = build_route_progress(data)
+    with logged_mutation():
+        session = sessions.add(WalkSession.from_request(
+            data, trail=trail, route_progress=route_progress
+        ))
+        log_mutation("create", s=session.to_state())
+    index_route(session)
     return session
 
 
+def index_route(session):
+    """Register a walk's planned route for new-alert matching."""
+    if session.route_progress and not session.is_terminal:
+        alert_join.routes.set_route(session.id, session.route_progress.coordinates())
+
+
+def build_route_progress(data):
+    """
+    Build the planned route used for progress snapping and ETA.
+    
+    Uses the encoded "routePolyline" (e.g. bestRoute.polyline from /safe-route)
+    when provided, otherwise a straight line from startLocation to endLocation.
+    
+    Args:
+        data: Session creation request body
+    
+    Returns:
+        RouteProgress, or None if no usable route geometry was given
+    """
+    try:
+        encoded = data.get("routePolyline")
+        if encoded:
+            return RouteProgress(polyline.decode(encoded))
+        start = data.get("startLocation") or {}
+        end = data.get("endLocation") or {}
+        return RouteProgress([
+            (float(start["lat"]), float(start["lng"])),
+            (float(end["lat"]), float(end["lng"])),
+        ])
+    except (KeyError, ValueError, TypeError, AttributeError, IndexError):
+        return None
+
+
 def get_session_by_id(session_id):
     """
     Get a session by its ID.
@@ -68,7 +198,7 @@ def get_session_by_id(session_id):
         session_id: The session ID to look up
     
     Returns:
-        Session dictionary if found, None otherwise
+        WalkSession if found, None otherwise
     """
     return sessions.get(session_id)
 
@@ -81,12 +211,9 @@ def get_session_by_share_token(token):
         token: The share token to look up
     
     Returns:
-        Session dictionary if found, None otherwise
+        WalkSession if found, None otherwise
     """
-    for session in sessions.values():
-        if session.get("shareToken") == token:
-            return session
-    return None
+    return sessions.get_by_share_token(token)
 
 
 def check_inactivity(session_id):
@@ -96,20 +223,24 @@ def check_inactivity(session_id):
     Args:
         session_id: The session ID to check
     """
-    if not socketio:
-        return
-        
     session = sessions.get(session_id)
     if not session:
         return
     
-    if session["status"] == "active" and session["lastUpdateAt"]:
-        time_since_update = datetime.now(timezone.utc) - session["lastUpdateAt"]
-        if time_since_update > timedelta(minutes=INACTIVITY_MINUTES):
-            socketio.emit("inactivity_alert", {
+    if session.status == SessionStatus.ACTIVE and session.last_update_at:
+        time_since_update = time.time() - session.last_update_at
+        if time_since_update > INACTIVITY_MINUTES * 60:
+            room_events.publish(session_id, "inactivity_alert", {
                 "message": "User has been inactive for a while.",
-                "lastLocation": session["lastLocation"],
-            }, room=session_id)
+                "lastLocation": session.last_location,
+            })
+            notify_contact(
+                session,
+                "inactivity",
+                f"{session.user_name} has not moved for {INACTIVITY_MINUTES} minutes during their SafeWalk AI walk.",
+                # One notice per silence: a later silence after moving again is a new occurrence
+                occurrence=session.last_update_at,
+            )
 
 
 def schedule_inactivity_check(session_id):
@@ -134,28 +265,510 @@ def schedule_inactivity_check(session_id):
     inactivity_timers[session_id] = timer
 
 
+def cancel_inactivity_check(session_id):
+    """
+    Cancel and forget the inactivity timer for a session, if any.
+    
+    Args:
+        session_id: The session ID whose timer should be cancelled
+    """
+    timer = inactivity_timers.pop(session_id, None)
+    if timer:
+        timer.cancel()
+
+
+def sweep_sessions(now=None):
+    """
+    Run one lifecycle sweep: abandon silent walks, archive and evict expired ones.
+    
+    Args:
+        now: Current epoch time (defaults to now)
+    
+    Returns:
+        List of evicted sessions
+    """
+    evicted = sessions.sweep(now)
+    for session in evicted:
+        cancel_inactivity_check(session.id)
+        session_feed.discard(session.id)
+        console.mark_evicted(session.id)
+        proximity.remove_walker(session.id)
+        alert_join.routes.remove(session.id)
+        log_mutation("evict", id=session.id)
+    return evicted
+
+
+def change_status(session, status, now=None, log=True):
+    """
+    Move a session to a new status, log the transition and report it to the
+    console. Every status change goes through here.
+    
+    Args:
+        session: The WalkSession to update
+        status: The new SessionStatus
+        now: Transition time (defaults to now)
+        log: Whether to append the transition to the session log (False
+            while replaying it)
+    """
+    previous = session.status
+    with logged_mutation():
+        session.set_status(status, now)
+        if log:
+            log_mutation("status", id=session.id, s=status.value, t=session.status_changed_at)
+    console.mark_status(session, previous)
+    if session.is_terminal:
+        proximity.remove_walker(session.id)
+        alert_join.routes.remove(session.id)
+
+
+def abandon_session(session, now=None):
+    """
+    Mark a silent walk as abandoned and tell the Auto-Notify contact.
+    Called by the session sweep.
+    
+    Args:
+        session: The active WalkSession that stopped reporting
+        now: Transition time (defaults to now)
+    """
+    change_status(session, SessionStatus.ABANDONED, now)
+    cancel_inactivity_check(session.id)
+    notify_contact(
+        session,
+        "abandoned",
+        f"{session.user_name} stopped sharing their location during their SafeWalk AI walk, "
+        "which has now ended.",
+    )
+
+
+def logged_mutation():
+    """
+    Context for applying a mutation and logging it, so a log snapshot never
+    falls between the two.
+    """
+    return session_log.mutation() if session_log else nullcontext()
+
+
+def log_mutation(op, **fields):
+    """
+    Append a session mutation to the event log (no-op when the log is disabled).
+    Called after the in-memory change is applied, inside logged_mutation().
+    
+    Args:
+        op: Mutation name ("create", "loc", "status", "join", "evict")
+        **fields: Mutation data
+    """
+    if session_log:
+        session_log.append({"op": op, **fields})
+
+
+def live_session_states():
+    """Durable state of every live session, for log snapshots."""
+    return [session.to_state() for session in sessions.values()]
+
+
+def replay_mutation(record):
+    """
+    Re-apply one logged mutation to the in-memory store without emitting events.
+    Records already reflected in the snapshot are skipped by the log.
+    
+    Args:
+        record: A record written by log_mutation
+    """
+    op = record.get("op")
+    if op == "create":
+        state = record["s"]
+        if state["id"] not in sessions:
+            sessions.add(WalkSession.from_state(state))
+        return
+    
+    session = sessions.get(record.get("id"))
+    if session is None:
+        return
+    
+    if op == "loc":
+        fixes = [tuple(fix) for fix in record["f"]]
+        apply_location_fixes(session, fixes, now=record["t"], replay=True)
+    elif op == "status":
+        status = SessionStatus(record["s"])
+        if status == SessionStatus.ARRIVED:
+            session.arrived_at = record["t"]
+        session.set_status(status, record["t"])
+    elif op == "join":
+        session.companion_joined_at = session.companion_joined_at or record["t"]
+    elif op == "evict":
+        sessions.remove(session.id)
+
+
+def recover_sessions():
+    """
+    Rebuild live sessions from the newest snapshot plus the log written since,
+    then start group commit. Call once at startup, before serving requests.
+    
+    Returns:
+        Number of sessions recovered
+    """
+    if not session_log:
+        return 0
+    
+    states, records = session_log.recover()
+    for state in states:
+        try:
+            sessions.add(WalkSession.from_state(state))
+        except (KeyError, ValueError, TypeError) as e:
+            print(f"Skipping unrecoverable session: {e}")
+    replayed = 0
+    for record in records:
+        try:
+            replay_mutation(record)
+            replayed += 1
+        except (KeyError, ValueError, TypeError) as e:
+            print(f"Skipping unreplayable session log record: {e}")
+    
+    # Resume inactivity tracking, proximity and route matching for walks still in progress
+    proximity.clear_walkers()
+    for session in sessions.values():
+        if session.status == SessionStatus.ACTIVE and session.last_update_at:
+            schedule_inactivity_check(session.id)
+        if not session.is_terminal and session.last_lat is not None:
+            proximity.update_walker(session.id, session.last_lat, session.last_lng, session.user_name)
+        index_route(session)
+    
+    # Fold the replayed records into a fresh snapshot so the next restart is fast
+    if replayed:
+        session_log.snapshot(live_session_states)
+    session_log.start(live_session_states)
+    return len(sessions)
+
+
+def start_session_sweeper(socketio_instance):
+    """
+    Start the background task that periodically sweeps expired sessions.
+    
+    Args:
+        socketio_instance: The SocketIO instance used to spawn the task
+    """
+    def sweep_loop():
+        while True:
+            socketio_instance.sleep(SESSION_SWEEP_SECONDS)
+            try:
+                sweep_sessions()
+            except Exception as e:
+                print(f"Error sweeping sessions: {e}")
+    
+    socketio_instance.start_background_task(sweep_loop)
+
+
+def start_callbox_index():
+    """
+    Load callbox locations into the proximity index and the callbox distance
+    field on a worker thread, then re-check the dataset every
+    CALLBOX_REFRESH_SECONDS so a changed callbox set reaches the field (and,
+    through its version, the score cache and heatmap tiles) without a restart.
+    The fetch and the field rebuild both block, so they share that thread
+    rather than running on the Socket.IO event loop.
+    """
+    def refresh_loop():
+        while True:
+            try:
+                refresh_callboxes()
+            except Exception as e:
+                print(f"Error refreshing callboxes: {e}")
+            if CALLBOX_REFRESH_SECONDS <= 0:
+                return
+            time.sleep(CALLBOX_REFRESH_SECONDS)
+    
+    threading.Thread(target=refresh_loop, name="callbox-refresh", daemon=True).start()
+
+
+def refresh_callboxes():
+    """
+    Fetch the callbox dataset and, if it changed, re-index it and rebuild the
+    distance field. Blocks; runs on the callbox refresh thread.
+    
+    Returns:
+        True if the dataset changed
+    """
+    callboxes = CallboxService().get_callboxes()
+    if not callboxes and callbox_field.version is not None:
+        # Source unavailable: keep serving the dataset already loaded
+        return False
+    if callbox_field.dataset_version(callboxes) == callbox_field.version:
+        return False
+    proximity.set_callboxes(callboxes)
+    print(f"Indexed {len(callboxes)} callboxes for proximity queries")
+    rebuild_callbox_field(callboxes)
+    return True
+
+
+def rebuild_callbox_field(callboxes):
+    """Bring the callbox distance field up to date and drop heatmap tiles it changed."""
+    previous = set(callbox_field.callboxes)
+    if callbox_field.ensure(callboxes):
+        safety_tiles.invalidate_callboxes(previous ^ set(callbox_field.callboxes))
+
+
+def refresh_alert_zones(snapshot):
+    """
+    Load a new UW Alerts snapshot into the zone index shared by the geofence
+    and route scoring, and tell walks in progress about zones that are new or
+    changed.
+    """
+    changed, dropped = alert_zones.apply_snapshot(snapshot)
+    safety_tiles.invalidate_zones(changed + dropped)
+    if changed:
+        notify_alert_nearby(changed, snapshot.version)
+
+
+def remaining_route_segment(session_id):
+    """First route segment still ahead of a walker (0 if unknown)."""
+    session = sessions.get(session_id)
+    if session is None or session.route_progress is None:
+        return 0
+    return session.route_progress.segment_index
+
+
+def notify_alert_nearby(zones, alerts_version):
+    """
+    Emit alert_nearby to the walks near new or changed alert zones, or whose
+    remaining route passes them.
+    
+    Args:
+        zones: PreparedZones that were added or changed
+        alerts_version: Version of the alerts snapshot they came from
+    
+    Returns:
+        Number of events emitted
+    """
+    matches = alert_join.join(
+        zones, proximity.walkers_within, proximity.walker_position, remaining_route_segment
+    )
+    emitted = 0
+    for session_id, hits in matches.items():
+        session = sessions.get(session_id)
+        if session is None or session.is_terminal:
+            continue
+        for zone, match in hits:
+            room_events.publish(session_id, "alert_nearby", {
+                "zone": zone.to_dict(),
+                "distanceMeters": match["distanceMeters"],
+                "onRoute": match["onRoute"],
+                "alertsVersion": alerts_version,
+                "lastLocation": session.last_location,
+            })
+            emitted += 1
+    return emitted
+
+
+def start_alert_zone_refresher():
+    """Keep alert zones current with the UW Alerts poller's snapshots."""
+    alerts_poller.subscribe(refresh_alert_zones)
+    alerts_poller.start()
+
+
+def notify_contact(session, event, text, occurrence=None):
+    """
+    Queue a notification to the session's Auto-Notify contact.
+    Delivery happens on the notification worker pool, never on the request path.
+    
+    Args:
+        session: The WalkSession containing autoNotify configuration
+        event: Event name ("arrival", "panic", "inactivity", "abandoned")
+        text: Human-readable message
+        occurrence: When the event happened; repeats of the same occurrence
+            are sent once (defaults to the session's last status change)
+    
+    Returns:
+        True if the notification was queued
+    """
+    auto = session.auto_notify or {}
+    if not auto.get("enabled") or not auto.get("contactValue"):
+        return False
+    
+    return notifier.submit(Notification(
+        session_id=session.id,
+        event=event,
+        channel=auto.get("contactChannel", "sms"),
+        recipient=auto["contactValue"],
+        message=text,
+        occurrence=session.status_changed_at if occurrence is None else occurrence,
+        payload={
+            "userName": session.user_name,
+            "status": session.status.value,
+            "lastLocation": session.last_location,
+        },
+    ))
+
+
 def send_arrival_notification(session):
     """
-    Send arrival notification via Auto-Notify (currently logs to console).
+    Send arrival notification via Auto-Notify.
     Auto-Notify Arrival: Sends a notification when user arrives at destination.
     
-    TODO: Replace console logging with actual Twilio SMS or email integration.
-    For Twilio: Use twilio.rest.Client to send SMS
-    For email: Use smtplib or a service like SendGrid
+    Args:
+        session: The WalkSession containing autoNotify configuration
+    """
+    notify_contact(
+        session,
+        "arrival",
+        f"{session.user_name} has arrived safely at their destination via SafeWalk AI.",
+    )
+
+
+def next_report_seconds(session):
+    """
+    Recommended seconds until the walker's next location report, from the
+    walk's state and the current outbound event backlog.
     
     Args:
-        session: The session dictionary containing autoNotify configuration
+        session: The WalkSession that just reported
+    
+    Returns:
+        Whole seconds, or None when reporting can stop
     """
-    auto = session.get("autoNotify") or {}
-    if not auto.get("enabled"):
-        return
+    return recommend_report_interval(
+        session,
+        load=room_events.backlog() / REPORT_LOAD_BACKLOG,
+        min_seconds=REPORT_INTERVAL_MIN_SECONDS,
+        max_seconds=REPORT_INTERVAL_MAX_SECONDS,
+        meters_per_report=REPORT_DISTANCE_METERS,
+    )
+
+
+def parse_location_fix(raw, now=None):
+    """
+    Parse one location fix from a REST body or Socket.IO report.
+    
+    Args:
+        raw: Dictionary with "lat", "lng" and optional "seq" and "timestamp" (epoch seconds)
+        now: Receipt time, used when the fix has no timestamp (defaults to now)
+    
+    Returns:
+        Tuple of (seq, lat, lng, timestamp); seq is None when not provided
     
-    text = f'{session["userName"]} has arrived safely at their destination via SafeWalk AI.'
-    contact = auto.get("contactValue")
-    channel = auto.get("contactChannel", "sms")
+    Raises:
+        KeyError, ValueError, TypeError: If the fix is malformed (including
+            non-finite numbers and coordinates out of range)
+    """
+    now = now if now is not None else time.time()
+    lat = _finite(raw["lat"])
+    lng = _finite(raw["lng"])
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+        raise ValueError("lat or lng out of range")
+    seq = raw.get("seq")
+    seq = int(_finite(seq)) if seq is not None else None
+    # Client clocks may run ahead; never record a fix in the future
+    timestamp = raw.get("timestamp")
+    timestamp = min(_finite(timestamp), now) if timestamp is not None else now
+    return seq, lat, lng, timestamp
+
+
+def _finite(value) -> float:
+    """float(value), rejecting NaN and infinities."""
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError("not a finite number")
+    return number
+
+
+def apply_location_fixes(session, fixes, now=None, replay=False):
+    """
+    Apply location fixes to a session's in-memory state without emitting anything.
+    
+    Fixes with a sequence number at or below the last accepted one are
+    duplicates or arrived out of order and are dropped.
+    
+    Args:
+        session: The WalkSession to update
+        fixes: List of (seq, lat, lng, timestamp) tuples from parse_location_fix
+        now: Receipt time (defaults to now)
+        replay: Whether the fixes come from the session log (a status change
+            they cause is then not logged again)
+    
+    Returns:
+        Tuple of (accepted fixes, dropped count, geofence events)
+    """
+    if all(fix[0] is not None for fix in fixes):
+        fixes = sorted(fixes, key=lambda fix: fix[0])
+    
+    accepted = []
+    dropped = 0
+    events = []
+    for seq, lat, lng, timestamp in fixes:
+        if seq is not None:
+            if session.last_seq is not None and seq <= session.last_seq:
+                dropped += 1
+                continue
+            session.last_seq = seq
+        session.trail.append(lat, lng, timestamp)
+        if session.route_progress:
+            session.route_progress.update(lat, lng, timestamp)
+        events.extend(geofence.evaluate(session, lat, lng))
+        accepted.append((seq, lat, lng, timestamp))
+    
+    if not accepted:
+        return accepted, dropped, events
+    
+    # Update session location
+    session.last_lat, session.last_lng = accepted[-1][1], accepted[-1][2]
+    session.last_update_at = now if now is not None else time.time()
+    
+    # A walker who reappears after being marked abandoned is active again
+    if session.status == SessionStatus.ABANDONED:
+        change_status(session, SessionStatus.ACTIVE, session.last_update_at, log=not replay)
+    
+    # ETA from remaining route distance at the observed pace (e.g., "11:42 PM")
+    if session.route_progress:
+        session.eta_at = session.last_update_at + session.route_progress.eta_seconds()
+        session.eta = datetime.fromtimestamp(session.eta_at, timezone.utc).strftime("%I:%M %p")
     
-    # For now, just print the notification to the console for demo:
-    print(f"[AUTO-NOTIFY:{channel}] To {contact}: {text}")
+    session.touch()
+    console.mark_moved(session)
+    if not session.is_terminal:
+        proximity.update_walker(session.id, session.last_lat, session.last_lng, session.user_name)
+    return accepted, dropped, events
+
+
+def ingest_location_fixes(session, fixes):
+    """
+    Apply location fixes to a session, log them and broadcast the result.
+    Shared by the REST endpoint and the Socket.IO `report_location` event.
+    
+    All accepted fixes go into the trail, but only the newest is broadcast
+    to the session room.
+    
+    Args:
+        session: The WalkSession to update
+        fixes: List of (seq, lat, lng, timestamp) tuples from parse_location_fix
+    
+    Returns:
+        Tuple of (accepted count, dropped count)
+    """
+    with logged_mutation():
+        accepted, dropped, events = apply_location_fixes(session, fixes)
+        if accepted:
+            log_mutation("loc", id=session.id, t=session.last_update_at, f=accepted)
+    
+    if not accepted:
+        return 0, dropped
+    
+    # Emit location update to all clients in the session room
+    room_events.publish(session.id, "location_update", {
+        "lat": session.last_lat,
+        "lng": session.last_lng,
+        "timestamp": isoformat(session.last_update_at),
+        "eta": session.eta,
+        "etaAt": isoformat(session.eta_at),
+        "progress": session.route_progress.to_dict() if session.route_progress else None,
+    })
+    
+    # Off-route and alert zone transitions detected for these fixes
+    for event, payload in events:
+        room_events.publish(session.id, event, payload)
+    
+    # Schedule inactivity check
+    schedule_inactivity_check(session.id)
+    
+    return len(accepted), dropped
 
 
 @bp.route("/api/sessions", methods=["POST"])
@@ -182,20 +795,81 @@ def create_walk_session():
     
     if not data:
         return jsonify({"error": "Invalid request body"}), 400
-    
+
+    auto = data.get("autoNotify") or {}
+    if isinstance(auto, dict) and auto.get("contactChannel") == "webhook":
+        # Host names are resolved and checked again by the webhook adapter at send time
+        try:
+            check_webhook_url(str(auto.get("contactValue") or ""), NOTIFY_WEBHOOK_ALLOWED_HOSTS, resolve=False)
+        except RejectedRecipient as e:
+            return jsonify({"error": str(e)}), 400
+
     session = create_session(data)
     
     return jsonify({
-        "sessionId": session["id"],
-        "shareUrl": f"https://placeholder-frontend-url/companion/{session['shareToken']}"
+        "sessionId": session.id,
+        "shareUrl": f"https://placeholder-frontend-url/companion/{session.share_token}"
     }), 201
 
 
+def share_snapshot(session):
+    """
+    Serialized companion view of a session, cached per session version so
+    repeated polls of an unchanged session skip serialization.
+    
+    Args:
+        session: The WalkSession to serialize
+    
+    Returns:
+        Tuple of (version, ETag value, JSON body bytes)
+    """
+    cached = session.share_cache
+    if cached is not None and cached[0] == session.version:
+        return cached
+    
+    version = session.version
+    etag = f"{session.share_token}.{version}"
+    body = json.dumps(share_view(session), separators=(",", ":")).encode("utf-8")
+    session.share_cache = (version, etag, body)
+    return session.share_cache
+
+
+def share_view(session):
+    """
+    Build the companion view of a session.
+    
+    Args:
+        session: The WalkSession to describe
+    """
+    # Format response to match what frontend expects
+    # Convert location objects to strings for display
+    start_loc = session.start_location
+    end_loc = session.end_location
+    
+    start_location_str = "Bagley Hall, University of Washington" if isinstance(start_loc, dict) else str(start_loc)
+    end_location_str = "The Standard at Seattle" if isinstance(end_loc, dict) else str(end_loc)
+    
+    return {
+        "userName": session.user_name,
+        "startLocation": start_location_str,
+        "endLocation": end_location_str,
+        "startedAt": isoformat(session.created_at),
+        "status": session.status.value,
+        "lastLocation": session.last_location,
+        "eta": session.eta,
+        "etaAt": isoformat(session.eta_at),
+        "progress": session.route_progress.to_dict() if session.route_progress else None,
+        "trail": session.trail.to_dict(),
+        "version": session.version
+    }
+
+
 @bp.route("/api/sessions/share/<share_token>", methods=["GET"])
 def get_session_by_share(share_token):
     """
     Get session information by share token (for companion view).
     Live Companion Mode: Allows companions to view walk status via share token.
+    Pollers send the last ETag in If-None-Match and get 304 until the walk changes.
     
     Args:
         share_token: The share token to look up
@@ -205,22 +879,125 @@ def get_session_by_share(share_token):
     if not session:
         return jsonify({"error": "Session not found"}), 404
     
-    # Format response to match what frontend expects
-    # Convert location objects to strings for display
-    start_loc = session["startLocation"]
-    end_loc = session["endLocation"]
+    version, etag, body = share_snapshot(session)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def parse_since(value):
+    """Parse a last-seen sequence number from a query parameter or header."""
+    if value in (None, ""):
+        return None
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def feed_events(events):
+    """Feed entries as JSON-ready dicts."""
+    return [{"seq": seq, "event": event, "data": payload} for seq, event, payload in events]
+
+
+@bp.route("/api/sessions/share/<share_token>/poll", methods=["GET"])
+def poll_session_by_share(share_token):
+    """
+    Long-poll for companion updates (fallback for networks that block websockets).
     
-    start_location_str = "Bagley Hall, University of Washington" if isinstance(start_loc, dict) else str(start_loc)
-    end_location_str = "The Standard at Seattle" if isinstance(end_loc, dict) else str(end_loc)
+    Waits up to `timeout` seconds for events after `since` and returns them as
+    soon as any arrive. Without `since`, or when the events after it are no
+    longer buffered, returns a snapshot of the companion view instead.
     
-    return jsonify({
-        "userName": session["userName"],
-        "startLocation": start_location_str,
-        "endLocation": end_location_str,
-        "startedAt": session["createdAt"].isoformat(),
-        "status": session["status"],
-        "lastLocation": session["lastLocation"],
-        "eta": session["eta"]
+    Args:
+        share_token: The share token to look up
+    
+    Query parameters:
+        since: Last sequence number the companion has seen
+        timeout: Seconds to wait (capped at COMPANION_POLL_TIMEOUT_SECONDS)
+    """
+    session = get_session_by_share_token(share_token)
+    if not session:
+        return jsonify({"error": "Session not found"}), 404
+    
+    since = parse_since(request.args.get("since"))
+    try:
+        timeout = min(float(request.args.get("timeout", COMPANION_POLL_TIMEOUT_SECONDS)),
+                      COMPANION_POLL_TIMEOUT_SECONDS)
+    except ValueError:
+        return jsonify({"error": "timeout must be a number"}), 400
+    
+    events = None
+    if since is not None:
+        events = session_feed.wait(session.id, since, max(timeout, 0))
+    if events is None:
+        # Read the sequence first; events racing in are re-sent on the next poll
+        seq = session_feed.latest(session.id)
+        body = share_snapshot(session)[2]
+        return Response(
+            b'{"seq":%d,"snapshot":%s}' % (seq, body),
+            mimetype="application/json",
+            headers={"Cache-Control": "no-cache"},
+        )
+    
+    seq = events[-1][0] if events else since
+    response = jsonify({"seq": seq, "events": feed_events(events)})
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@bp.route("/api/sessions/share/<share_token>/events", methods=["GET"])
+def stream_session_by_share(share_token):
+    """
+    Server-Sent Events stream of companion updates.
+    
+    Starts with a `snapshot` event unless the client resumes with a sequence
+    number (`Last-Event-ID` header or `since` query parameter) that is still
+    buffered. Each event's id is its sequence number, so browsers resume
+    automatically on reconnect.
+    
+    Args:
+        share_token: The share token to look up
+    """
+    session = get_session_by_share_token(share_token)
+    if not session:
+        return jsonify({"error": "Session not found"}), 404
+    
+    session_id = session.id
+    since = parse_since(request.headers.get("Last-Event-ID") or request.args.get("since"))
+    
+    def snapshot_frame():
+        seq = session_feed.latest(session_id)
+        body = share_snapshot(session)[2].decode("utf-8")
+        return seq, f"id: {seq}\nevent: snapshot\ndata: {body}\n\n"
+    
+    def stream():
+        seq = since
+        if seq is None or session_feed.since(session_id, seq) is None:
+            seq, frame = snapshot_frame()
+            yield frame
+        while True:
+            events = session_feed.wait(session_id, seq, COMPANION_SSE_KEEPALIVE_SECONDS)
+            if session_id not in sessions:
+                yield "event: end\ndata: {}\n\n"
+                return
+            if events is None:
+                seq, frame = snapshot_frame()
+                yield frame
+            elif not events:
+                yield ": keepalive\n\n"
+            else:
+                for event_seq, event, payload in events:
+                    yield f"id: {event_seq}\nevent: {event}\ndata: {json.dumps(payload)}\n\n"
+                seq = events[-1][0]
+    
+    return Response(stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
     })
 
 
@@ -235,7 +1012,8 @@ def update_location(session_id):
     Expected JSON:
     {
         "lat": 47.656,
-        "lng": -122.310
+        "lng": -122.310,
+        "seq": 12  // optional
     }
     """
     session = get_session_by_id(session_id)
@@ -247,30 +1025,18 @@ def update_location(session_id):
     if not data or "lat" not in data or "lng" not in data:
         return jsonify({"error": "Invalid request body. Expected lat and lng"}), 400
     
-    # Update session location
-    session["lastLocation"] = {
-        "lat": data["lat"],
-        "lng": data["lng"]
-    }
-    session["lastUpdateAt"] = datetime.now(timezone.utc)
-    
-    # Compute dummy ETA (e.g., "11:42 PM")
-    now = datetime.now(timezone.utc)
-    session["eta"] = now.strftime("%I:%M %p")
-    
-    # Emit location update to all clients in the session room
-    if socketio:
-        socketio.emit("location_update", {
-            "lat": session["lastLocation"]["lat"],
-            "lng": session["lastLocation"]["lng"],
-            "timestamp": session["lastUpdateAt"].isoformat(),
-            "eta": session["eta"],
-        }, room=session_id)
+    try:
+        fix = parse_location_fix(data)
+    except (ValueError, TypeError):
+        return jsonify({"error": "Invalid request body. lat, lng and seq must be numbers and lat/lng in range"}), 400
     
-    # Schedule inactivity check
-    schedule_inactivity_check(session_id)
+    ingest_location_fixes(session, [fix])
     
-    return jsonify({"ok": True})
+    return jsonify({
+        "ok": True,
+        "ackSeq": session.last_seq,
+        "nextReportSeconds": next_report_seconds(session),
+    })
 
 
 @bp.route("/api/sessions/<session_id>/panic", methods=["POST"])
@@ -287,14 +1053,58 @@ def trigger_panic(session_id):
         return jsonify({"error": "Session not found"}), 404
     
     # Update session status
-    session["status"] = "panic"
+    change_status(session, SessionStatus.PANIC)
+    
+    # Nearest help (walkers are described without session IDs or names)
+    nearby = None
+    if session.last_lat is not None:
+        nearby = proximity.nearby(
+            session.last_lat,
+            session.last_lng,
+            k=PANIC_NEARBY_COUNT,
+            exclude_walker=session_id,
+        )
+    
+    # Emit panic event to all clients in the session room (priority lane)
+    room_events.publish(session_id, "panic", {
+        "message": "User triggered SOS.",
+        "lastLocation": session.last_location,
+        "nearby": nearby,
+    })
+    
+    # Alert the Auto-Notify contact as well
+    notify_contact(
+        session,
+        "panic",
+        f"{session.user_name} triggered an SOS during their SafeWalk AI walk.",
+    )
+    
+    return jsonify({"ok": True})
+
+
+@bp.route("/api/sessions/<session_id>/resolve", methods=["POST"])
+def resolve_panic(session_id):
+    """
+    Resolve a panic/SOS event once the walker is safe.
+    The session is then kept until it is evicted like an arrived walk.
+    
+    Args:
+        session_id: The session ID whose panic should be resolved
+    """
+    session = get_session_by_id(session_id)
+    
+    if not session:
+        return jsonify({"error": "Session not found"}), 404
+    
+    if session.status != SessionStatus.PANIC:
+        return jsonify({"error": "Session is not in panic"}), 409
     
-    # Emit panic event to all clients in the session room
-    if socketio:
-        socketio.emit("panic", {
-            "message": "User triggered SOS.",
-            "lastLocation": session["lastLocation"],
-        }, room=session_id)
+    change_status(session, SessionStatus.PANIC_RESOLVED)
+    cancel_inactivity_check(session_id)
+    
+    room_events.publish(session_id, "panic_resolved", {
+        "resolvedAt": isoformat(session.status_changed_at)
+    })
     
     return jsonify({"ok": True})
 
@@ -304,35 +1114,37 @@ def arrive(session_id):
     """
     Mark a walk session as arrived and trigger Auto-Notify Arrival.
     Auto-Notify Arrival: Sends notification to configured contact when user arrives.
-    
+    Repeating the call (a double tap or a client retry) changes nothing.
+
     Args:
         session_id: The session ID to mark as arrived
     """
     session = get_session_by_id(session_id)
-    
+
     if not session:
         return jsonify({"error": "Session not found"}), 404
-    
+
+    # Already arrived: keep the original arrival time and notification
+    if session.status == SessionStatus.ARRIVED:
+        return jsonify({"ok": True})
+
     # Update session status and arrival time
-    session["status"] = "arrived"
-    session["arrivedAt"] = datetime.now(timezone.utc)
+    session.arrived_at = time.time()
+    change_status(session, SessionStatus.ARRIVED, session.arrived_at)
     
     # Cancel any inactivity timer for this session
-    if session_id in inactivity_timers:
-        inactivity_timers[session_id].cancel()
-        del inactivity_timers[session_id]
+    cancel_inactivity_check(session_id)
     
     # Emit arrived event to all clients in the session room
-    if socketio:
-        socketio.emit("arrived", {
-            "arrivedAt": session["arrivedAt"].isoformat()
-        }, room=session_id)
-        
-        # Also emit arrival_notification for companion screen
-        socketio.emit("arrival_notification", {
-            "message": f"{session['userName']} has arrived safely at their destination.",
-            "arrivedAt": session["arrivedAt"].isoformat()
-        }, room=session_id)
+    room_events.publish(session_id, "arrived", {
+        "arrivedAt": isoformat(session.arrived_at)
+    })
+    
+    # Also emit arrival_notification for companion screen
+    room_events.publish(session_id, "arrival_notification", {
+        "message": f"{session.user_name} has arrived safely at their destination.",
+        "arrivedAt": isoformat(session.arrived_at)
+    })
     
     # Send arrival notification via Auto-Notify
     send_arrival_notification(session)
@@ -340,6 +1152,27 @@ def arrive(session_id):
     return jsonify({"ok": True})
 
 
+def replay_missed_events(session, last_seq):
+    """
+    Send a rejoining client the room events it missed while disconnected,
+    or a snapshot of the companion view if they are no longer buffered.
+    Must be called from a Socket.IO handler.
+    
+    Args:
+        session: The WalkSession being rejoined
+        last_seq: Last event sequence number the client saw
+    """
+    events = session_feed.since(session.id, last_seq)
+    if events is None:
+        emit("session_snapshot", {
+            "seq": session_feed.latest(session.id),
+            "snapshot": share_view(session),
+        })
+        return
+    for seq, event, payload in events:
+        emit(event, {**payload, "seq": seq})
+
+
 def register_socketio_handlers(socketio_instance):
     """
     Register Socket.IO event handlers for session management.
@@ -351,38 +1184,179 @@ def register_socketio_handlers(socketio_instance):
     def handle_join_session(data):
         """
         Handle Socket.IO event to join a session by session ID.
+        On a rejoin, pass the last seen event `seq` to receive missed events.
         
         Expected data:
         {
-            "sessionId": "<uuid>"
+            "sessionId": "<uuid>",
+            "lastSeq": 41  // optional
         }
+        
+        Returns:
+            {"ok": true, "seq": <latest event seq>} as the acknowledgement
         """
         session_id = data.get("sessionId")
         if not session_id:
-            return
+            return {"ok": False, "error": "sessionId is required"}
         
         session = get_session_by_id(session_id)
-        if session:
-            join_room(session_id)
+        if not session:
+            return {"ok": False, "error": "Session not found"}
+        
+        last_seq = parse_since(data.get("lastSeq"))
+        if last_seq is not None:
+            replay_missed_events(session, last_seq)
+        join_room(session_id)
+        return {"ok": True, "seq": session_feed.latest(session_id)}
 
     @socketio_instance.on("join_session_by_token")
     def handle_join_session_by_token(data):
         """
         Handle Socket.IO event to join a session by share token.
+        On a rejoin, pass the last seen event `seq` to receive only the
+        missed events instead of the full trail.
         
         Expected data:
         {
-            "shareToken": "<token>"
+            "shareToken": "<token>",
+            "lastSeq": 41  // optional
         }
+        
+        Returns:
+            {"ok": true, "seq": <latest event seq>} as the acknowledgement
         """
         share_token = data.get("shareToken")
         if not share_token:
-            return
+            return {"ok": False, "error": "shareToken is required"}
         
         session = get_session_by_share_token(share_token)
-        if session:
-            join_room(session["id"])
-            # Update companion joined timestamp if not already set
-            if not session["companion"]["joinedAt"]:
-                session["companion"]["joinedAt"] = datetime.now(timezone.utc)
+        if not session:
+            return {"ok": False, "error": "Session not found"}
+        
+        last_seq = parse_since(data.get("lastSeq"))
+        if last_seq is not None:
+            replay_missed_events(session, last_seq)
+        else:
+            # Send the path walked so far to the joining companion first
+            emit("trail", {
+                "trail": session.trail.to_dict(),
+                "lastLocation": session.last_location,
+                "status": session.status.value,
+                "seq": session_feed.latest(session.id),
+            })
+        join_room(session.id)
+        # Update companion joined timestamp if not already set
+        if not session.companion_joined_at:
+            with logged_mutation():
+                session.companion_joined_at = time.time()
+                log_mutation("join", id=session.id, t=session.companion_joined_at)
+        return {"ok": True, "seq": session_feed.latest(session.id)}
+
+    @socketio_instance.on("join_console")
+    def handle_join_console(data):
+        """
+        Subscribe a security console to aggregated updates for all sessions,
+        or only for sessions inside a bounding box. Replaces any earlier
+        subscription from the same client.
+        
+        Expected data:
+        {
+            "token": "<ADMIN_TOKEN>",
+            "bbox": [south, west, north, east]  // optional
+        }
+        
+        Returns:
+            {"ok": true, "snapshot": {...}} as the acknowledgement; the console
+            then receives "console_frame" events
+        """
+        data = data if isinstance(data, dict) else {}
+        if not ADMIN_TOKEN:
+            return {"ok": False, "error": "Security console disabled: ADMIN_TOKEN is not configured"}
+        if not hmac.compare_digest(str(data.get("token", "")).encode(), ADMIN_TOKEN.encode()):
+            return {"ok": False, "error": "Unauthorized"}
+        
+        bbox = data.get("bbox")
+        if bbox is not None:
+            try:
+                south, west, north, east = (float(v) for v in bbox)
+            except (TypeError, ValueError):
+                return {"ok": False, "error": "bbox must be [south, west, north, east]"}
+            if south > north or west > east:
+                return {"ok": False, "error": "bbox must be [south, west, north, east]"}
+            bbox = (south, west, north, east)
+        
+        previous_room = console.subscription(request.sid)
+        try:
+            room, snapshot = console.subscribe(request.sid, bbox)
+        except ValueError as e:
+            return {"ok": False, "error": str(e)}
+        if previous_room and previous_room != room:
+            leave_room(previous_room)
+        join_room(room)
+        return {"ok": True, "snapshot": snapshot}
+
+    @socketio_instance.on("leave_console")
+    def handle_leave_console(data=None):
+        """Stop sending console frames to this client."""
+        room = console.unsubscribe(request.sid)
+        if room:
+            leave_room(room)
+
+    @socketio_instance.on("disconnect")
+    def handle_disconnect():
+        """Drop the console subscription and outbound queue of a disconnected client."""
+        console.unsubscribe(request.sid)
+        client_outboxes.drop(request.sid)
+
+    @socketio_instance.on("report_location")
+    def handle_report_location(data):
+        """
+        Handle Socket.IO location reports from the walker's app.
+        Same pipeline as POST /api/sessions/<id>/location, without the
+        per-fix HTTP overhead. The return value is sent as the acknowledgement.
+        
+        Expected data (single fix or a batch):
+        {
+            "sessionId": "<uuid>",
+            "seq": 12, "lat": 47.656, "lng": -122.310
+        }
+        {
+            "sessionId": "<uuid>",
+            "fixes": [{"seq": 12, "lat": ..., "lng": ..., "timestamp": ...}, ...]
+        }
+        
+        Returns:
+            {"ok": true, "ackSeq": <last accepted seq>, "accepted": n, "dropped": m,
+             "nextReportSeconds": <seconds until the next report, null to stop>}
+        """
+        if not isinstance(data, dict):
+            return {"ok": False, "error": "Invalid payload"}
+        
+        session = get_session_by_id(data.get("sessionId"))
+        if not session:
+            return {"ok": False, "error": "Session not found"}
+        
+        raw_fixes = data.get("fixes")
+        if raw_fixes is None:
+            raw_fixes = [data]
+        if not isinstance(raw_fixes, list) or not raw_fixes:
+            return {"ok": False, "error": "Expected lat and lng or a list of fixes"}
+        if len(raw_fixes) > MAX_FIXES_PER_REPORT:
+            return {"ok": False, "error": f"At most {MAX_FIXES_PER_REPORT} fixes per report"}
+        
+        now = time.time()
+        try:
+            fixes = [parse_location_fix(raw, now) for raw in raw_fixes]
+        except (KeyError, ValueError, TypeError, AttributeError):
+            return {"ok": False, "error": "Invalid fix. lat, lng and seq must be numbers and lat/lng in range"}
+        
+        accepted, dropped = ingest_location_fixes(session, fixes)
+        
+        return {
+            "ok": True,
+            "ackSeq": session.last_seq,
+            "accepted": accepted,
+            "dropped": dropped,
+            "nextReportSeconds": next_report_seconds(session),
+        }
 
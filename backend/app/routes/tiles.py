@@ -0,0 +1,25 @@
+"""
+Route handler for safety heatmap tiles.
+"""
+from flask import Blueprint, Response, jsonify
+from app.services.safety_tiles import MAX_ZOOM, MIN_ZOOM, safety_tiles
+
+bp = Blueprint('tiles', __name__)
+
+
+@bp.route('/tiles/safety/<int:z>/<int:x>/<int:y>', methods=['GET'])
+@bp.route('/tiles/safety/<int:z>/<int:x>/<int:y>.png', methods=['GET'])
+def get_safety_tile(z, x, y):
+    """
+    Safety heatmap tile (256 px PNG, XYZ scheme) over the campus.
+    Red is least safe, green most; areas without data are transparent.
+    
+    Returns:
+        image/png, or 404 for zoom levels or tiles that do not exist
+    """
+    if not MIN_ZOOM <= z <= MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        return jsonify({"error": "Tile not found"}), 404
+    
+    response = Response(safety_tiles.get_tile(z, x, y), mimetype="image/png")
+    response.headers["Cache-Control"] = "public, max-age=60"
+    return response
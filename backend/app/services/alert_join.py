@@ -0,0 +1,174 @@
+"""
+Spatial join of new UW Alert zones against walks in progress.
+
+When the alerts snapshot changes, each added or changed zone is matched
+against the walkers' live positions (the proximity PointIndex) and the
+parts of their planned routes still ahead of them (a RouteIndex of route
+chunks), so the cost follows the zones and the walks near them rather than
+zones times sessions.
+"""
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from app.services.metrics import LatencyStats
+from app.utils.distance import METERS_PER_DEGREE, meters_per_degree_lng
+from app.utils.spatial_grid import DEFAULT_ORIGIN_LAT, GridIndex
+
+LatLng = Tuple[float, float]
+
+_LNG_METERS = meters_per_degree_lng(DEFAULT_ORIGIN_LAT)
+
+
+class RouteIndex:
+    """Grid index of planned routes, registered in chunks of a few segments."""
+
+    def __init__(self, cell_meters: float = 250.0, chunk_segments: int = 8):
+        """
+        Args:
+            cell_meters: Grid cell size
+            chunk_segments: Route segments per indexed bounding box
+        """
+        self.chunk_segments = chunk_segments
+        self._grid = GridIndex(cell_meters)
+        self._routes: Dict[Hashable, List[LatLng]] = {}
+        self._chunks: Dict[Hashable, int] = {}  # route key -> chunk count
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def set_route(self, key: Hashable, coordinates: List[LatLng]):
+        """Index (or re-index) a route given as (lat, lng) points."""
+        with self._lock:
+            self._remove_locked(key)
+            if len(coordinates) < 2:
+                return
+            step = self.chunk_segments
+            chunks = 0
+            for start in range(0, len(coordinates) - 1, step):
+                points = coordinates[start:start + step + 1]
+                lats = [lat for lat, _ in points]
+                lngs = [lng for _, lng in points]
+                self._grid.insert((key, start), min(lats), min(lngs), max(lats), max(lngs))
+                chunks += 1
+            self._routes[key] = coordinates
+            self._chunks[key] = chunks
+
+    def remove(self, key: Hashable):
+        """Forget a route (no-op if unknown)."""
+        with self._lock:
+            self._remove_locked(key)
+
+    def segments_near(
+        self,
+        bbox: Tuple[float, float, float, float],
+        first_segment: Callable[[Hashable], int]
+    ) -> Dict[Hashable, List[Tuple[LatLng, LatLng]]]:
+        """
+        Route segments in chunks overlapping a bounding box.
+
+        Args:
+            bbox: (min_lat, min_lng, max_lat, max_lng)
+            first_segment: Callable(key) giving the first segment still ahead
+                on that route; earlier segments are skipped
+
+        Returns:
+            Dict of route key -> list of ((lat, lng), (lat, lng)) segments
+        """
+        found: Dict[Hashable, List[Tuple[LatLng, LatLng]]] = {}
+        with self._lock:
+            for key, start in self._grid.query_bbox(*bbox):
+                coordinates = self._routes[key]
+                end = min(start + self.chunk_segments, len(coordinates) - 1)
+                begin = max(start, first_segment(key))
+                segments = [(coordinates[i], coordinates[i + 1]) for i in range(begin, end)]
+                if segments:
+                    found.setdefault(key, []).extend(segments)
+        return found
+
+    def _remove_locked(self, key: Hashable):
+        chunks = self._chunks.pop(key, 0)
+        for i in range(chunks):
+            self._grid.remove((key, i * self.chunk_segments))
+        self._routes.pop(key, None)
+
+
+class AlertJoin:
+    """Matches alert zones to the walks they affect."""
+
+    def __init__(self, nearby_meters: float = 200.0, corridor_meters: float = 50.0, cell_meters: float = 250.0):
+        """
+        Args:
+            nearby_meters: A walker this close to a zone is notified
+            corridor_meters: A remaining route this close to a zone is notified
+            cell_meters: Grid cell size of the route index
+        """
+        self.nearby_meters = nearby_meters
+        self.corridor_meters = corridor_meters
+        self.routes = RouteIndex(cell_meters)
+        self._latency = LatencyStats()
+        self._counters = {"joins": 0, "zones": 0, "matches": 0}
+
+    def join(
+        self,
+        zones: List,
+        walkers_within: Callable[[float, float, float], List[Tuple[float, Hashable]]],
+        walker_position: Callable[[Hashable], Optional[LatLng]],
+        first_segment: Callable[[Hashable], int]
+    ) -> Dict[Hashable, List[Tuple[object, dict]]]:
+        """
+        Find the walks affected by new or changed zones.
+
+        Args:
+            zones: PreparedZones that were added or changed
+            walkers_within: Callable(lat, lng, meters) -> [(distance, session_id)]
+            walker_position: Callable(session_id) -> (lat, lng) or None
+            first_segment: Callable(session_id) -> first route segment still ahead
+
+        Returns:
+            Dict of session ID -> list of (zone, match) where match has
+            "distanceMeters" (walker to zone, or None) and "onRoute"
+        """
+        started = time.perf_counter()
+        matches: Dict[Hashable, Dict[str, Tuple[object, dict]]] = {}
+        for zone in zones:
+            south, west, north, east = zone.bbox
+            center_lat, center_lng = (south + north) / 2, (west + east) / 2
+            half_diagonal = ((north - south) * METERS_PER_DEGREE / 2) ** 2 + ((east - west) * _LNG_METERS / 2) ** 2
+
+            # Walkers near the zone, from the circle around its bounding box
+            for _, session_id in walkers_within(center_lat, center_lng, half_diagonal ** 0.5 + self.nearby_meters):
+                position = walker_position(session_id)
+                if position is None:
+                    continue
+                distance = zone.distance_to(*position)
+                if distance <= self.nearby_meters:
+                    matches.setdefault(session_id, {})[zone.zone_id] = (
+                        zone, {"distanceMeters": round(distance), "onRoute": False}
+                    )
+
+            # Remaining routes passing the zone
+            dlat = self.corridor_meters / METERS_PER_DEGREE
+            dlng = self.corridor_meters / _LNG_METERS
+            near = self.routes.segments_near((south - dlat, west - dlng, north + dlat, east + dlng), first_segment)
+            for session_id, segments in near.items():
+                if any(zone.distance_to_segment(a, b) <= self.corridor_meters for a, b in segments):
+                    entry = matches.setdefault(session_id, {}).get(zone.zone_id)
+                    if entry is None:
+                        matches[session_id][zone.zone_id] = (zone, {"distanceMeters": None, "onRoute": True})
+                    else:
+                        entry[1]["onRoute"] = True
+
+        self._latency.record(time.perf_counter() - started)
+        self._counters["joins"] += 1
+        self._counters["zones"] += len(zones)
+        self._counters["matches"] += sum(len(by_zone) for by_zone in matches.values())
+        return {session_id: list(by_zone.values()) for session_id, by_zone in matches.items()}
+
+    def metrics(self) -> dict:
+        """Indexed routes, join latency and counters."""
+        return {
+            "routes": len(self.routes),
+            "joinLatency": self._latency.summary(),
+            **self._counters,
+        }
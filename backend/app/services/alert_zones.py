@@ -0,0 +1,403 @@
+"""
+Spatial index of UW Alert zones for route and position queries.
+
+Located alerts become prepared zones: a circle (center and radius) or a
+polygon, projected once into local meters with their bounding boxes, so a
+test against a point or a route segment is a few multiplications. Zones are
+registered in a GridIndex, so a route only tests the zones in the cells its
+segments cross. The index follows the UW Alerts snapshot incrementally:
+only zones whose alert was added, changed or removed are touched.
+
+Location formats accepted on UWAlert.location:
+    {"lat": 47.65, "lng": -122.30, "radius_meters": 150}
+    {"polygon": [{"lat": ..., "lng": ...}, ...]} or {"polygon": [[lat, lng], ...]}
+"""
+import hashlib
+import json
+import threading
+import time
+from array import array
+from math import hypot
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from app.models.safety import UWAlert
+from app.services import metrics
+from app.services.alerts_poller import AlertsSnapshot
+from app.services.metrics import LatencyStats
+from app.utils.distance import METERS_PER_DEGREE, meters_per_degree_lng
+from app.utils.spatial_grid import DEFAULT_ORIGIN_LAT, GridIndex
+from config import ALERT_CORRIDOR_METERS, ALERT_INDEX_CELL_METERS
+
+LatLng = Tuple[float, float]
+
+# Score penalty per alert severity, and the cap on the total
+SEVERITY_PENALTIES = {"low": 5.0, "medium": 15.0, "high": 30.0, "critical": 50.0}
+MAX_ALERT_PENALTY = 50.0
+
+DEFAULT_RADIUS_METERS = 100.0
+
+_LNG_METERS = meters_per_degree_lng(DEFAULT_ORIGIN_LAT)
+
+
+def _project(lat: float, lng: float) -> Tuple[float, float]:
+    """Local planar coordinates in meters (accurate at campus scale)."""
+    return lng * _LNG_METERS, lat * METERS_PER_DEGREE
+
+
+def _point_segment_distance(px, py, ax, ay, bx, by) -> float:
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return hypot(px - ax, py - ay)
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+    return hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def _cross(ax, ay, bx, by, cx, cy) -> float:
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+def _segments_cross(ax, ay, bx, by, cx, cy, dx, dy) -> bool:
+    d1 = _cross(cx, cy, dx, dy, ax, ay)
+    d2 = _cross(cx, cy, dx, dy, bx, by)
+    d3 = _cross(ax, ay, bx, by, cx, cy)
+    d4 = _cross(ax, ay, bx, by, dx, dy)
+    return (d1 > 0) != (d2 > 0) and (d3 > 0) != (d4 > 0)
+
+
+def _parse_point(point) -> LatLng:
+    if isinstance(point, dict):
+        return float(point["lat"]), float(point["lng"])
+    return float(point[0]), float(point[1])
+
+
+class PreparedZone:
+    """A located alert's geometry, projected and ready for fast tests."""
+
+    __slots__ = ("zone_id", "title", "severity", "signature", "bbox",
+                 "cx", "cy", "radius", "xs", "ys", "vertices")
+
+    def __init__(self, zone_id: str, title: str, severity: str, signature: str):
+        self.zone_id = zone_id
+        self.title = title
+        self.severity = severity
+        self.signature = signature
+        self.bbox = None  # (min_lat, min_lng, max_lat, max_lng)
+        self.cx = self.cy = self.radius = None  # Circle
+        self.xs = self.ys = None  # Polygon ring, projected
+        self.vertices = None  # Polygon ring as (lat, lng)
+
+    @classmethod
+    def from_alert(cls, alert: UWAlert) -> Optional["PreparedZone"]:
+        """Prepare an alert's zone, or None if the alert has no usable location."""
+        location = alert.location
+        if not location:
+            return None
+        zone = cls(alert.alert_id, alert.title, alert.severity, _signature(alert))
+        try:
+            if location.get("polygon"):
+                vertices = [_parse_point(point) for point in location["polygon"]]
+                if len(vertices) > 1 and vertices[0] == vertices[-1]:
+                    vertices.pop()
+                if len(vertices) < 3:
+                    return None
+                projected = [_project(lat, lng) for lat, lng in vertices]
+                zone.vertices = vertices
+                zone.xs = array("d", (x for x, _ in projected))
+                zone.ys = array("d", (y for _, y in projected))
+                lats = [lat for lat, _ in vertices]
+                lngs = [lng for _, lng in vertices]
+                zone.bbox = (min(lats), min(lngs), max(lats), max(lngs))
+            else:
+                lat, lng = float(location["lat"]), float(location["lng"])
+                zone.radius = float(location.get("radius_meters", DEFAULT_RADIUS_METERS))
+                zone.cx, zone.cy = _project(lat, lng)
+                dlat = zone.radius / METERS_PER_DEGREE
+                dlng = zone.radius / _LNG_METERS
+                zone.bbox = (lat - dlat, lng - dlng, lat + dlat, lng + dlng)
+        except (KeyError, ValueError, TypeError, IndexError):
+            return None
+        return zone
+
+    @property
+    def is_polygon(self) -> bool:
+        return self.xs is not None
+
+    def contains(self, x: float, y: float) -> bool:
+        """Whether a projected point is inside the zone."""
+        if not self.is_polygon:
+            return hypot(x - self.cx, y - self.cy) <= self.radius
+        xs, ys = self.xs, self.ys
+        inside = False
+        j = len(xs) - 1
+        for i in range(len(xs)):
+            if (ys[i] > y) != (ys[j] > y):
+                if x < xs[i] + (y - ys[i]) * (xs[j] - xs[i]) / (ys[j] - ys[i]):
+                    inside = not inside
+            j = i
+        return inside
+
+    def segment_distance(self, ax: float, ay: float, bx: float, by: float) -> float:
+        """Distance in meters from a projected segment to the zone (0 if they touch)."""
+        if not self.is_polygon:
+            return max(0.0, _point_segment_distance(self.cx, self.cy, ax, ay, bx, by) - self.radius)
+        if self.contains(ax, ay) or self.contains(bx, by):
+            return 0.0
+        xs, ys = self.xs, self.ys
+        best = float("inf")
+        j = len(xs) - 1
+        for i in range(len(xs)):
+            if _segments_cross(ax, ay, bx, by, xs[j], ys[j], xs[i], ys[i]):
+                return 0.0
+            best = min(
+                best,
+                _point_segment_distance(xs[i], ys[i], ax, ay, bx, by),
+                _point_segment_distance(ax, ay, xs[j], ys[j], xs[i], ys[i]),
+                _point_segment_distance(bx, by, xs[j], ys[j], xs[i], ys[i]),
+            )
+            j = i
+        return best
+
+    def distance_to(self, lat: float, lng: float) -> float:
+        """Distance in meters from a point to the zone (0 inside)."""
+        x, y = _project(lat, lng)
+        return self.segment_distance(x, y, x, y)
+
+    def distance_to_segment(self, a: LatLng, b: LatLng) -> float:
+        """Distance in meters from a (lat, lng) segment to the zone (0 if they touch)."""
+        ax, ay = _project(*a)
+        bx, by = _project(*b)
+        return self.segment_distance(ax, ay, bx, by)
+
+    def to_dict(self) -> dict:
+        """Serialize the zone for responses and event payloads."""
+        data = {"id": self.zone_id, "title": self.title, "severity": self.severity}
+        if self.is_polygon:
+            data["polygon"] = [[lat, lng] for lat, lng in self.vertices]
+        else:
+            south, west, north, east = self.bbox
+            data["center"] = {"lat": (south + north) / 2, "lng": (west + east) / 2}
+            data["radiusMeters"] = self.radius
+        return data
+
+
+def _signature(alert: UWAlert) -> str:
+    """Identifies an alert's zone content; a change means the zone is rebuilt."""
+    return json.dumps([alert.location, alert.title, alert.severity], sort_keys=True, default=str)
+
+
+def _zones_digest(zones: Dict[str, "PreparedZone"]) -> str:
+    digest = hashlib.sha1()
+    for zone_id in sorted(zones):
+        digest.update(f"{zone_id}:{zones[zone_id].signature};".encode())
+    return digest.hexdigest()[:16]
+
+
+def _bbox_overlaps(a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def alert_penalty(severities: Iterable[str]) -> float:
+    """Score penalty for alerts of the given severities, capped."""
+    return min(MAX_ALERT_PENALTY, sum(SEVERITY_PENALTIES.get(s, 15.0) for s in severities))
+
+
+class AlertZoneIndex:
+    """Grid index of prepared alert zones, updated incrementally per snapshot."""
+
+    def __init__(self, cell_meters: float = 250.0, corridor_meters: float = 50.0):
+        """
+        Args:
+            cell_meters: Grid cell size
+            corridor_meters: Default half-width of a route corridor
+        """
+        self.corridor_meters = corridor_meters
+        self.version = 0  # Alerts snapshot version the index reflects
+        self.digest = _zones_digest({})  # Digest of the indexed zones, stable across restarts
+        self._grid = GridIndex(cell_meters)
+        self._zones: Dict[str, PreparedZone] = {}
+        self._lock = threading.Lock()
+        self._latency = LatencyStats()
+        self._counters = {"added": 0, "updated": 0, "removed": 0}
+
+    def __len__(self) -> int:
+        return len(self._zones)
+
+    def __contains__(self, zone_id: str) -> bool:
+        return zone_id in self._zones
+
+    def get(self, zone_id: str) -> Optional[PreparedZone]:
+        """An indexed zone by alert ID."""
+        return self._zones.get(zone_id)
+
+    def apply_snapshot(self, snapshot: AlertsSnapshot) -> Tuple[List[PreparedZone], List[PreparedZone]]:
+        """Follow a new UW Alerts snapshot; see update()."""
+        return self.update(snapshot.alerts, snapshot.version)
+
+    def update(
+        self,
+        alerts: Iterable[UWAlert],
+        version: int = 0
+    ) -> Tuple[List[PreparedZone], List[PreparedZone]]:
+        """
+        Bring the index in line with the active alerts, touching only zones
+        that were added, changed or removed.
+
+        Returns:
+            Tuple of (zones added or changed, zones removed or replaced by a
+            changed version)
+        """
+        wanted = {alert.alert_id: alert for alert in alerts if alert.active and alert.location}
+        # Prepare outside the lock; the snapshot subscriber is the only writer
+        prepared = []
+        for alert_id, alert in wanted.items():
+            current = self._zones.get(alert_id)
+            if current is not None and current.signature == _signature(alert):
+                continue
+            zone = PreparedZone.from_alert(alert)
+            if zone is not None:
+                prepared.append((current is not None, zone))
+
+        dropped = []
+        with self._lock:
+            for zone_id in [zone_id for zone_id in self._zones if zone_id not in wanted]:
+                self._grid.remove(zone_id)
+                dropped.append(self._zones.pop(zone_id))
+                self._counters["removed"] += 1
+            for existed, zone in prepared:
+                if existed:
+                    dropped.append(self._zones[zone.zone_id])
+                self._grid.insert(zone.zone_id, *zone.bbox)
+                self._zones[zone.zone_id] = zone
+                self._counters["updated" if existed else "added"] += 1
+            self.version = version
+            self.digest = _zones_digest(self._zones)
+        return [zone for _, zone in prepared], dropped
+
+    def digest_within(self, min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> str:
+        """
+        Digest of only the zones whose bounding boxes overlap an area, stable
+        across restarts. It changes only when a zone touching the area changes.
+        """
+        with self._lock:
+            zones = {
+                zone_id: self._zones[zone_id]
+                for zone_id in self._grid.query_bbox(min_lat, min_lng, max_lat, max_lng)
+                if _bbox_overlaps(self._zones[zone_id].bbox, (min_lat, min_lng, max_lat, max_lng))
+            }
+        return _zones_digest(zones)
+
+    def containing(self, lat: float, lng: float) -> List[PreparedZone]:
+        """Zones containing a point."""
+        started = time.perf_counter()
+        x, y = _project(lat, lng)
+        with self._lock:
+            zones = [
+                self._zones[zone_id] for zone_id in self._grid.query_point(lat, lng)
+                if self._zones[zone_id].contains(x, y)
+            ]
+        self._latency.record(time.perf_counter() - started)
+        return zones
+
+    def along_route(
+        self,
+        points: Sequence[LatLng],
+        corridor_meters: Optional[float] = None,
+        zone_ids: Optional[Iterable[str]] = None
+    ) -> List[PreparedZone]:
+        """
+        Zones within a corridor around a route.
+
+        Args:
+            points: Route as (lat, lng) points
+            corridor_meters: Corridor half-width (defaults to the index's)
+            zone_ids: Only test these zones (all indexed zones if None)
+
+        Returns:
+            Intersecting zones in the order the route reaches them
+        """
+        started = time.perf_counter()
+        corridor = self.corridor_meters if corridor_meters is None else corridor_meters
+        dlat = corridor / METERS_PER_DEGREE
+        dlng = corridor / _LNG_METERS
+        only = set(zone_ids) if zone_ids is not None else None
+        if len(points) == 1:
+            points = [points[0], points[0]]
+        hits = {}
+        with self._lock:
+            for (a_lat, a_lng), (b_lat, b_lng) in zip(points, points[1:]):
+                candidates = self._grid.query_bbox(
+                    min(a_lat, b_lat) - dlat, min(a_lng, b_lng) - dlng,
+                    max(a_lat, b_lat) + dlat, max(a_lng, b_lng) + dlng,
+                )
+                if not candidates:
+                    continue
+                ax, ay = _project(a_lat, a_lng)
+                bx, by = _project(b_lat, b_lng)
+                for zone_id in candidates:
+                    if zone_id in hits or (only is not None and zone_id not in only):
+                        continue
+                    zone = self._zones[zone_id]
+                    if zone.segment_distance(ax, ay, bx, by) <= corridor:
+                        hits[zone_id] = zone
+        self._latency.record(time.perf_counter() - started)
+        return list(hits.values())
+
+    def route_alerts(self, alerts: Iterable[UWAlert], points: Sequence[LatLng]) -> List[UWAlert]:
+        """
+        The alerts that concern a route: unlocated (campus-wide) alerts, and
+        located ones whose zone lies within the route corridor.
+        """
+        alerts = [alert for alert in alerts if alert.active]
+        if not points:
+            return alerts
+        indexed = [a.alert_id for a in alerts if a.location and self._is_current(a)]
+        near = {zone.zone_id for zone in self.along_route(points, zone_ids=indexed)}
+        relevant = []
+        for alert in alerts:
+            if not alert.location or alert.alert_id in near:
+                relevant.append(alert)
+            elif alert.alert_id not in indexed:
+                # Not in the shared snapshot (e.g. supplied by the caller): test directly
+                zone = PreparedZone.from_alert(alert)
+                if zone is None or _zone_near_route(zone, points, self.corridor_meters):
+                    relevant.append(alert)
+        return relevant
+
+    def route_penalty(self, points: Sequence[LatLng]) -> Tuple[float, List[PreparedZone]]:
+        """
+        Score penalty for the indexed zones along a route.
+
+        Returns:
+            Tuple of (penalty, zones along the route)
+        """
+        zones = self.along_route(points)
+        return alert_penalty(zone.severity for zone in zones), zones
+
+    def metrics(self) -> dict:
+        """Indexed zones, snapshot version, query latency and update counters."""
+        return {
+            "zones": len(self._zones),
+            "version": self.version,
+            "queryLatency": self._latency.summary(),
+            **self._counters,
+        }
+
+    def _is_current(self, alert: UWAlert) -> bool:
+        zone = self._zones.get(alert.alert_id)
+        return zone is not None and zone.signature == _signature(alert)
+
+
+def _zone_near_route(zone: PreparedZone, points: Sequence[LatLng], corridor: float) -> bool:
+    projected = [_project(lat, lng) for lat, lng in points]
+    if len(projected) == 1:
+        projected.append(projected[0])
+    return any(
+        zone.segment_distance(ax, ay, bx, by) <= corridor
+        for (ax, ay), (bx, by) in zip(projected, projected[1:])
+    )
+
+
+# Zones of the current UW Alerts snapshot, shared by scoring and sessions
+# (fed by the sessions module's alerts snapshot subscriber)
+alert_zones = AlertZoneIndex(ALERT_INDEX_CELL_METERS, ALERT_CORRIDOR_METERS)
+metrics.register("alertZones", alert_zones.metrics)
@@ -0,0 +1,154 @@
+"""
+Background poller publishing versioned snapshots of active UW Alerts.
+
+The alerts page is polled with a conditional GET (If-None-Match /
+If-Modified-Since), and the HTML is only parsed again when the server
+reports a change and the body actually differs from the last one parsed.
+Each change is published as a new immutable AlertsSnapshot with the next
+version number; readers take the current snapshot reference without
+locking, and subscribers (the alert zone index, for one) are called
+once per new version.
+"""
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+import requests
+from app.models.safety import UWAlert
+from app.services import metrics
+from app.services.metrics import LatencyStats
+from app.services.uw_alerts_service import UWAlertsService
+from config import ALERT_ZONE_REFRESH_SECONDS, UW_ALERTS_ENABLED
+
+
+@dataclass(frozen=True)
+class AlertsSnapshot:
+    """Active alerts as of one version of the alerts page."""
+    version: int
+    alerts: Tuple[UWAlert, ...]
+    changed_at: float  # When this version was published
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    digest: Optional[str] = None  # SHA-1 of the page body that was parsed
+
+
+class AlertsPoller:
+    """Polls the UW Alerts page and publishes a snapshot per change."""
+
+    def __init__(self, service: UWAlertsService, interval_seconds: float = 300.0):
+        """
+        Args:
+            service: Alerts service providing the URL and the HTML parser
+            interval_seconds: Time between polls
+        """
+        self.service = service
+        self.interval_seconds = interval_seconds
+        self.snapshot = AlertsSnapshot(version=0, alerts=(), changed_at=time.time())
+        self._subscribers: List[Callable[[AlertsSnapshot], None]] = []
+        self._thread = None
+        self._last_checked_at = None
+        self._latency = LatencyStats()
+        self._counters = {"polls": 0, "notModified": 0, "unchanged": 0, "changes": 0, "errors": 0}
+
+    def subscribe(self, callback: Callable[[AlertsSnapshot], None]):
+        """Call callback(snapshot) for every new version, starting with the current one."""
+        self._subscribers.append(callback)
+        if self.snapshot.version:
+            callback(self.snapshot)
+
+    def start(self):
+        """Start polling in a daemon thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="uw-alerts-poller", daemon=True)
+        self._thread.start()
+
+    def poll_once(self) -> bool:
+        """
+        Poll the alerts page once.
+
+        Returns:
+            True if a new snapshot was published
+        """
+        self._counters["polls"] += 1
+        current = self.snapshot
+        if not self.service.enabled:
+            self._last_checked_at = time.time()
+            if current.version:
+                return False
+            return self._publish(tuple(self.service.get_active_alerts()))
+
+        headers = {}
+        if current.etag:
+            headers["If-None-Match"] = current.etag
+        if current.last_modified:
+            headers["If-Modified-Since"] = current.last_modified
+
+        started = time.perf_counter()
+        try:
+            response = requests.get(self.service.alerts_url, headers=headers, timeout=10)
+            self._latency.record(time.perf_counter() - started)
+            if response.status_code == 304:
+                self._counters["notModified"] += 1
+                self._last_checked_at = time.time()
+                return False
+            response.raise_for_status()
+        except requests.RequestException as e:
+            # Keep serving the previous snapshot
+            self._counters["errors"] += 1
+            print(f"Error polling UW Alerts: {e}")
+            return False
+
+        self._last_checked_at = time.time()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        digest = hashlib.sha1(response.content).hexdigest()
+        if digest == current.digest:
+            # Server ignored the validators but nothing changed
+            self._counters["unchanged"] += 1
+            if (etag, last_modified) != (current.etag, current.last_modified):
+                self.snapshot = AlertsSnapshot(
+                    current.version, current.alerts, current.changed_at, etag, last_modified, digest
+                )
+            return False
+        alerts = tuple(self.service.parse_alerts(response.content))
+        return self._publish(alerts, etag, last_modified, digest)
+
+    def metrics(self) -> dict:
+        """Snapshot version and age, time since the last check, poll latency and counters."""
+        now = time.time()
+        snapshot = self.snapshot
+        return {
+            "version": snapshot.version,
+            "alerts": len(snapshot.alerts),
+            "snapshotAgeSeconds": round(now - snapshot.changed_at),
+            "lastCheckedSecondsAgo": round(now - self._last_checked_at) if self._last_checked_at else None,
+            "pollLatency": self._latency.summary(),
+            **self._counters,
+        }
+
+    def _publish(self, alerts, etag=None, last_modified=None, digest=None) -> bool:
+        self.snapshot = AlertsSnapshot(
+            self.snapshot.version + 1, alerts, time.time(), etag, last_modified, digest
+        )
+        self._counters["changes"] += 1
+        for callback in list(self._subscribers):
+            try:
+                callback(self.snapshot)
+            except Exception as e:
+                print(f"Error handling UW Alerts snapshot: {e}")
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"Error polling UW Alerts: {e}")
+            time.sleep(self.interval_seconds)
+
+
+# Current UW Alerts, shared by geofencing and route scoring
+alerts_poller = AlertsPoller(UWAlertsService(enabled=UW_ALERTS_ENABLED), ALERT_ZONE_REFRESH_SECONDS)
+metrics.register("uwAlerts", alerts_poller.metrics)
@@ -0,0 +1,230 @@
+"""
+Precomputed distance-to-nearest-callbox raster over the campus.
+
+The campus bounding box is divided into square cells (10 m by default) and
+each cell stores the distance from its center to the nearest callbox, capped
+at max_meters, as a compact array of 32-bit floats. A lookup is then a few
+array reads plus bilinear interpolation, so scoring a route costs one lookup
+per sampled point instead of one geometric test per callbox.
+
+The field is versioned by a digest of the callbox dataset and its grid
+settings. It is rebuilt only when that version changes, and persisted to disk
+so a restart with the same callboxes loads it instead of recomputing.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from array import array
+from math import floor, hypot
+from typing import List, Optional, Sequence, Tuple
+from app.services import metrics
+from app.utils.distance import METERS_PER_DEGREE, meters_per_degree_lng
+from config import CAMPUS_BBOX, CALLBOX_FIELD_CELL_METERS, CALLBOX_FIELD_MAX_METERS, CALLBOX_FIELD_PATH
+
+BBox = Tuple[float, float, float, float]  # (south, west, north, east)
+
+
+def parse_bbox(value: str) -> BBox:
+    """
+    Parse "south,west,north,east".
+
+    Raises:
+        ValueError: If the box is malformed
+    """
+    south, west, north, east = (float(v) for v in value.split(","))
+    if south >= north or west >= east:
+        raise ValueError(f"Bounding box must be south,west,north,east: {value}")
+    return south, west, north, east
+
+
+class CallboxDistanceField:
+    """Raster of distances to the nearest callbox with bilinear lookups."""
+
+    def __init__(self, bbox: BBox, cell_meters: float = 10.0, max_meters: float = 500.0, path: str = ""):
+        """
+        Args:
+            bbox: (south, west, north, east) area covered by the raster
+            cell_meters: Cell size (resolution)
+            max_meters: Distances are capped here (and cells with no callbox
+                within it hold this value)
+            path: File the field is persisted to ("" disables persistence)
+        """
+        self.bbox = bbox
+        self.cell_meters = cell_meters
+        self.max_meters = max_meters
+        self.path = path
+        south, west, north, east = bbox
+        self._lng_meters = meters_per_degree_lng((south + north) / 2)
+        self._lat_step = cell_meters / METERS_PER_DEGREE
+        self._lng_step = cell_meters / self._lng_meters
+        self.rows = max(1, int((north - south) / self._lat_step + 0.999))
+        self.cols = max(1, int((east - west) / self._lng_step + 0.999))
+        self.version: Optional[str] = None  # Digest of the callbox set the field was built from
+        self.callboxes: Tuple[Tuple[float, float], ...] = ()
+        self._values: Optional[array] = None
+        self._lock = threading.Lock()
+        self._build_seconds = None
+        self._loaded_from_disk = False
+
+    def covers(self, lat: float, lng: float) -> bool:
+        """Whether a point lies inside the raster."""
+        south, west, north, east = self.bbox
+        return south <= lat <= north and west <= lng <= east
+
+    def dataset_version(self, callboxes: List) -> str:
+        """Version of the field built from these callboxes with the current settings."""
+        digest = hashlib.sha1()
+        digest.update(json.dumps([self.bbox, self.cell_meters, self.max_meters]).encode())
+        for lat, lng in sorted((round(c.lat, 6), round(c.lng, 6)) for c in callboxes):
+            digest.update(f"{lat},{lng};".encode())
+        return digest.hexdigest()[:16]
+
+    def ensure(self, callboxes: List) -> bool:
+        """
+        Make the field match a callbox dataset: keep it if the version is
+        unchanged, load it from disk if persisted, otherwise rebuild it.
+
+        Args:
+            callboxes: Coordinates (objects with lat and lng) of every callbox
+
+        Returns:
+            True if the field changed
+        """
+        version = self.dataset_version(callboxes)
+        if version == self.version:
+            return False
+        points = tuple((c.lat, c.lng) for c in callboxes)
+        values = self._load(version)
+        self._loaded_from_disk = values is not None
+        if values is None:
+            started = time.perf_counter()
+            values = self._compute(points)
+            self._build_seconds = time.perf_counter() - started
+            self._save(version, values)
+        with self._lock:
+            self._values = values
+            self.version = version
+            self.callboxes = points
+        return True
+
+    def distance(self, lat: float, lng: float) -> Optional[float]:
+        """
+        Interpolated distance in meters from a point to the nearest callbox
+        (capped at max_meters), or None outside the raster or before it is built.
+        """
+        values = self._values
+        if values is None or not self.covers(lat, lng):
+            return None
+        south, west, _, _ = self.bbox
+        # Values sit at cell centers
+        fy = min(max((lat - south) / self._lat_step - 0.5, 0.0), self.rows - 1)
+        fx = min(max((lng - west) / self._lng_step - 0.5, 0.0), self.cols - 1)
+        y0, x0 = int(fy), int(fx)
+        y1, x1 = min(y0 + 1, self.rows - 1), min(x0 + 1, self.cols - 1)
+        ty, tx = fy - y0, fx - x0
+        cols = self.cols
+        top = values[y0 * cols + x0] * (1 - tx) + values[y0 * cols + x1] * tx
+        bottom = values[y1 * cols + x0] * (1 - tx) + values[y1 * cols + x1] * tx
+        return top * (1 - ty) + bottom * ty
+
+    def route_distance(self, points: Sequence[Tuple[float, float]]) -> Optional[float]:
+        """
+        Closest approach of a route to any callbox, sampling the route every
+        cell. None if any part of the route lies outside the raster.
+
+        Args:
+            points: Route as (lat, lng) points
+        """
+        if not points or self._values is None:
+            return None
+        best = self.max_meters
+        for (a_lat, a_lng), (b_lat, b_lng) in zip(points, list(points[1:]) or points):
+            length = hypot((b_lat - a_lat) * METERS_PER_DEGREE, (b_lng - a_lng) * self._lng_meters)
+            steps = max(1, int(length / self.cell_meters))
+            for i in range(steps + 1):
+                t = i / steps
+                d = self.distance(a_lat + (b_lat - a_lat) * t, a_lng + (b_lng - a_lng) * t)
+                if d is None:
+                    return None
+                if d < best:
+                    best = d
+        return best
+
+    def metrics(self) -> dict:
+        """Raster size, dataset version and how it was obtained."""
+        return {
+            "version": self.version,
+            "callboxes": len(self.callboxes),
+            "rows": self.rows,
+            "cols": self.cols,
+            "cellMeters": self.cell_meters,
+            "bytes": self._values.itemsize * len(self._values) if self._values is not None else 0,
+            "loadedFromDisk": self._loaded_from_disk,
+            "buildSeconds": round(self._build_seconds, 3) if self._build_seconds is not None else None,
+        }
+
+    def _compute(self, points: Sequence[Tuple[float, float]]) -> array:
+        """Fill every cell within max_meters of a callbox with its nearest distance."""
+        rows, cols = self.rows, self.cols
+        values = array("f", [self.max_meters]) * (rows * cols)
+        south, west, _, _ = self.bbox
+        reach = int(self.max_meters / self.cell_meters) + 1
+        for lat, lng in points:
+            # Callbox position in cell units, relative to cell centers
+            py = (lat - south) / self._lat_step - 0.5
+            px = (lng - west) / self._lng_step - 0.5
+            cy, cx = floor(py), floor(px)
+            x_lo, x_hi = max(0, cx - reach), min(cols - 1, cx + reach + 1)
+            if x_lo > x_hi:
+                continue
+            for y in range(max(0, cy - reach), min(rows - 1, cy + reach + 1) + 1):
+                dy = (y - py) * self.cell_meters
+                row = y * cols
+                for x in range(x_lo, x_hi + 1):
+                    d = hypot((x - px) * self.cell_meters, dy)
+                    if d < values[row + x]:
+                        values[row + x] = d
+        return values
+
+    def _header(self, version: str) -> dict:
+        return {"version": version, "rows": self.rows, "cols": self.cols}
+
+    def _load(self, version: str) -> Optional[array]:
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                header = json.loads(f.readline())
+                if header != self._header(version):
+                    return None
+                values = array("f")
+                values.frombytes(f.read())
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable callbox distance field: {e}")
+            return None
+        return values if len(values) == self.rows * self.cols else None
+
+    def _save(self, version: str, values: array):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(json.dumps(self._header(version)).encode() + b"\n")
+                f.write(values.tobytes())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error persisting callbox distance field: {e}")
+
+
+# Shared by route scoring and the safety heatmap
+callbox_field = CallboxDistanceField(
+    parse_bbox(CAMPUS_BBOX),
+    cell_meters=CALLBOX_FIELD_CELL_METERS,
+    max_meters=CALLBOX_FIELD_MAX_METERS,
+    path=CALLBOX_FIELD_PATH,
+)
+metrics.register("callboxField", callbox_field.metrics)
@@ -0,0 +1,210 @@
+"""
+Bounded per-connection outbound queues for Socket.IO clients.
+
+Room events are fanned out into one small queue per connected client and
+only handed to the client's transport while its backlog of unsent packets
+stays below a limit. A companion on a bad connection therefore holds at most
+a bounded queue here instead of an ever-growing transport queue: a newer
+location update replaces the queued one for the same room, and when the
+queue is full the oldest queued location update is dropped. Nothing else is
+dropped silently. Delta-encoded streams (console frames) that would overflow
+the queue are cut, and the client is told to resync from a new snapshot.
+Other routine events are kept even beyond the capacity. Priority events
+(panic, arrival, geofence transitions) are never dropped and skip the
+backlog check.
+"""
+import threading
+from collections import deque
+from typing import Dict, FrozenSet, Mapping, Optional
+
+
+class ClientOutbox:
+    """Pending messages for one Socket.IO connection."""
+
+    __slots__ = ("sid", "eio_sid", "priority", "routine")
+
+    def __init__(self, sid: str, eio_sid: str):
+        self.sid = sid
+        self.eio_sid = eio_sid
+        self.priority = deque()  # (event, payload)
+        self.routine = deque()  # (room, event, payload)
+
+    def __len__(self) -> int:
+        return len(self.priority) + len(self.routine)
+
+
+class ClientOutboxes:
+    """Per-client queues with drop-oldest for routine traffic and transport backpressure."""
+
+    def __init__(
+        self,
+        priority_events: FrozenSet[str],
+        coalesced_events: FrozenSet[str],
+        capacity: int = 64,
+        transport_backlog: int = 16,
+        namespace: str = "/",
+        resync_events: Optional[Mapping[str, str]] = None
+    ):
+        """
+        Args:
+            priority_events: Events that are never dropped and always sent at once
+            coalesced_events: Events superseded by a newer one for the same room;
+                the only events dropped when a queue is full
+            capacity: Maximum queued routine messages per client
+            transport_backlog: Unsent transport packets above which a client
+                gets no more routine messages until it catches up
+            namespace: Socket.IO namespace of the session rooms
+            resync_events: Delta-encoded events, mapped to the notice sent
+                (with {"room"}) when their queued messages for a room have to
+                be dropped; the client then fetches a new snapshot
+        """
+        self.priority_events = priority_events
+        self.coalesced_events = coalesced_events
+        self.resync_events = dict(resync_events or {})
+        self.capacity = capacity
+        self.transport_backlog = transport_backlog
+        self.namespace = namespace
+        self._outboxes: Dict[str, ClientOutbox] = {}
+        self._lock = threading.Lock()
+        self._stalled = 0
+        self._counters = {"sent": 0, "superseded": 0, "dropped": 0, "resyncs": 0, "overCapacity": 0}
+
+    def fanout(self, server, room: str, event: str, payload: dict):
+        """
+        Queue a room event for every client currently in the room.
+
+        Args:
+            server: The python-socketio server
+            room: Room name
+            event: Event name
+            payload: Event data
+        """
+        priority = event in self.priority_events
+        coalesced = event in self.coalesced_events
+        with self._lock:
+            for sid, eio_sid in server.manager.get_participants(self.namespace, room):
+                outbox = self._outboxes.get(sid)
+                if outbox is None:
+                    outbox = self._outboxes[sid] = ClientOutbox(sid, eio_sid)
+                if priority:
+                    outbox.priority.append((event, payload))
+                    continue
+                if coalesced:
+                    self._remove_superseded(outbox, room, event)
+                if len(outbox.routine) >= self.capacity and not self._make_room(outbox, room, event):
+                    continue
+                outbox.routine.append((room, event, payload))
+
+    def flush(self, server) -> int:
+        """
+        Hand queued messages to each client's transport, priority first,
+        holding routine messages back from clients with a full backlog.
+
+        Returns:
+            Number of messages sent
+        """
+        with self._lock:
+            outboxes = [outbox for outbox in self._outboxes.values() if len(outbox)]
+
+        sent = 0
+        stalled = 0
+        for outbox in outboxes:
+            while outbox.priority:
+                event, payload = outbox.priority.popleft()
+                server.emit(event, payload, to=outbox.sid, namespace=self.namespace)
+                sent += 1
+            backlog = self._backlog(server, outbox)
+            if backlog is None:
+                # Connection is gone; the disconnect handler drops the outbox
+                outbox.routine.clear()
+                continue
+            room_for = self.transport_backlog - backlog
+            if outbox.routine and room_for <= 0:
+                stalled += 1
+            while outbox.routine and room_for > 0:
+                with self._lock:
+                    if not outbox.routine:
+                        break
+                    _, event, payload = outbox.routine.popleft()
+                server.emit(event, payload, to=outbox.sid, namespace=self.namespace)
+                sent += 1
+                room_for -= 1
+
+        with self._lock:
+            self._stalled = stalled
+            self._counters["sent"] += sent
+        return sent
+
+    def drop(self, sid: str):
+        """Forget a disconnected client's queue."""
+        with self._lock:
+            self._outboxes.pop(sid, None)
+
+    def metrics(self) -> dict:
+        """Client count, queue depths, stalled clients and drop counters."""
+        with self._lock:
+            depths = [len(outbox) for outbox in self._outboxes.values()]
+            counters = dict(self._counters)
+            stalled = self._stalled
+        return {
+            "clients": len(depths),
+            "queued": sum(depths),
+            "maxQueueDepth": max(depths, default=0),
+            "stalledClients": stalled,
+            **counters,
+        }
+
+    def _make_room(self, outbox: ClientOutbox, room: str, event: str) -> bool:
+        """
+        Free queue space for a new routine message.
+
+        Returns:
+            False if the new message was dropped instead (its stream was cut)
+        """
+        # A queued location update is only ever superseded by the next one
+        for i, (_, queued_event, _) in enumerate(outbox.routine):
+            if queued_event in self.coalesced_events:
+                del outbox.routine[i]
+                self._counters["dropped"] += 1
+                return True
+        if event in self.coalesced_events:
+            self._counters["dropped"] += 1
+            return False
+        # Cut the oldest delta-encoded stream and have the client resync it
+        for queued_room, queued_event, _ in outbox.routine:
+            if queued_event in self.resync_events:
+                self._cut_stream(outbox, queued_room, queued_event)
+                if queued_room == room and queued_event == event:
+                    self._counters["dropped"] += 1  # The stream it continues was cut
+                    return False
+                return True
+        if event in self.resync_events:
+            self._cut_stream(outbox, room, event)
+            self._counters["dropped"] += 1
+            return False
+        # Must-deliver: keep it beyond the capacity
+        self._counters["overCapacity"] += 1
+        return True
+
+    def _cut_stream(self, outbox: ClientOutbox, room: str, event: str):
+        kept = [item for item in outbox.routine if not (item[0] == room and item[1] == event)]
+        self._counters["dropped"] += len(outbox.routine) - len(kept)
+        outbox.routine = deque(kept)
+        outbox.priority.append((self.resync_events[event], {"room": room}))
+        self._counters["resyncs"] += 1
+
+    def _remove_superseded(self, outbox: ClientOutbox, room: str, event: str):
+        for i, (queued_room, queued_event, _) in enumerate(outbox.routine):
+            if queued_room == room and queued_event == event:
+                del outbox.routine[i]
+                self._counters["superseded"] += 1
+                return
+
+    def _backlog(self, server, outbox: ClientOutbox) -> Optional[int]:
+        """Packets queued on the client's transport, 0 if unknown, None if disconnected."""
+        if not server.manager.is_connected(outbox.sid, self.namespace):
+            return None
+        eio_socket = server.eio.sockets.get(outbox.eio_sid)
+        if eio_socket is None:
+            return 0
+        return eio_socket.queue.qsize()
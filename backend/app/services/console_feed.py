@@ -0,0 +1,272 @@
+"""
+Aggregated live view of all walks for the campus security console.
+
+Instead of joining every session room, a console subscribes once, to all
+sessions or to a bounding box. Location and status changes only mark the
+session dirty; a background task turns the dirty set into one frame per
+subscribed area every frame interval (one second by default). Positions are sent as
+integer 1e-5 degree offsets from the last position the console was sent, so
+the work per frame follows the number of changes, not the number of sessions.
+A console starts from the snapshot it gets on subscribing and ignores frames
+numbered at or below the snapshot's. Consoles asking for the same area share
+one group, and the number of distinct areas is capped.
+
+Frame format (event "console_frame"):
+    {
+        "frame": 42,
+        "at": 1700000000.0,
+        "added": [[sessionId, latE5, lngE5, status, userName], ...],
+        "moved": [[sessionId, dLatE5, dLngE5], ...],
+        "removed": [sessionId, ...],
+        "transitions": [[sessionId, fromStatus, toStatus, at], ...]
+    }
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+COORD_SCALE = 100000  # 1e-5 degrees, about 1 m
+
+BBox = Tuple[float, float, float, float]  # (south, west, north, east)
+
+
+def _scaled(value: float) -> int:
+    return int(round(value * COORD_SCALE))
+
+
+class _ConsoleGroup:
+    """Consoles sharing one area, and the sessions they have been sent."""
+
+    __slots__ = ("room", "bbox", "known", "subscribers", "frame")
+
+    def __init__(self, room: str, bbox: Optional[BBox]):
+        self.room = room
+        self.bbox = bbox
+        self.known = set()  # Session IDs whose absolute position the consoles have
+        self.subscribers = set()  # Socket.IO sids
+        self.frame = 0
+
+    def contains(self, lat_e5: int, lng_e5: int) -> bool:
+        if self.bbox is None:
+            return True
+        south, west, north, east = self.bbox
+        return south <= lat_e5 <= north and west <= lng_e5 <= east
+
+
+class ConsoleAggregator:
+    """Collects session changes and publishes batched frames per console area."""
+
+    def __init__(self, frame_seconds: float = 1.0, max_areas: int = 64):
+        """
+        Args:
+            frame_seconds: Interval between frames
+            max_areas: Distinct console areas (rooms) kept at once
+        """
+        self.frame_seconds = frame_seconds
+        self.max_areas = max_areas
+        self._dirty: Dict[str, Tuple[int, int, str, str]] = {}  # id -> (latE5, lngE5, status, name)
+        self._transitions: List[list] = []
+        self._evicted: List[str] = []
+        self._sent: Dict[str, Tuple[int, int]] = {}  # id -> last position sent to consoles
+        self._details: Dict[str, Tuple[str, str]] = {}  # id -> (status, userName) last sent
+        self._groups: Dict[str, _ConsoleGroup] = {}  # room -> group
+        self._subscriptions: Dict[str, str] = {}  # sid -> room
+        self._lock = threading.Lock()
+        self._running = False
+        self._counters = {"frames": 0, "changes": 0}
+
+    # Change capture (called on the request path, O(1))
+
+    def mark_moved(self, session):
+        """Record a session's latest position."""
+        if session.last_lat is None:
+            return
+        entry = (_scaled(session.last_lat), _scaled(session.last_lng),
+                 session.status.value, session.user_name)
+        with self._lock:
+            self._dirty[session.id] = entry
+
+    def mark_status(self, session, previous):
+        """
+        Record a status transition.
+
+        Args:
+            session: The WalkSession, already in its new status
+            previous: SessionStatus before the change
+        """
+        with self._lock:
+            self._transitions.append([
+                session.id, previous.value, session.status.value, session.status_changed_at
+            ])
+        self.mark_moved(session)
+
+    def mark_evicted(self, session_id: str):
+        """Record that a session left the live set."""
+        with self._lock:
+            self._evicted.append(session_id)
+
+    # Subscriptions
+
+    def subscribe(self, sid: str, bbox: Optional[BBox] = None) -> Tuple[str, dict]:
+        """
+        Subscribe a console to all sessions or to a bounding box.
+
+        Args:
+            sid: Socket.IO session ID of the console
+            bbox: (south, west, north, east) in degrees, or None for all sessions
+
+        Returns:
+            Tuple of (room to join, snapshot of the sessions in the area, in the
+            same shape as a frame with only "added")
+
+        Raises:
+            ValueError: If the area is new and max_areas areas are already in use
+        """
+        scaled = tuple(_scaled(v) for v in bbox) if bbox is not None else None
+        room = "console:all" if scaled is None else "console:" + ",".join(map(str, scaled))
+
+        with self._lock:
+            group = self._groups.get(room)
+            if group is None and len(self._groups) >= self.max_areas and not self._sole_subscriber_locked(sid):
+                raise ValueError(f"Too many console areas (at most {self.max_areas}); subscribe to an existing one")
+            self._unsubscribe_locked(sid)
+            if group is None:
+                group = self._groups[room] = _ConsoleGroup(room, scaled)
+                group.known = {
+                    session_id for session_id, (lat, lng) in self._sent.items()
+                    if group.contains(lat, lng)
+                }
+            group.subscribers.add(sid)
+            self._subscriptions[sid] = room
+            # Positions as last sent, so the next frame's offsets line up
+            added = [
+                [session_id, *self._sent[session_id], *self._details.get(session_id, ("", ""))]
+                for session_id in group.known
+            ]
+        return room, {"frame": group.frame, "at": time.time(), "added": added}
+
+    def subscription(self, sid: str) -> Optional[str]:
+        """The room a console is subscribed to, if any."""
+        with self._lock:
+            return self._subscriptions.get(sid)
+
+    def unsubscribe(self, sid: str) -> Optional[str]:
+        """Remove a console; returns the room it should leave."""
+        with self._lock:
+            return self._unsubscribe_locked(sid)
+
+    def _sole_subscriber_locked(self, sid: str) -> bool:
+        """Whether unsubscribing sid frees its area."""
+        group = self._groups.get(self._subscriptions.get(sid))
+        return group is not None and group.subscribers == {sid}
+
+    def _unsubscribe_locked(self, sid: str) -> Optional[str]:
+        room = self._subscriptions.pop(sid, None)
+        group = self._groups.get(room)
+        if group is not None:
+            group.subscribers.discard(sid)
+            if not group.subscribers:
+                del self._groups[room]
+        return room
+
+    # Frames
+
+    def start(self, socketio_instance, publish):
+        """
+        Start producing frames in a background task.
+
+        Args:
+            socketio_instance: SocketIO instance providing sleep/background tasks
+            publish: Callable(room, event, payload) used to emit frames
+        """
+        if self._running:
+            return
+        self._running = True
+
+        def run():
+            while True:
+                socketio_instance.sleep(self.frame_seconds)
+                try:
+                    for room, frame in self.build_frames():
+                        publish(room, "console_frame", frame)
+                except Exception as e:
+                    print(f"Error building console frames: {e}")
+
+        socketio_instance.start_background_task(run)
+
+    def build_frames(self, now: Optional[float] = None) -> List[Tuple[str, dict]]:
+        """
+        Turn the changes since the last call into one frame per console area.
+
+        Returns:
+            List of (room, frame) for areas with changes
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            transitions, self._transitions = self._transitions, []
+            evicted, self._evicted = self._evicted, []
+            for session_id in evicted:
+                dirty.pop(session_id, None)
+            self._counters["changes"] += len(dirty) + len(transitions) + len(evicted)
+
+            frames = []
+            for group in self._groups.values():
+                frame = self._build_group_frame(group, dirty, transitions, evicted, now)
+                if frame is not None:
+                    frames.append((group.room, frame))
+
+            for session_id, (lat, lng, status, name) in dirty.items():
+                self._sent[session_id] = (lat, lng)
+                self._details[session_id] = (status, name)
+            for session_id in evicted:
+                self._sent.pop(session_id, None)
+                self._details.pop(session_id, None)
+            self._counters["frames"] += len(frames)
+        return frames
+
+    def _build_group_frame(self, group, dirty, transitions, evicted, now) -> Optional[dict]:
+        added, moved, removed = [], [], []
+        for session_id, (lat, lng, status, name) in dirty.items():
+            if group.contains(lat, lng):
+                if session_id in group.known:
+                    prev_lat, prev_lng = self._sent[session_id]
+                    if (lat, lng) != (prev_lat, prev_lng):
+                        moved.append([session_id, lat - prev_lat, lng - prev_lng])
+                else:
+                    added.append([session_id, lat, lng, status, name])
+                    group.known.add(session_id)
+            elif session_id in group.known:
+                removed.append(session_id)
+                group.known.discard(session_id)
+        for session_id in evicted:
+            if session_id in group.known:
+                removed.append(session_id)
+                group.known.discard(session_id)
+
+        visible = [
+            t for t in transitions
+            if group.bbox is None or t[0] in group.known or t[0] in removed
+        ]
+        if not (added or moved or removed or visible):
+            return None
+        group.frame += 1
+        return {
+            "frame": group.frame,
+            "at": now,
+            "added": added,
+            "moved": moved,
+            "removed": removed,
+            "transitions": visible,
+        }
+
+    def metrics(self) -> dict:
+        """Console areas, subscribers, pending changes and counters."""
+        with self._lock:
+            return {
+                "areas": len(self._groups),
+                "subscribers": len(self._subscriptions),
+                "pendingChanges": len(self._dirty) + len(self._transitions) + len(self._evicted),
+                "tracked": len(self._sent),
+                **self._counters,
+            }
@@ -0,0 +1,108 @@
+"""
+Incremental off-route and alert-zone detection for active walk sessions.
+
+Each fix is evaluated in near-constant time: off-route detection reuses the
+route projection already computed for the ETA, and alert zones (circles and
+polygons) are looked up in the shared AlertZoneIndex, so only zones in the
+walker's cell are tested.
+Hysteresis (separate enter/exit thresholds plus a confirmation count for
+leaving the route) keeps GPS jitter from flapping events.
+"""
+from typing import List, Optional, Set, Tuple
+from app.services.alert_zones import AlertZoneIndex, alert_zones
+
+
+class GeofenceState:
+    """Per-session detection state."""
+
+    __slots__ = ("off_route", "off_route_streak", "inside_zones")
+
+    def __init__(self):
+        self.off_route = False
+        self.off_route_streak = 0
+        self.inside_zones: Set[str] = set()
+
+
+class GeofenceEngine:
+    """Evaluates location fixes against the session's route corridor and alert zones."""
+
+    def __init__(
+        self,
+        zones: Optional[AlertZoneIndex] = None,
+        off_route_enter_meters: float = 50.0,
+        off_route_exit_meters: float = 25.0,
+        off_route_confirm_fixes: int = 2,
+        zone_exit_margin_meters: float = 20.0
+    ):
+        """
+        Args:
+            zones: Alert zone index to test fixes against (the shared UW
+                Alerts index by default)
+        """
+        self.zones = alert_zones if zones is None else zones
+        self.off_route_enter_meters = off_route_enter_meters
+        self.off_route_exit_meters = off_route_exit_meters
+        self.off_route_confirm_fixes = off_route_confirm_fixes
+        self.zone_exit_margin_meters = zone_exit_margin_meters
+
+    def evaluate(self, session, lat: float, lng: float) -> List[Tuple[str, dict]]:
+        """
+        Evaluate one fix and return the events to emit for state transitions.
+
+        Args:
+            session: The WalkSession (its route_progress must already include this fix)
+            lat: Latitude
+            lng: Longitude
+
+        Returns:
+            List of (event name, payload) tuples
+        """
+        state = session.geofence
+        if state is None:
+            state = session.geofence = GeofenceState()
+
+        events = []
+        location = {"lat": lat, "lng": lng}
+
+        # Route corridor, using the projection computed for the ETA
+        progress = session.route_progress
+        if progress is not None and progress.offset_meters is not None:
+            offset = progress.offset_meters
+            if not state.off_route:
+                if offset > self.off_route_enter_meters:
+                    state.off_route_streak += 1
+                    if state.off_route_streak >= self.off_route_confirm_fixes:
+                        state.off_route = True
+                        events.append(("off_route", {
+                            "offRoute": True,
+                            "distanceMeters": round(offset),
+                            "lastLocation": location,
+                        }))
+                else:
+                    state.off_route_streak = 0
+            elif offset < self.off_route_exit_meters:
+                state.off_route = False
+                state.off_route_streak = 0
+                events.append(("off_route", {
+                    "offRoute": False,
+                    "distanceMeters": round(offset),
+                    "lastLocation": location,
+                }))
+
+        # Zones the walker is in or has left (past the exit margin); zones
+        # removed from the index are forgotten without an event
+        for zone_id in list(state.inside_zones):
+            zone = self.zones.get(zone_id)
+            if zone is None:
+                state.inside_zones.discard(zone_id)
+            elif zone.distance_to(lat, lng) > self.zone_exit_margin_meters:
+                state.inside_zones.discard(zone_id)
+                events.append(("zone_exited", {"zone": zone.to_dict(), "lastLocation": location}))
+
+        # Zones entered with this fix
+        for zone in self.zones.containing(lat, lng):
+            if zone.zone_id not in state.inside_zones:
+                state.inside_zones.add(zone.zone_id)
+                events.append(("zone_entered", {"zone": zone.to_dict(), "lastLocation": location}))
+
+        return events
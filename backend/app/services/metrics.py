@@ -0,0 +1,64 @@
+"""
+Lightweight in-process metrics registry.
+
+Subsystems register a callable that returns a dict of their current metrics;
+GET /metrics collects them all.
+"""
+import threading
+from collections import deque
+from typing import Callable, Dict
+
+_providers: Dict[str, Callable[[], dict]] = {}
+
+
+def register(name: str, provider: Callable[[], dict]):
+    """
+    Register a metrics provider.
+
+    Args:
+        name: Section name in the metrics response
+        provider: Callable returning a JSON-serializable dict
+    """
+    _providers[name] = provider
+
+
+def collect() -> dict:
+    """Collect metrics from every registered provider."""
+    result = {}
+    for name, provider in list(_providers.items()):
+        try:
+            result[name] = provider()
+        except Exception as e:
+            result[name] = {"error": str(e)}
+    return result
+
+
+class LatencyStats:
+    """Rolling latency statistics over the most recent samples."""
+
+    def __init__(self, window: int = 1000):
+        self._samples = deque(maxlen=window)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        """Record one latency sample in seconds."""
+        with self._lock:
+            self._samples.append(seconds)
+            self._count += 1
+
+    def summary(self) -> dict:
+        """Count plus mean, p50, p95 and max in milliseconds over the window."""
+        with self._lock:
+            samples = sorted(self._samples)
+            count = self._count
+        if not samples:
+            return {"count": count, "meanMs": None, "p50Ms": None, "p95Ms": None, "maxMs": None}
+        n = len(samples)
+        return {
+            "count": count,
+            "meanMs": round(sum(samples) / n * 1000, 2),
+            "p50Ms": round(samples[n // 2] * 1000, 2),
+            "p95Ms": round(samples[min(n - 1, int(n * 0.95))] * 1000, 2),
+            "maxMs": round(samples[-1] * 1000, 2),
+        }
@@ -0,0 +1,362 @@
+"""
+Asynchronous notification dispatcher for Auto-Notify and alerts.
+
+Request handlers enqueue notifications and return immediately. A pool of
+worker threads drains a bounded queue, batches sends to the same channel and
+recipient, retries failures with exponential backoff, and suppresses
+repeats of the same event occurrence (never panics). When part of a batch
+was sent before a failure, only the rest is retried. Part of the queue is
+reserved for urgent events (panics), so a backlog of routine notifications
+cannot crowd them out.
+
+Webhook URLs come from the unauthenticated session request, so they are only
+POSTed to over https, to an allow-listed host when one is configured, and
+never to private, loopback or link-local addresses.
+"""
+import ipaddress
+import queue
+import smtplib
+import socket
+import threading
+import time
+from email.message import EmailMessage
+from typing import Dict, Iterable, List
+from urllib.parse import urlsplit
+import requests
+from app.models.notification import Notification
+from app.services.metrics import LatencyStats
+
+
+class DeliveryError(Exception):
+    """A batch failed part way; `delivered` lists the notifications that were sent."""
+
+    def __init__(self, delivered: List[Notification], cause: Exception):
+        super().__init__(str(cause))
+        self.delivered = delivered
+        self.cause = cause
+
+
+class RejectedRecipient(Exception):
+    """The recipient may not be sent to; the notification is not retried."""
+
+
+def check_webhook_url(url: str, allowed_hosts: Iterable[str] = (), resolve: bool = True):
+    """
+    Check that a webhook URL is safe to POST to.
+
+    Args:
+        url: The webhook URL
+        allowed_hosts: Host names webhooks may target; empty allows any public host
+        resolve: Whether to resolve the host name and check every address it
+            resolves to (literal IP addresses are always checked)
+
+    Raises:
+        RejectedRecipient: If the URL is not https, its host is not allowed or
+            it points at a private, loopback, link-local or otherwise
+            non-public address
+    """
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        port = parts.port or 443
+    except (ValueError, AttributeError):
+        raise RejectedRecipient(f"Malformed webhook URL: {url!r}")
+    if parts.scheme != "https" or not host:
+        raise RejectedRecipient(f"Webhook URL must be https: {url!r}")
+    allowed = {h.lower() for h in allowed_hosts}
+    if allowed and host not in allowed:
+        raise RejectedRecipient(f"Webhook host not allowed: {host}")
+
+    try:
+        addresses = [ipaddress.ip_address(host)]
+    except ValueError:
+        if not resolve:
+            return
+        addresses = [
+            ipaddress.ip_address(info[4][0].split("%")[0])
+            for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
+        ]
+    for address in addresses:
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global:
+            raise RejectedRecipient(f"Webhook host {host} resolves to non-public address {address}")
+
+
+class ConsoleAdapter:
+    """Logs notifications to the console (SMS until a provider is integrated)."""
+
+    def send_batch(self, recipient: str, notifications: List[Notification]):
+        for notification in notifications:
+            print(f"[AUTO-NOTIFY:{notification.channel}] To {recipient}: {notification.message}")
+
+
+class SmtpAdapter:
+    """Sends email through an SMTP server, one connection per batch."""
+
+    def __init__(self, host: str, port: int, sender: str, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.timeout = timeout
+
+    def send_batch(self, recipient: str, notifications: List[Notification]):
+        """
+        Raises:
+            DeliveryError: If sending failed after some messages went out
+        """
+        sent = []
+        try:
+            with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+                for notification in notifications:
+                    message = EmailMessage()
+                    message["From"] = self.sender
+                    message["To"] = recipient
+                    message["Subject"] = f"SafeWalk AI: {notification.event}"
+                    message.set_content(notification.message)
+                    smtp.send_message(message)
+                    sent.append(notification)
+        except Exception as e:
+            if sent:
+                raise DeliveryError(sent, e) from e
+            raise
+
+
+class WebhookAdapter:
+    """POSTs a JSON batch of notifications to the recipient URL."""
+
+    def __init__(self, timeout: float = 10.0, allowed_hosts: Iterable[str] = ()):
+        """
+        Args:
+            timeout: Request timeout in seconds
+            allowed_hosts: Host names webhooks may target; empty allows any public host
+        """
+        self.timeout = timeout
+        self.allowed_hosts = frozenset(allowed_hosts)
+
+    def send_batch(self, recipient: str, notifications: List[Notification]):
+        """
+        Raises:
+            RejectedRecipient: If the URL fails check_webhook_url
+        """
+        check_webhook_url(recipient, self.allowed_hosts)
+        # Redirects are not followed: they could lead to an address we would refuse
+        response = requests.post(recipient, allow_redirects=False, json={
+            "notifications": [
+                {
+                    "sessionId": n.session_id,
+                    "event": n.event,
+                    "message": n.message,
+                    "payload": n.payload,
+                    "createdAt": n.created_at,
+                }
+                for n in notifications
+            ]
+        }, timeout=self.timeout)
+        response.raise_for_status()
+        if response.is_redirect:
+            raise RejectedRecipient(f"Webhook {recipient} answered with a redirect")
+
+
+class NotificationDispatcher:
+    """Bounded queue plus worker pool that delivers notifications off the request path."""
+
+    def __init__(
+        self,
+        adapters: Dict[str, object],
+        workers: int = 4,
+        queue_size: int = 1000,
+        reserved_slots: int = 100,
+        batch_size: int = 20,
+        max_retries: int = 3,
+        backoff_seconds: float = 1.0,
+        dedup_seconds: float = 600.0
+    ):
+        """
+        Args:
+            adapters: Channel name -> adapter with send_batch(recipient, notifications)
+            workers: Number of worker threads
+            queue_size: Maximum queued routine notifications; further submits are dropped
+            reserved_slots: Extra queue capacity only urgent notifications may use
+            batch_size: Maximum notifications taken per batch
+            max_retries: Retries after the first failed attempt
+            backoff_seconds: Base delay, doubled on each retry
+            dedup_seconds: Window in which a repeat of the same (session, event,
+                occurrence) is suppressed
+        """
+        self.adapters = adapters
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.dedup_seconds = dedup_seconds
+        self.queue_size = queue_size
+        self._queue = queue.Queue(maxsize=queue_size + reserved_slots)
+        self._recent = {}  # dedup key -> time submitted
+        self._lock = threading.Lock()
+        self._threads = []
+        self._latency = LatencyStats()
+        self._counters = {
+            "submitted": 0,
+            "delivered": 0,
+            "failed": 0,
+            "retried": 0,
+            "deduplicated": 0,
+            "dropped": 0,
+            "urgentDropped": 0,
+        }
+
+    def start(self):
+        """Start the worker threads (idempotent)."""
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"notify-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, notification: Notification) -> bool:
+        """
+        Queue a notification without blocking.
+
+        Args:
+            notification: The notification to deliver
+
+        Returns:
+            True if queued, False if it was a duplicate or the queue is full
+        """
+        now = time.time()
+        key = notification.dedup_key
+        with self._lock:
+            self._prune_recent(now)
+            if key is not None:
+                if key in self._recent:
+                    self._counters["deduplicated"] += 1
+                    return False
+                self._recent[key] = now
+            self._counters["submitted"] += 1
+
+        if not self._enqueue(notification):
+            if key is not None:
+                with self._lock:
+                    self._recent.pop(key, None)
+            return False
+        return True
+
+    def metrics(self) -> dict:
+        """Queue depth, delivery counters and delivery latency."""
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "queueDepth": self._queue.qsize(),
+            "workers": len(self._threads),
+            **counters,
+            "deliveryLatency": self._latency.summary(),
+        }
+
+    def _enqueue(self, notification: Notification) -> bool:
+        # Routine notifications stop at queue_size; the rest is kept for urgent ones
+        if notification.urgent or self._queue.qsize() < self.queue_size:
+            try:
+                self._queue.put_nowait(notification)
+                return True
+            except queue.Full:
+                pass
+        with self._lock:
+            self._counters["dropped"] += 1
+            if notification.urgent:
+                self._counters["urgentDropped"] += 1
+        if notification.urgent:
+            print(
+                f"CRITICAL: notification queue exhausted including reserved capacity, "
+                f"{notification.event} for {notification.session_id} was NOT delivered"
+            )
+        else:
+            print(f"Notification queue full, dropping {notification.event} for {notification.session_id}")
+        return False
+
+    def _prune_recent(self, now: float):
+        cutoff = now - self.dedup_seconds
+        if self._recent and next(iter(self._recent.values())) < cutoff:
+            self._recent = {key: ts for key, ts in self._recent.items() if ts >= cutoff}
+
+    def _worker(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Group by destination so each adapter call carries a batch
+            groups = {}
+            for notification in batch:
+                groups.setdefault((notification.channel, notification.recipient), []).append(notification)
+            for (channel, recipient), notifications in groups.items():
+                self._deliver(channel, recipient, notifications)
+
+            for _ in batch:
+                self._queue.task_done()
+
+    def _deliver(self, channel: str, recipient: str, notifications: List[Notification]):
+        adapter = self.adapters.get(channel) or self.adapters.get("default")
+        delivered = notifications
+        try:
+            if adapter is None:
+                raise ValueError(f"No adapter for channel '{channel}'")
+            adapter.send_batch(recipient, notifications)
+        except RejectedRecipient as e:
+            print(f"Refusing {len(notifications)} {channel} notification(s): {e}")
+            delivered = []
+            with self._lock:
+                self._counters["failed"] += len(notifications)
+        except Exception as e:
+            delivered = e.delivered if isinstance(e, DeliveryError) else []
+            undelivered = [n for n in notifications if not any(n is d for d in delivered)]
+            print(f"Error delivering {len(undelivered)} {channel} notification(s): {e}")
+            for notification in undelivered:
+                self._retry(notification)
+
+        now = time.time()
+        with self._lock:
+            self._counters["delivered"] += len(delivered)
+        for notification in delivered:
+            self._latency.record(now - notification.created_at)
+
+    def _retry(self, notification: Notification):
+        notification.attempts += 1
+        if notification.attempts > self.max_retries:
+            with self._lock:
+                self._counters["failed"] += 1
+            return
+        with self._lock:
+            self._counters["retried"] += 1
+        delay = self.backoff_seconds * (2 ** (notification.attempts - 1))
+        timer = threading.Timer(delay, self._enqueue, args=(notification,))
+        timer.daemon = True
+        timer.start()
+
+
+def build_dispatcher(
+    smtp_host: str,
+    smtp_port: int,
+    smtp_sender: str,
+    webhook_allowed_hosts: Iterable[str] = (),
+    **kwargs
+) -> NotificationDispatcher:
+    """
+    Build the dispatcher with the standard channel adapters.
+
+    SMS is logged to the console until an SMS provider is integrated.
+    """
+    console = ConsoleAdapter()
+    return NotificationDispatcher(
+        adapters={
+            "sms": console,
+            "email": SmtpAdapter(smtp_host, smtp_port, smtp_sender),
+            "webhook": WebhookAdapter(allowed_hosts=webhook_allowed_hosts),
+            "default": console,
+        },
+        **kwargs
+    )
@@ -0,0 +1,154 @@
+"""
+Proximity lookups around a point: nearest callboxes, walkers and responders.
+
+Live walker and responder positions are kept in PointIndex grids that are
+updated on every location fix, so a panic can be answered from the cells
+around the walker instead of scanning every session.
+"""
+import threading
+import time
+from typing import Dict, Hashable, List, Optional, Tuple
+from app.services.metrics import LatencyStats
+from app.utils.spatial_grid import PointIndex
+
+
+class ProximityService:
+    """Spatial indexes of callboxes, active walkers and on-duty responders."""
+
+    def __init__(self, cell_meters: float = 100.0):
+        self.walkers = PointIndex(cell_meters)
+        self.responders = PointIndex(cell_meters)
+        self.callboxes = PointIndex(cell_meters)
+        self._responder_info: Dict[Hashable, dict] = {}  # responder_id -> {"name", "updatedAt"}
+        self._walker_names: Dict[Hashable, str] = {}  # session_id -> userName
+        self._lock = threading.Lock()
+        self._query_latency = LatencyStats()
+
+    # Updates
+
+    def update_walker(self, session_id: str, lat: float, lng: float, user_name: str = ""):
+        """Insert or move a walker."""
+        with self._lock:
+            self.walkers.move(session_id, lat, lng)
+            self._walker_names[session_id] = user_name
+
+    def remove_walker(self, session_id: str):
+        """Stop tracking a walker (walk over or evicted)."""
+        with self._lock:
+            self.walkers.remove(session_id)
+            self._walker_names.pop(session_id, None)
+
+    def clear_walkers(self):
+        """Stop tracking every walker."""
+        with self._lock:
+            self.walkers.clear()
+            self._walker_names.clear()
+
+    def update_responder(self, responder_id: str, lat: float, lng: float, name: str = ""):
+        """Insert or move an on-duty responder."""
+        with self._lock:
+            self.responders.move(responder_id, lat, lng)
+            self._responder_info[responder_id] = {"name": name, "updatedAt": time.time()}
+
+    def remove_responder(self, responder_id: str) -> bool:
+        """Take a responder off duty; returns False if they were not on duty."""
+        with self._lock:
+            if responder_id not in self.responders:
+                return False
+            self.responders.remove(responder_id)
+            self._responder_info.pop(responder_id, None)
+            return True
+
+    def walkers_within(self, lat: float, lng: float, radius_meters: float) -> List[Tuple[float, Hashable]]:
+        """Walkers within a radius as (distance, session ID), nearest first."""
+        with self._lock:
+            return self.walkers.within(lat, lng, radius_meters)
+
+    def walker_position(self, session_id: str) -> Optional[Tuple[float, float]]:
+        """A walker's last indexed (lat, lng), or None."""
+        with self._lock:
+            return self.walkers.get(session_id)
+
+    def set_callboxes(self, callboxes: List):
+        """
+        Replace the callbox index.
+
+        Args:
+            callboxes: Coordinates (objects with lat and lng) of every callbox
+        """
+        index = PointIndex(self.callboxes.cell_meters)
+        for i, callbox in enumerate(callboxes):
+            index.move(i, callbox.lat, callbox.lng)
+        with self._lock:
+            self.callboxes = index
+
+    # Queries
+
+    def nearby(
+        self,
+        lat: float,
+        lng: float,
+        k: int = 3,
+        radius_meters: Optional[float] = None,
+        exclude_walker: Optional[str] = None,
+        include_names: bool = False
+    ) -> dict:
+        """
+        Nearest callboxes, walkers and responders around a point.
+
+        Args:
+            lat, lng: Query point
+            k: Maximum results per kind
+            radius_meters: Only include results within this distance
+            exclude_walker: Session ID to leave out (the walker asking)
+            include_names: Include walkers' userName (for security consoles)
+
+        Returns:
+            {"callboxes": [...], "walkers": [...], "responders": [...]}, each
+            entry with "lat", "lng" and "distanceMeters", nearest first.
+            Walkers never carry their session ID, since it grants write
+            access to the walk.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            callboxes = self._describe(
+                self.callboxes, self.callboxes.nearest(lat, lng, k, radius_meters), "callboxId"
+            )
+            # Ask for one extra walker in case the excluded one is among them
+            walker_hits = [
+                hit for hit in self.walkers.nearest(lat, lng, k + 1, radius_meters)
+                if hit[1] != exclude_walker
+            ][:k]
+            walkers = self._describe(self.walkers, walker_hits, "sessionId")
+            for walker in walkers:
+                session_id = walker.pop("sessionId")
+                if include_names:
+                    walker["userName"] = self._walker_names.get(session_id, "")
+            responders = self._describe(
+                self.responders, self.responders.nearest(lat, lng, k, radius_meters), "responderId"
+            )
+            for responder in responders:
+                responder.update(self._responder_info.get(responder["responderId"], {}))
+        self._query_latency.record(time.perf_counter() - started)
+        return {"callboxes": callboxes, "walkers": walkers, "responders": responders}
+
+    def metrics(self) -> dict:
+        """Index sizes and query latency."""
+        return {
+            "walkers": len(self.walkers),
+            "responders": len(self.responders),
+            "callboxes": len(self.callboxes),
+            "queryLatency": self._query_latency.summary(),
+        }
+
+    def _describe(self, index: PointIndex, hits, key_name: str) -> List[dict]:
+        results = []
+        for distance, key in hits:
+            lat, lng = index.get(key)
+            results.append({
+                key_name: key,
+                "lat": lat,
+                "lng": lng,
+                "distanceMeters": round(distance),
+            })
+        return results
@@ -0,0 +1,70 @@
+"""
+Server-recommended interval until a walker's next location report.
+
+Walkers report at whatever rate the server suggests in each acknowledgement.
+Walks that need close tracking (panic, off route, inside an alert zone, close
+to the destination) get short intervals; steady walking is sampled about
+every `meters_per_report` meters, a walker standing still reports rarely, and
+routine intervals stretch while the server is under load.
+"""
+from math import ceil
+from typing import Optional
+from app.models.session import SessionStatus
+from app.utils.route_progress import DEFAULT_WALKING_SPEED
+
+STATIONARY_SPEED = 0.3  # m/s - below this the walker is treated as standing still
+OFF_ROUTE_SECONDS = 2.0
+ALERT_ZONE_SECONDS = 3.0
+ARRIVAL_WATCH_METERS = 75.0  # Track closely for the last stretch
+ARRIVAL_WATCH_SECONDS = 5.0
+
+
+def recommend_report_interval(
+    session,
+    load: float = 0.0,
+    min_seconds: float = 1.0,
+    max_seconds: float = 30.0,
+    meters_per_report: float = 25.0
+) -> Optional[int]:
+    """
+    Seconds until the walker should send the next location report.
+
+    Args:
+        session: The WalkSession that just reported
+        load: Server load from 0 (idle) to 1 (saturated); stretches routine intervals
+        min_seconds: Shortest interval ever recommended (used during panic);
+            fractions round up, and the result is never below 1
+        max_seconds: Longest interval ever recommended
+        meters_per_report: Distance a steadily walking walker covers between reports
+
+    Returns:
+        Whole seconds, or None when the walk is over and reporting can stop
+    """
+    if session.is_terminal:
+        return None
+    if session.status == SessionStatus.PANIC:
+        return _whole_seconds(min_seconds, min_seconds)
+
+    # Situations that need close tracking regardless of load
+    geofence = session.geofence
+    if geofence is not None and geofence.off_route:
+        return _whole_seconds(OFF_ROUTE_SECONDS, min_seconds)
+    if geofence is not None and geofence.inside_zones:
+        return _whole_seconds(ALERT_ZONE_SECONDS, min_seconds)
+
+    progress = session.route_progress
+    speed = progress.speed if progress else DEFAULT_WALKING_SPEED
+    if progress and progress.remaining_meters < ARRIVAL_WATCH_METERS:
+        interval = ARRIVAL_WATCH_SECONDS
+    elif speed < STATIONARY_SPEED:
+        interval = max_seconds
+    else:
+        interval = meters_per_report / speed
+
+    interval *= 1.0 + min(max(load, 0.0), 1.0)
+    return _whole_seconds(min(interval, max_seconds), min_seconds)
+
+
+def _whole_seconds(seconds: float, min_seconds: float) -> int:
+    """Round to whole seconds without going below min_seconds (rounded up) or 1."""
+    return max(1, ceil(min_seconds), int(round(seconds)))
@@ -0,0 +1,198 @@
+"""
+Prioritized outbound event path for session rooms.
+
+All room broadcasts go through a RoomEventDispatcher instead of calling
+socketio.emit directly. Safety events (panic, inactivity, arrival, geofence
+transitions) go into a priority lane that is always drained first and is
+never coalesced or dropped. Routine events follow in bounded slices, and pending location
+updates for the same room are coalesced so only the newest position is sent.
+Every emitted session event is also recorded in the optional SessionFeed,
+which numbers it within its room (the number is sent as the payload's "seq")
+and keeps it for SSE, long-poll and reconnecting Socket.IO companions.
+Console frames are not session events and skip the feed. With
+ClientOutboxes, events are then queued per connection so a slow client only
+backs up its own bounded queue.
+"""
+import threading
+import time
+from collections import deque
+from app.services.metrics import LatencyStats
+
+# Never coalesced or dropped, always sent ahead of routine traffic
+PRIORITY_EVENTS = frozenset({
+    "panic",
+    "panic_resolved",
+    "inactivity_alert",
+    "arrived",
+    "arrival_notification",
+    "alert_nearby",
+    "off_route",
+    "zone_entered",
+    "zone_exited",
+})
+
+# Superseded by the next event of the same name for the same room
+COALESCED_EVENTS = frozenset({"location_update"})
+
+# Not session events: never numbered or kept for replay by the SessionFeed
+UNRECORDED_EVENTS = frozenset({"console_frame"})
+
+
+class RoomEventDispatcher:
+    """Two-lane outbound queue drained by a background task."""
+
+    def __init__(
+        self,
+        routine_batch: int = 100,
+        idle_wait_seconds: float = 0.05,
+        feed=None,
+        outboxes=None
+    ):
+        """
+        Args:
+            routine_batch: Routine events sent before re-checking the priority lane
+            idle_wait_seconds: Maximum wait for new events, bounding latency of
+                events published from threads that cannot wake the drain task
+            feed: Optional SessionFeed that records every emitted session event
+            outboxes: Optional ClientOutboxes used once the drain task runs
+        """
+        self.routine_batch = routine_batch
+        self.idle_wait_seconds = idle_wait_seconds
+        self.feed = feed
+        self.outboxes = outboxes
+        self.socketio = None
+        self._priority = deque()  # (room, event, payload, enqueued_at)
+        self._routine = deque()  # (room, event, payload, enqueued_at)
+        self._coalesced = {}  # (room, event) -> (payload, enqueued_at)
+        self._lock = threading.Lock()
+        self._wakeup = None
+        self._running = False
+        self._panic_latency = LatencyStats()
+        self._priority_latency = LatencyStats()
+        self._routine_latency = LatencyStats()
+        self._counters = {"priority": 0, "routine": 0, "coalesced": 0}
+
+    def start(self, socketio_instance):
+        """
+        Start draining in a background task. Until started, publish emits inline.
+
+        Args:
+            socketio_instance: The SocketIO instance to emit on
+        """
+        self.socketio = socketio_instance
+        if self._running:
+            return
+        self._wakeup = socketio_instance.server.eio.create_event()
+        if self.feed:
+            self.feed.use_event_factory(socketio_instance.server.eio.create_event)
+        self._running = True
+        socketio_instance.start_background_task(self._run)
+
+    def publish(self, room: str, event: str, payload: dict):
+        """
+        Queue an event for every client in a room.
+
+        Args:
+            room: Room name (the session ID)
+            event: Socket.IO event name
+            payload: Event data
+        """
+        enqueued_at = time.perf_counter()
+
+        if not self._running:
+            if self.socketio:
+                self._emit(room, event, payload, enqueued_at)
+            return
+
+        if event in PRIORITY_EVENTS:
+            self._priority.append((room, event, payload, enqueued_at))
+        elif event in COALESCED_EVENTS:
+            key = (room, event)
+            with self._lock:
+                previous = self._coalesced.get(key)
+                if previous is not None:
+                    # Keep the original enqueue time (and queue position) so a
+                    # busy room cannot starve behind its own updates
+                    self._counters["coalesced"] += 1
+                    enqueued_at = previous[1]
+                self._coalesced[key] = (payload, enqueued_at)
+        else:
+            self._routine.append((room, event, payload, enqueued_at))
+
+        self._wakeup.set()
+
+    def backlog(self) -> int:
+        """Events waiting in either lane."""
+        return len(self._priority) + len(self._routine) + len(self._coalesced)
+
+    def metrics(self) -> dict:
+        """Lane depths, counters and per-lane emit latency."""
+        with self._lock:
+            counters = dict(self._counters)
+            coalesced_pending = len(self._coalesced)
+        return {
+            "priorityDepth": len(self._priority),
+            "routineDepth": len(self._routine) + coalesced_pending,
+            **counters,
+            "panicLatency": self._panic_latency.summary(),
+            "priorityLatency": self._priority_latency.summary(),
+            "routineLatency": self._routine_latency.summary(),
+        }
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.idle_wait_seconds)
+            self._wakeup.clear()
+            try:
+                self._drain()
+                # Retry clients whose transport backlog held messages back
+                if self.outboxes:
+                    self.outboxes.flush(self.socketio.server)
+            except Exception as e:
+                print(f"Error emitting room events: {e}")
+
+    def _drain(self):
+        while self._priority or self._routine or self._coalesced:
+            # Priority lane first, all of it
+            while self._priority:
+                room, event, payload, enqueued_at = self._priority.popleft()
+                self._emit(room, event, payload, enqueued_at)
+
+            # Then a bounded slice of routine traffic
+            budget = self.routine_batch
+            while budget and self._routine and not self._priority:
+                room, event, payload, enqueued_at = self._routine.popleft()
+                self._emit(room, event, payload, enqueued_at)
+                budget -= 1
+            while budget and self._coalesced and not self._priority:
+                with self._lock:
+                    key = next(iter(self._coalesced))
+                    payload, enqueued_at = self._coalesced.pop(key)
+                self._emit(key[0], key[1], payload, enqueued_at)
+                budget -= 1
+
+            if self.outboxes:
+                self.outboxes.flush(self.socketio.server)
+
+            # Let request handlers run so a new panic can jump the queue
+            self.socketio.sleep(0)
+
+    def _emit(self, room: str, event: str, payload: dict, enqueued_at: float):
+        if self.feed and event not in UNRECORDED_EVENTS:
+            seq = self.feed.record(room, event, payload)
+            payload = {**payload, "seq": seq}
+        if self.outboxes and self._running:
+            self.outboxes.fanout(self.socketio.server, room, event, payload)
+        else:
+            self.socketio.emit(event, payload, room=room)
+        latency = time.perf_counter() - enqueued_at
+        if event in PRIORITY_EVENTS:
+            self._priority_latency.record(latency)
+            if event == "panic":
+                self._panic_latency.record(latency)
+            with self._lock:
+                self._counters["priority"] += 1
+        else:
+            self._routine_latency.record(latency)
+            with self._lock:
+                self._counters["routine"] += 1
@@ -3,7 +3,7 @@ Service for calculating safety scores for routes.
 """
 from typing import List, Optional
 from datetime import datetime
-from app.models.route import Route, Waypoint
+from app.models.route import Route
 from app.models.safety import (
     SafetyScore,
     SafetyFactors,
@@ -11,24 +11,42 @@ from app.models.safety import (
     CallboxLocation,
     UWAlert
 )
+from app.services import scoring_engine as engine
+from app.services.alert_zones import AlertZoneIndex
+from app.services.scoring_engine import RouteCandidate, ScoringContext
 
 
 class SafetyScorer:
-    """Service for calculating safety scores based on multiple factors."""
+    """
+    Service for calculating safety scores based on multiple factors.
+    
+    Factor scores come from the batch scoring engine; this class adds the
+    tags and explanation of a single route. Callbox proximity is scored from
+    the callbox list passed in, the same list the tags and explanation
+    describe.
+    """
     
     # Scoring weights (sum should be ~1.0)
-    WEIGHT_CALLBOX = 0.35
-    WEIGHT_VISIBILITY = 0.25
-    WEIGHT_ALERTS = 0.25
-    WEIGHT_TIME_OF_DAY = 0.10
-    WEIGHT_ROUTE_LENGTH = 0.05
+    WEIGHT_CALLBOX = engine.WEIGHT_CALLBOX
+    WEIGHT_VISIBILITY = engine.WEIGHT_VISIBILITY
+    WEIGHT_ALERTS = engine.WEIGHT_ALERTS
+    WEIGHT_TIME_OF_DAY = engine.WEIGHT_TIME_OF_DAY
+    WEIGHT_ROUTE_LENGTH = engine.WEIGHT_LENGTH
     
     # Thresholds
-    CALLBOX_OPTIMAL_DISTANCE = 50.0  # meters - ideal distance
-    CALLBOX_MAX_DISTANCE = 200.0  # meters - beyond this, no benefit
-    VISIBILITY_GOOD = 10000  # meters
-    VISIBILITY_POOR = 1000  # meters
-    ROUTE_LENGTH_PREFERRED = 500.0  # meters - shorter is slightly better
+    CALLBOX_OPTIMAL_DISTANCE = engine.CALLBOX_OPTIMAL_DISTANCE
+    CALLBOX_MAX_DISTANCE = engine.CALLBOX_MAX_DISTANCE
+    VISIBILITY_GOOD = engine.VISIBILITY_GOOD
+    VISIBILITY_POOR = engine.VISIBILITY_POOR
+    ROUTE_LENGTH_PREFERRED = engine.ROUTE_LENGTH_PREFERRED
+    
+    def __init__(self, zones: Optional[AlertZoneIndex] = None):
+        """
+        Args:
+            zones: Alert zone index used to match alerts to the route
+                (defaults to the shared index)
+        """
+        self.zones = zones
     
     def calculate_safety_score(
         self,
@@ -45,7 +63,8 @@ class SafetyScorer:
             route: The route to score
             callboxes: Callboxes along/near the route
             weather_data: Weather data from WeatherService
-            alerts: Active UW alerts
+            alerts: Active UW alerts (only campus-wide alerts and those whose
+                zone lies along the route count against it)
             time_of_day: Current time (defaults to now)
         
         Returns:
@@ -54,31 +73,12 @@ class SafetyScorer:
         if time_of_day is None:
             time_of_day = datetime.now()
         
-        # Calculate individual factor scores
-        callbox_score = self._score_callbox_proximity(callboxes)
-        visibility_score = self._score_weather_visibility(weather_data)
-        alerts_penalty = self._score_alerts(alerts)
-        time_score = self._score_time_of_day(time_of_day)
-        length_score = self._score_route_length(route.distance_meters)
-        
-        factors = SafetyFactors(
-            callbox_proximity_score=callbox_score,
-            weather_visibility_score=visibility_score,
-            alerts_penalty=alerts_penalty,
-            time_of_day_score=time_score,
-            route_length_score=length_score
+        context = ScoringContext.from_weather_data(
+            weather_data, when=time_of_day, alerts=alerts, alert_index=self.zones
         )
-        
-        # Calculate weighted overall score
-        base_score = (
-            callbox_score * self.WEIGHT_CALLBOX +
-            visibility_score * self.WEIGHT_VISIBILITY +
-            time_score * self.WEIGHT_TIME_OF_DAY +
-            length_score * self.WEIGHT_ROUTE_LENGTH
-        )
-        
-        # Apply alerts penalty (subtract from score)
-        final_score = max(0, min(100, base_score - alerts_penalty))
+        result = engine.score_routes([RouteCandidate.from_route(route, callboxes)], context)[0]
+        alerts = result.route_alerts
+        factors = result.factors
         
         # Generate tags
         tags = self._generate_tags(
@@ -91,7 +91,7 @@ class SafetyScorer:
         )
         
         return SafetyScore(
-            score=round(final_score, 1),
+            score=result.weighted_score,
             explanation=explanation,
             tags=tags,
             factors=factors
@@ -99,90 +99,26 @@ class SafetyScorer:
     
     def _score_callbox_proximity(self, callboxes: List[CallboxLocation]) -> float:
         """Score based on proximity to emergency callboxes."""
-        if not callboxes:
-            return 30.0  # Low score if no callboxes nearby
-        
-        # Use the closest callbox
-        closest = min(callboxes, key=lambda x: x.distance_meters)
-        distance = closest.distance_meters
-        
-        if distance <= self.CALLBOX_OPTIMAL_DISTANCE:
-            return 100.0
-        elif distance <= self.CALLBOX_MAX_DISTANCE:
-            # Linear interpolation between optimal and max
-            ratio = (self.CALLBOX_MAX_DISTANCE - distance) / (
-                self.CALLBOX_MAX_DISTANCE - self.CALLBOX_OPTIMAL_DISTANCE
-            )
-            return 50.0 + (ratio * 50.0)
-        else:
-            return 30.0
+        return engine.callbox_score(min(c.distance_meters for c in callboxes) if callboxes else None)
     
     def _score_weather_visibility(self, weather_data: dict) -> float:
         """Score based on weather visibility."""
-        visibility = weather_data.get("visibility_meters", 10000)
-        weather_condition = weather_data.get("weather_condition", "Clear").lower()
-        
-        # Check for poor weather conditions
-        poor_conditions = ["fog", "mist", "haze", "rain", "snow", "storm"]
-        is_poor_weather = any(cond in weather_condition for cond in poor_conditions)
-        
-        if visibility >= self.VISIBILITY_GOOD and not is_poor_weather:
-            return 100.0
-        elif visibility >= self.VISIBILITY_POOR:
-            # Linear interpolation
-            ratio = (visibility - self.VISIBILITY_POOR) / (
-                self.VISIBILITY_GOOD - self.VISIBILITY_POOR
-            )
-            base_score = 50.0 + (ratio * 50.0)
-            # Reduce if poor weather condition
-            return base_score * (0.7 if is_poor_weather else 1.0)
-        else:
-            return 30.0
+        return engine.visibility_score(
+            weather_data.get("visibility_meters", 10000),
+            weather_data.get("weather_condition", "Clear")
+        )
     
     def _score_alerts(self, alerts: List[UWAlert]) -> float:
         """Calculate penalty based on active alerts."""
-        if not alerts:
-            return 0.0
-        
-        # Sum up penalties based on alert severity
-        total_penalty = 0.0
-        for alert in alerts:
-            if not alert.active:
-                continue
-            
-            severity_penalties = {
-                "low": 5.0,
-                "medium": 15.0,
-                "high": 30.0,
-                "critical": 50.0
-            }
-            total_penalty += severity_penalties.get(alert.severity, 15.0)
-        
-        # Cap penalty at 50 points
-        return min(50.0, total_penalty)
+        return engine.alerts_penalty(alerts)
     
     def _score_time_of_day(self, time_of_day: datetime) -> float:
         """Score based on time of day (daylight vs nighttime)."""
-        hour = time_of_day.hour
-        
-        # Daylight hours (roughly 6 AM to 8 PM)
-        if 6 <= hour < 20:
-            return 100.0
-        # Dusk/dawn (5-6 AM, 8-9 PM)
-        elif (5 <= hour < 6) or (20 <= hour < 21):
-            return 70.0
-        # Nighttime
-        else:
-            return 40.0
+        return engine.time_of_day_score(time_of_day)
     
     def _score_route_length(self, distance_meters: float) -> float:
         """Score based on route length (shorter is slightly better)."""
-        if distance_meters <= self.ROUTE_LENGTH_PREFERRED:
-            return 100.0
-        else:
-            # Slight penalty for longer routes
-            ratio = min(1.0, self.ROUTE_LENGTH_PREFERRED / distance_meters)
-            return 70.0 + (ratio * 30.0)
+        return engine.length_score(distance_meters)
     
     def _generate_tags(
         self,
@@ -260,7 +196,7 @@ class SafetyScorer:
         
         # Alerts explanation
         if alerts:
-            parts.append(f"{len(alerts)} active alert{'s' if len(alerts) > 1 else ''} in area")
+            parts.append(f"{len(alerts)} active alert{'s' if len(alerts) > 1 else ''} along the route")
         else:
             parts.append("no active alerts")
         
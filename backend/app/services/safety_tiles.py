@@ -0,0 +1,339 @@
+"""
+Campus safety heatmap tiles (XYZ / Web Mercator, 256 px PNG).
+
+Each tile is a 64 x 64 grid of safety values, one per 4 x 4 pixel block,
+combining callbox proximity (from the callbox distance field), the alert
+zones containing the cell and the time-of-day band. Tiles are rendered on
+first request and kept in a two-tier LRU cache: a small in-memory tier in
+front of a larger on-disk tier. The time-of-day band is part of the cache
+key, so tiles from an earlier band simply age out. When an input changes,
+only the cached tiles overlapping the changed area are dropped: the old and
+new extents of changed alert zones, and the area within the field's distance
+cap around callboxes that were added or removed.
+
+Disk tiles are named after the callbox field version and the digest of the
+alert zones overlapping the tile, so after a restart a tile is served only if
+the field and the zones over that tile are unchanged; an alert elsewhere on
+campus leaves it valid. Stale files are evicted by the disk LRU.
+"""
+import os
+import re
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from math import atan, degrees, pi, sinh
+from typing import Iterable, Optional, Tuple
+from app.services import metrics
+from app.services.alert_zones import AlertZoneIndex, alert_penalty, alert_zones
+from app.services.callbox_field import BBox, CallboxDistanceField, callbox_field, parse_bbox
+from app.services.scoring_engine import WEIGHT_CALLBOX, WEIGHT_TIME_OF_DAY, callbox_score, time_band, time_of_day_score
+from app.utils.distance import METERS_PER_DEGREE, meters_per_degree_lng
+from config import CAMPUS_BBOX, TILE_CACHE_DIR, TILE_CACHE_DISK_TILES, TILE_CACHE_MEMORY_TILES
+
+TILE_PIXELS = 256
+TILE_CELLS = 64  # Safety values per tile side
+MIN_ZOOM = 13
+MAX_ZOOM = 19
+ALPHA = 140  # Heatmap opacity
+
+TileKey = Tuple[str, int, int, int]  # (time band, z, x, y)
+Versions = Tuple[str, str]  # (callbox field version, digest of the alert zones over the tile)
+DiskKey = Tuple[str, str, str, int, int, int]  # Versions + TileKey
+
+# Disk tier file names: <field version>_<tile alert zones digest>_<band>_<z>_<x>_<y>.png
+_TILE_FILE = re.compile(r"^([0-9a-f]+)_([0-9a-f]+)_(day|dusk|night)_(\d+)_(\d+)_(\d+)\.png$")
+
+
+def tile_bounds(z: int, x: int, y: int) -> BBox:
+    """(south, west, north, east) of an XYZ tile."""
+    n = 2 ** z
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = degrees(atan(sinh(pi * (1 - 2 * y / n))))
+    south = degrees(atan(sinh(pi * (1 - 2 * (y + 1) / n))))
+    return south, west, north, east
+
+
+def _overlaps(a: BBox, b: BBox) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _color(score: float) -> bytes:
+    """Red (0) through yellow (50) to green (100)."""
+    score = max(0.0, min(100.0, score))
+    if score < 50:
+        return bytes((255, int(score / 50 * 255), 0, ALPHA))
+    return bytes((int((100 - score) / 50 * 255), 255, 0, ALPHA))
+
+
+def encode_png(width: int, height: int, rows: Iterable[bytes]) -> bytes:
+    """Encode RGBA rows as a PNG."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    raw = b"".join(b"\x00" + row for row in rows)
+    return (
+        b"\x89PNG\r\n\x1a\n" +
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)) +
+        chunk(b"IDAT", zlib.compress(raw, 6)) +
+        chunk(b"IEND", b"")
+    )
+
+
+EMPTY_TILE = encode_png(TILE_PIXELS, TILE_PIXELS, [bytes(TILE_PIXELS * 4)] * TILE_PIXELS)
+
+
+class TileCache:
+    """
+    Two-tier LRU cache of encoded tiles: memory in front of disk.
+
+    Disk file names carry the callbox field version and the digest of the
+    alert zones over the tile it was rendered with, so tiles written before a
+    restart are reused only while both inputs are unchanged, and stale files simply age out of the
+    LRU. Only files named like cached tiles are ever deleted from disk_dir.
+    """
+
+    def __init__(self, memory_tiles: int = 512, disk_dir: str = "", disk_tiles: int = 10000):
+        """
+        Args:
+            memory_tiles: Tiles kept in memory
+            disk_dir: Directory of the disk tier ("" disables it)
+            disk_tiles: Tiles kept on disk
+        """
+        self.memory_tiles = memory_tiles
+        self.disk_dir = disk_dir
+        self.disk_tiles = disk_tiles
+        self._memory: "OrderedDict[TileKey, bytes]" = OrderedDict()
+        self._disk: "OrderedDict[DiskKey, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0  # Bumped by every invalidation
+        self._counters = {"hits": 0, "diskHits": 0, "misses": 0, "invalidated": 0, "evicted": 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._scan_disk()
+
+    def get(self, key: TileKey, versions: Optional[Versions] = None) -> Optional[bytes]:
+        """
+        A cached tile, promoted to most recently used, or None.
+
+        Args:
+            key: Tile key
+            versions: (callbox field version, tile alert zones digest) a disk
+                tile must have been rendered with (None skips the disk tier)
+        """
+        disk_key = versions + key if versions is not None else None
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self._counters["hits"] += 1
+                return data
+            on_disk = disk_key in self._disk
+            if on_disk:
+                self._disk.move_to_end(disk_key)
+        if on_disk:
+            try:
+                with open(self._path(disk_key), "rb") as f:
+                    data = f.read()
+            except OSError:
+                data = None
+            if data is not None:
+                with self._lock:
+                    self._counters["diskHits"] += 1
+                    self._put_memory_locked(key, data)
+                return data
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def put(
+        self,
+        key: TileKey,
+        data: bytes,
+        generation: Optional[int] = None,
+        versions: Optional[Versions] = None
+    ):
+        """
+        Store a tile in memory, and on disk when its input versions are known.
+
+        Args:
+            key: Tile key
+            data: Encoded tile
+            generation: The cache generation the tile was rendered in; the
+                tile is discarded if an invalidation happened since
+            versions: (callbox field version, tile alert zones digest) the
+                tile was rendered with
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._put_memory_locked(key, data)
+        if not self.disk_dir or versions is None:
+            return
+        disk_key = versions + key
+        try:
+            with open(self._path(disk_key), "wb") as f:
+                f.write(data)
+        except OSError as e:
+            print(f"Error caching tile on disk: {e}")
+            return
+        with self._lock:
+            self._disk[disk_key] = None
+            self._disk.move_to_end(disk_key)
+            self._evict_disk_locked()
+
+    def invalidate(self, bbox: BBox) -> int:
+        """
+        Drop every cached tile overlapping an area.
+
+        Returns:
+            Number of tiles dropped
+        """
+        with self._lock:
+            memory = [key for key in self._memory if _overlaps(tile_bounds(*key[1:]), bbox)]
+            for key in memory:
+                del self._memory[key]
+            disk = [key for key in self._disk if _overlaps(tile_bounds(*key[3:]), bbox)]
+            for key in disk:
+                del self._disk[key]
+                self._unlink(key)
+            self.generation += 1
+            dropped = len(memory) + len(disk)
+            self._counters["invalidated"] += dropped
+        return dropped
+
+    def metrics(self) -> dict:
+        """Tiles per tier and cache counters."""
+        with self._lock:
+            return {"memoryTiles": len(self._memory), "diskTiles": len(self._disk), **self._counters}
+
+    def _put_memory_locked(self, key: TileKey, data: bytes):
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_tiles:
+            self._memory.popitem(last=False)
+
+    def _evict_disk_locked(self):
+        while len(self._disk) > self.disk_tiles:
+            old, _ = self._disk.popitem(last=False)
+            self._unlink(old)
+            self._counters["evicted"] += 1
+
+    def _scan_disk(self):
+        """Index tile files left by an earlier run, least recently used first."""
+        found = []
+        for name in os.listdir(self.disk_dir):
+            match = _TILE_FILE.match(name)
+            if not match:
+                continue
+            try:
+                mtime = os.path.getmtime(os.path.join(self.disk_dir, name))
+            except OSError:
+                continue
+            field_version, alerts_digest, band, z, x, y = match.groups()
+            found.append((mtime, (field_version, alerts_digest, band, int(z), int(x), int(y))))
+        with self._lock:
+            for _, key in sorted(found):
+                self._disk[key] = None
+            self._evict_disk_locked()
+
+    def _path(self, key: DiskKey) -> str:
+        return os.path.join(self.disk_dir, "{}_{}_{}_{}_{}_{}.png".format(*key))
+
+    def _unlink(self, key: DiskKey):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+
+class SafetyTiles:
+    """Renders safety heatmap tiles on demand through a TileCache."""
+
+    def __init__(self, field: CallboxDistanceField, zones: AlertZoneIndex, cache: TileCache, area: BBox):
+        """
+        Args:
+            field: Callbox distance field (cells outside it are transparent)
+            zones: Alert zone index
+            cache: Tile cache
+            area: Area with data; tiles outside it are empty
+        """
+        self.field = field
+        self.zones = zones
+        self.cache = cache
+        self.area = area
+
+    def get_tile(self, z: int, x: int, y: int, when: Optional[datetime] = None) -> bytes:
+        """Encoded PNG for a tile, from the cache or freshly rendered."""
+        bounds = tile_bounds(z, x, y)
+        if not _overlaps(bounds, self.area):
+            return EMPTY_TILE
+        when = when or datetime.now()
+        key = (time_band(when), z, x, y)
+        # Before the field is built the tile is incomplete; do not keep it
+        versions = None
+        if self.field.version is not None:
+            versions = (self.field.version, self.zones.digest_within(*bounds))
+        data = self.cache.get(key, versions)
+        if data is not None:
+            return data
+        generation = self.cache.generation
+        data = self.render(z, x, y, when)
+        if versions is not None:
+            self.cache.put(key, data, generation, versions)
+        return data
+
+    def cell_score(self, lat: float, lng: float, time_score: float) -> Optional[float]:
+        """Safety value (0-100) of one heatmap cell, or None without callbox data."""
+        distance = self.field.distance(lat, lng)
+        if distance is None:
+            return None
+        weight = WEIGHT_CALLBOX + WEIGHT_TIME_OF_DAY
+        score = (callbox_score(distance) * WEIGHT_CALLBOX + time_score * WEIGHT_TIME_OF_DAY) / weight
+        zones = self.zones.containing(lat, lng)
+        if zones:
+            score -= alert_penalty(zone.severity for zone in zones)
+        return score
+
+    def render(self, z: int, x: int, y: int, when: datetime) -> bytes:
+        """Render a tile's safety values as a PNG."""
+        time_score = time_of_day_score(when)
+        n = 2 ** z
+        scale = TILE_PIXELS // TILE_CELLS
+        transparent = bytes(4)
+        rows = []
+        for row in range(TILE_CELLS):
+            lat = degrees(atan(sinh(pi * (1 - 2 * (y + (row + 0.5) / TILE_CELLS) / n))))
+            pixels = []
+            for col in range(TILE_CELLS):
+                lng = (x + (col + 0.5) / TILE_CELLS) / n * 360.0 - 180.0
+                score = self.cell_score(lat, lng, time_score)
+                pixels.append((transparent if score is None else _color(score)) * scale)
+            line = b"".join(pixels)
+            rows.extend([line] * scale)
+        return encode_png(TILE_PIXELS, TILE_PIXELS, rows)
+
+    def invalidate_zones(self, zones: Iterable) -> int:
+        """Drop tiles touched by alert zones (pass both old and new versions)."""
+        return sum(self.cache.invalidate(zone.bbox) for zone in zones)
+
+    def invalidate_callboxes(self, points: Iterable[Tuple[float, float]]) -> int:
+        """Drop tiles whose distances can change when these callboxes are added or removed."""
+        reach = self.field.max_meters
+        dropped = 0
+        for lat, lng in points:
+            dlat = reach / METERS_PER_DEGREE
+            dlng = reach / meters_per_degree_lng(lat)
+            dropped += self.cache.invalidate((lat - dlat, lng - dlng, lat + dlat, lng + dlng))
+        return dropped
+
+
+# Heatmap of the campus, invalidated by the sessions module when inputs change
+safety_tiles = SafetyTiles(
+    callbox_field,
+    alert_zones,
+    TileCache(TILE_CACHE_MEMORY_TILES, TILE_CACHE_DIR, TILE_CACHE_DISK_TILES),
+    parse_bbox(CAMPUS_BBOX),
+)
+metrics.register("safetyTiles", safety_tiles.cache.metrics)
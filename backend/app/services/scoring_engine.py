@@ -0,0 +1,693 @@
+"""
+Batch safety scoring engine for candidate walking routes.
+
+All candidate routes of a request, or of several requests, are scored in one
+pass. Each factor is computed as a column over the whole batch (visibility,
+length, callbox proximity, alerts and time of day), and two score models
+read the same columns:
+
+- The route score served by /safe-route: visibility and length, minus the
+  severity penalty of the alert zones along the route.
+- The weighted score of SafetyScorer: callbox proximity, visibility, time of
+  day and length, weighted, minus the alerts penalty.
+
+compute_safety_score / score_route (app.services.safety_score) and
+SafetyScorer.calculate_safety_score are thin wrappers over score_routes;
+tests/test_scoring_parity.py compares them with the original scorers.
+
+Scores are memoized in a ScoreCache keyed by route geometry, weather band
+(visibility snapped to SCORE_CACHE_VISIBILITY_BAND_METERS, and condition),
+alerts snapshot version, callbox dataset version and time-of-day band, so a
+route asked for by many users is scored once per change of its inputs.
+The scores of a cache hit were computed at the visibility of the request
+that filled the entry, at most half a band away from the caller's. The
+visibility-dependent text (explanation and tags) is rebuilt from the caller's
+own visibility, so it never quotes another request's conditions.
+"""
+import base64
+import hashlib
+import json
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Hashable, List, Optional, Sequence, Tuple
+import polyline
+from app.models.route import Route
+from app.models.safety import CallboxLocation, SafetyFactors, UWAlert
+from app.services import metrics
+from app.services.alert_zones import (
+    SEVERITY_PENALTIES, MAX_ALERT_PENALTY, AlertZoneIndex, PreparedZone, alert_penalty, alert_zones
+)
+from app.services.callbox_field import CallboxDistanceField, callbox_field
+from config import RISK_PROFILE_SAMPLES, SCORE_CACHE_SIZE, SCORE_CACHE_VISIBILITY_BAND_METERS
+
+LatLng = Tuple[float, float]
+
+# Route score (/safe-route)
+VISIBILITY_MIN = 2000.0  # meters; at or below, no visibility credit
+VISIBILITY_MAX = 10000.0  # meters; at or above, full visibility credit
+LENGTH_MAX = 2000.0  # meters; longer routes get no length credit
+WEIGHT_ROUTE_VISIBILITY = 0.6
+LOW_VISIBILITY_METERS = 4000.0  # Below this, "Low visibility conditions" (and risk profile bit 7)
+WEIGHT_ROUTE_LENGTH = 0.4
+
+# Weighted score (SafetyScorer); weights sum to ~1.0
+WEIGHT_CALLBOX = 0.35
+WEIGHT_VISIBILITY = 0.25
+WEIGHT_ALERTS = 0.25
+WEIGHT_TIME_OF_DAY = 0.10
+WEIGHT_LENGTH = 0.05
+CALLBOX_OPTIMAL_DISTANCE = 50.0  # meters - ideal distance
+CALLBOX_MAX_DISTANCE = 200.0  # meters - beyond this, no benefit
+VISIBILITY_GOOD = 10000  # meters
+VISIBILITY_POOR = 1000  # meters
+ROUTE_LENGTH_PREFERRED = 500.0  # meters - shorter is slightly better
+POOR_CONDITIONS = ("fog", "mist", "haze", "rain", "snow", "storm")
+
+
+@dataclass
+class RouteCandidate:
+    """A route to score: geometry plus length and duration."""
+    points: List[LatLng]
+    polyline: str
+    distance_meters: float
+    duration_seconds: float
+    callboxes: Optional[List[CallboxLocation]] = None  # Callboxes along the route, if known
+
+    @classmethod
+    def from_google(cls, route: dict) -> "RouteCandidate":
+        """Candidate from a Google Maps route object (get_candidate_routes)."""
+        encoded = route.get("overview_polyline", {}).get("points", "")
+        try:
+            points = polyline.decode(encoded)
+        except Exception:
+            points = []
+        distance = duration = 0
+        for leg in route.get("legs", []):
+            distance += leg.get("distance", {}).get("value", 0)
+            duration += leg.get("duration", {}).get("value", 0)
+        return cls(points, encoded, distance, duration)
+
+    @classmethod
+    def from_route(cls, route: Route, callboxes: Optional[List[CallboxLocation]] = None) -> "RouteCandidate":
+        """Candidate from a Route model (waypoints, or the polyline if none)."""
+        if route.waypoints:
+            points = [(w.lat, w.lng) for w in route.waypoints]
+        else:
+            try:
+                points = polyline.decode(route.polyline) if route.polyline else []
+            except Exception:
+                points = []
+        return cls(points, route.polyline, route.distance_meters, route.duration_seconds, callboxes)
+
+
+@dataclass
+class ScoringContext:
+    """Conditions shared by the routes of one request."""
+    visibility_meters: float = 10000.0
+    weather_condition: str = "Clear"
+    when: Optional[datetime] = None  # Defaults to now
+    alerts: Optional[Sequence[UWAlert]] = None  # Explicit alerts; campus-wide ones count too
+    alert_index: Optional[AlertZoneIndex] = None  # Alert zones; penalize zones along routes when alerts is None
+    field: Optional[CallboxDistanceField] = None  # Callbox distances, preferred over route callboxes
+
+    @classmethod
+    def from_weather_data(cls, weather_data: dict, **kwargs) -> "ScoringContext":
+        """Context from a WeatherService.get_weather result."""
+        return cls(
+            visibility_meters=weather_data.get("visibility_meters", 10000),
+            weather_condition=weather_data.get("weather_condition", "Clear"),
+            **kwargs
+        )
+
+
+@dataclass
+class RouteScore:
+    """
+    Scores and factor values of one route.
+
+    RouteScores may be served from the score cache to several callers:
+    treat them as read-only.
+    """
+    safety_score: int  # Route score (/safe-route)
+    explanation: List[str]
+    tags: List[str]
+    polyline: str
+    eta_minutes: int
+    distance_meters: float
+    weighted_score: float  # Weighted score (SafetyScorer)
+    factors: SafetyFactors
+    alerts: List[dict] = field(default_factory=list)  # Alert zones along the route
+    route_alerts: List[UWAlert] = field(default_factory=list)  # Explicit alerts that concern the route
+    callbox_meters: Optional[float] = None  # Closest approach to a callbox, if known
+    risk_profile: Optional[dict] = None  # Per-segment risk, see risk_profiles()
+    visibility_meters: Optional[float] = None  # Visibility the scores were computed at
+    base_score: Optional[int] = None  # Route score before the alert zone penalty
+
+    def to_dict(self, legacy: bool = False) -> dict:
+        """
+        The /safe-route representation.
+
+        Args:
+            legacy: Only the keys of the original compute_safety_score result
+        """
+        data = {
+            "safetyScore": self.safety_score,
+            "explanation": list(self.explanation),
+            "tags": list(self.tags),
+            "polyline": self.polyline,
+            "etaMinutes": self.eta_minutes,
+            "distanceMeters": self.distance_meters,
+        }
+        if not legacy:
+            data["alerts"] = self.alerts
+            data["riskProfile"] = self.risk_profile
+        return data
+
+
+# Scalar factor functions (also used by the safety heatmap)
+
+def normalize(value: float, min_val: float, max_val: float) -> float:
+    """Min-max normalize a value into [0, 1]."""
+    if max_val == min_val:
+        return 1.0
+    return max(0.0, min(1.0, (value - min_val) / (max_val - min_val)))
+
+
+def callbox_score(distance: Optional[float]) -> float:
+    """Callbox proximity score (0-100) for the closest callbox distance, None if none nearby."""
+    if distance is None:
+        return 30.0
+    if distance <= CALLBOX_OPTIMAL_DISTANCE:
+        return 100.0
+    if distance <= CALLBOX_MAX_DISTANCE:
+        ratio = (CALLBOX_MAX_DISTANCE - distance) / (CALLBOX_MAX_DISTANCE - CALLBOX_OPTIMAL_DISTANCE)
+        return 50.0 + ratio * 50.0
+    return 30.0
+
+
+def visibility_score(visibility: float, condition: str) -> float:
+    """Weather visibility score (0-100)."""
+    is_poor_weather = any(c in condition.lower() for c in POOR_CONDITIONS)
+    if visibility >= VISIBILITY_GOOD and not is_poor_weather:
+        return 100.0
+    if visibility >= VISIBILITY_POOR:
+        ratio = (visibility - VISIBILITY_POOR) / (VISIBILITY_GOOD - VISIBILITY_POOR)
+        return (50.0 + ratio * 50.0) * (0.7 if is_poor_weather else 1.0)
+    return 30.0
+
+
+def time_band(when: datetime) -> str:
+    """Time-of-day band used by scoring: "day", "dusk" or "night"."""
+    hour = when.hour
+    if 6 <= hour < 20:
+        return "day"
+    if 5 <= hour < 6 or 20 <= hour < 21:
+        return "dusk"
+    return "night"
+
+
+def time_of_day_score(when: datetime) -> float:
+    """Daylight 100, dusk/dawn 70, night 40."""
+    hour = when.hour
+    if 6 <= hour < 20:
+        return 100.0
+    if 5 <= hour < 6 or 20 <= hour < 21:
+        return 70.0
+    return 40.0
+
+
+def length_score(distance_meters: float) -> float:
+    """Route length score (0-100); shorter is slightly better."""
+    if distance_meters <= ROUTE_LENGTH_PREFERRED:
+        return 100.0
+    return 70.0 + min(1.0, ROUTE_LENGTH_PREFERRED / distance_meters) * 30.0
+
+
+def alerts_penalty(alerts: Sequence[UWAlert]) -> float:
+    """Severity penalty of active alerts, capped."""
+    total = sum(SEVERITY_PENALTIES.get(alert.severity, 15.0) for alert in alerts if alert.active)
+    return min(MAX_ALERT_PENALTY, total)
+
+
+def visibility_band(visibility: float) -> float:
+    """
+    Visibility snapped to the score cache key band. Requests in the same band
+    share scores; their visibility text is written per request.
+    """
+    band = SCORE_CACHE_VISIBILITY_BAND_METERS
+    return round(visibility / band) * band if band > 0 else visibility
+
+
+class ScoreCache:
+    """
+    LRU cache of RouteScores keyed by route and scoring inputs.
+
+    Entries carry the versions of the inputs they were scored with, and the
+    whole cache is dropped as soon as the shared alerts snapshot or callbox
+    dataset moves to a new version.
+    """
+
+    def __init__(self, max_entries: int = 5000):
+        """
+        Args:
+            max_entries: Scores kept (0 disables the cache)
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, RouteScore]" = OrderedDict()
+        self._versions = None  # (alerts version, callbox version) the entries were scored against
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0, "evicted": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, route: RouteCandidate, context: ScoringContext, when: datetime) -> Hashable:
+        """Cache key of a route scored in a context at a given time."""
+        geometry = hashlib.blake2b(
+            (route.polyline or json.dumps(route.points)).encode(), digest_size=12
+        ).digest()
+        closest = min(c.distance_meters for c in route.callboxes) if route.callboxes else None
+        if context.alerts is not None:
+            alerts = hashlib.blake2b(json.dumps(
+                [[a.alert_id, a.severity, a.active, a.location] for a in context.alerts], default=str
+            ).encode(), digest_size=12).digest()
+        else:
+            alerts = context.alert_index.version if context.alert_index is not None else None
+        return (
+            geometry, route.distance_meters, route.duration_seconds, closest,
+            visibility_band(context.visibility_meters), context.weather_condition,
+            alerts, context.field.version if context.field is not None else None,
+            time_band(when),
+        )
+
+    def sync(self, alerts_version, callbox_version):
+        """Drop every entry if the shared alerts or callbox dataset version changed."""
+        versions = (alerts_version, callbox_version)
+        with self._lock:
+            if versions != self._versions:
+                if self._entries:
+                    self._counters["invalidations"] += 1
+                self._entries.clear()
+                self._versions = versions
+
+    def get(self, key: Hashable) -> Optional[RouteScore]:
+        """A cached score, promoted to most recently used, or None."""
+        with self._lock:
+            score = self._entries.get(key)
+            if score is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return score
+
+    def put(self, key: Hashable, score: RouteScore):
+        """Store a score, evicting the least recently used beyond max_entries."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = score
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evicted"] += 1
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> dict:
+        """Entries, hit rate and counters."""
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "entries": len(self._entries),
+                "hitRate": round(self._counters["hits"] / lookups, 3) if lookups else None,
+                **self._counters,
+            }
+
+
+# Shared by every caller of score_batch
+score_cache = ScoreCache(SCORE_CACHE_SIZE)
+metrics.register("scoreCache", score_cache.metrics)
+
+
+# Batch scoring
+
+def score_routes(
+    routes: Sequence[RouteCandidate],
+    context: ScoringContext,
+    use_cache: bool = True
+) -> List[RouteScore]:
+    """Score every candidate route of one request."""
+    return score_batch([(routes, context)], use_cache)[0]
+
+
+def score_batch(
+    requests: Sequence[Tuple[Sequence[RouteCandidate], ScoringContext]],
+    use_cache: bool = True
+) -> List[List[RouteScore]]:
+    """
+    Score the candidate routes of several requests in one pass.
+
+    Args:
+        requests: (routes, context) per request
+        use_cache: Serve and store scores through the shared score cache
+
+    Returns:
+        Per request, the RouteScore of each route in order
+    """
+    routes: List[RouteCandidate] = []
+    contexts: List[ScoringContext] = []
+    whens: List[datetime] = []
+    now = datetime.now()
+    for candidates, context in requests:
+        routes.extend(candidates)
+        contexts.extend([context] * len(candidates))
+        whens.extend([context.when or now] * len(candidates))
+
+    if use_cache:
+        score_cache.sync(alert_zones.version, callbox_field.version)
+        keys = [score_cache.key(r, c, w) for r, c, w in zip(routes, contexts, whens)]
+        results = [score_cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        scored = _score_columns(
+            [routes[i] for i in missing], [contexts[i] for i in missing], [whens[i] for i in missing]
+        )
+        for i, result in zip(missing, scored):
+            results[i] = result
+            score_cache.put(keys[i], result)
+        # Hits may come from a request with a slightly different visibility
+        results = [
+            _with_visibility(result, route, context.visibility_meters)
+            for result, route, context in zip(results, routes, contexts)
+        ]
+    else:
+        results = _score_columns(routes, contexts, whens)
+
+    # Split back per request
+    grouped, start = [], 0
+    for candidates, _ in requests:
+        grouped.append(results[start:start + len(candidates)])
+        start += len(candidates)
+    return grouped
+
+
+def _score_columns(
+    routes: List[RouteCandidate],
+    contexts: List[ScoringContext],
+    whens: List[datetime]
+) -> List[RouteScore]:
+    """Score routes factor by factor, one column over all of them per factor."""
+    distance = array("d", (r.distance_meters for r in routes))
+    visibility = array("d", (c.visibility_meters for c in contexts))
+
+    # Route score columns
+    visibility_ratio = array("d", (normalize(v, VISIBILITY_MIN, VISIBILITY_MAX) for v in visibility))
+    length_ratio = array("d", (
+        0.0 if d > LENGTH_MAX else normalize(LENGTH_MAX - d, 0, LENGTH_MAX) for d in distance
+    ))
+    route_score = [
+        max(0, int(100 - (WEIGHT_ROUTE_VISIBILITY * (1 - v) + WEIGHT_ROUTE_LENGTH * (1 - l)) * 100))
+        for v, l in zip(visibility_ratio, length_ratio)
+    ]
+
+    # Weighted score columns
+    callbox_meters = [_callbox_meters(r, c) for r, c in zip(routes, contexts)]
+    callbox_col = array("d", (callbox_score(d) for d in callbox_meters))
+    visibility_col = array("d", (
+        visibility_score(v, c.weather_condition) for v, c in zip(visibility, contexts)
+    ))
+    time_col = array("d", (time_of_day_score(when) for when in whens))
+    length_col = array("d", (length_score(d) for d in distance))
+
+    # Alerts: explicit alerts that concern each route, else indexed zones along it
+    route_alerts = [
+        (alert_zones if c.alert_index is None else c.alert_index).route_alerts(c.alerts, r.points)
+        if c.alerts is not None else []
+        for r, c in zip(routes, contexts)
+    ]
+    zones = [
+        c.alert_index.along_route(r.points) if c.alerts is None and c.alert_index is not None and r.points else []
+        for r, c in zip(routes, contexts)
+    ]
+    penalty_col = array("d", (
+        alerts_penalty(relevant) if c.alerts is not None else alert_penalty(z.severity for z in along)
+        for relevant, along, c in zip(route_alerts, zones, contexts)
+    ))
+
+    profiles = risk_profiles(routes, contexts, whens, [
+        along if c.alerts is None else
+        [zone for zone in (PreparedZone.from_alert(a) for a in relevant if a.location) if zone is not None]
+        for relevant, along, c in zip(route_alerts, zones, contexts)
+    ])
+
+    results = []
+    for i, route in enumerate(routes):
+        factors = SafetyFactors(
+            callbox_proximity_score=callbox_col[i],
+            weather_visibility_score=visibility_col[i],
+            alerts_penalty=penalty_col[i],
+            time_of_day_score=time_col[i],
+            route_length_score=length_col[i],
+        )
+        base = (
+            callbox_col[i] * WEIGHT_CALLBOX +
+            visibility_col[i] * WEIGHT_VISIBILITY +
+            time_col[i] * WEIGHT_TIME_OF_DAY +
+            length_col[i] * WEIGHT_LENGTH
+        )
+        score = route_score[i]
+        tags, explanation = _describe(
+            route, visibility[i], visibility_ratio[i], length_ratio[i], score, [zone.title for zone in zones[i]]
+        )
+        if zones[i]:
+            score = max(0, int(score - penalty_col[i]))
+        results.append(RouteScore(
+            safety_score=score,
+            explanation=explanation,
+            tags=tags,
+            polyline=route.polyline,
+            eta_minutes=int(route.duration_seconds / 60),
+            distance_meters=route.distance_meters,
+            weighted_score=round(max(0, min(100, base - penalty_col[i])), 1),
+            factors=factors,
+            alerts=[zone.to_dict() for zone in zones[i]],
+            route_alerts=route_alerts[i],
+            callbox_meters=callbox_meters[i],
+            risk_profile=profiles[i],
+            visibility_meters=visibility[i],
+            base_score=route_score[i],
+        ))
+
+    return results
+
+
+def _with_visibility(result: RouteScore, route: RouteCandidate, visibility: float) -> RouteScore:
+    """A cached score with its tags and explanation written for the caller's visibility."""
+    if result.visibility_meters == visibility:
+        return result
+    distance = route.distance_meters
+    tags, explanation = _describe(
+        route,
+        visibility,
+        normalize(visibility, VISIBILITY_MIN, VISIBILITY_MAX),
+        0.0 if distance > LENGTH_MAX else normalize(LENGTH_MAX - distance, 0, LENGTH_MAX),
+        result.base_score,
+        [zone["title"] for zone in result.alerts],
+    )
+    return replace(result, tags=tags, explanation=explanation)
+
+
+def sample_points(points: Sequence[LatLng], max_samples: int = RISK_PROFILE_SAMPLES) -> Tuple[int, List[LatLng]]:
+    """
+    Every step-th point of a route, at most max_samples of them.
+
+    Returns:
+        Tuple of (step, sampled points); sample i is point i * step
+    """
+    if len(points) > max_samples:
+        step = len(points) // max_samples
+        return step, list(points[::step][:max_samples])
+    return 1, list(points)
+
+
+def risk_profiles(
+    routes: List[RouteCandidate],
+    contexts: List[ScoringContext],
+    whens: List[datetime],
+    zones: List[List[PreparedZone]]
+) -> List[Optional[dict]]:
+    """
+    Risk along each route at sampled polyline points.
+
+    Every sample takes two bytes: its risk (0 safest to 255), then packed
+    inputs:
+
+    - bits 0-3: callbox distance in 25 m steps (14 means 350 m or more),
+      15 if unknown
+    - bit 4: within the alert corridor of an alert zone
+    - bits 5-6: time-of-day band (0 day, 1 dusk, 2 night)
+    - bit 7: visibility below LOW_VISIBILITY_METERS
+
+    Sample i covers the polyline from point i * step to point (i + 1) * step
+    (the last one to the end of the route).
+
+    Args:
+        routes: Routes to profile
+        contexts: Scoring context of each route
+        whens: Scoring time of each route
+        zones: Alert zones concerning each route
+
+    Returns:
+        Per route, {"step", "samples", "data" (base64)}, or None without geometry
+    """
+    # One column entry per sample across all routes
+    owners, lats, lngs, steps = array("l"), array("d"), array("d"), []
+    for i, route in enumerate(routes):
+        step, samples = sample_points(route.points)
+        steps.append((step, len(samples)))
+        owners.extend([i] * len(samples))
+        lats.extend(lat for lat, _ in samples)
+        lngs.extend(lng for _, lng in samples)
+
+    # Per-route inputs (lighting and visibility are the same along a route)
+    band_col = array("B", ({"day": 0, "dusk": 1, "night": 2}[time_band(when)] for when in whens))
+    visibility_col = array("d", (
+        visibility_score(c.visibility_meters, c.weather_condition) for c in contexts
+    ))
+    low_visibility_col = array("B", (c.visibility_meters < LOW_VISIBILITY_METERS for c in contexts))
+    time_col = array("d", (time_of_day_score(when) for when in whens))
+    corridor = [(alert_zones if c.alert_index is None else c.alert_index).corridor_meters for c in contexts]
+
+    # Callbox distance of each sample, -1 where unknown
+    distance_col = array("d", [-1.0]) * len(owners)
+    for k, (o, lat, lng) in enumerate(zip(owners, lats, lngs)):
+        field_ = contexts[o].field
+        d = field_.distance(lat, lng) if field_ is not None else None
+        if d is not None:
+            distance_col[k] = d
+    severities = [
+        [zone.severity for zone in zones[o] if zone.distance_to(lat, lng) <= corridor[o]]
+        for o, lat, lng in zip(owners, lats, lngs)
+    ]
+
+    weight = WEIGHT_CALLBOX + WEIGHT_VISIBILITY + WEIGHT_TIME_OF_DAY
+    risk_col = array("B", (
+        round((100 - max(0.0, min(100.0, (
+            callbox_score(d if d >= 0 else None) * WEIGHT_CALLBOX +
+            visibility_col[o] * WEIGHT_VISIBILITY +
+            time_col[o] * WEIGHT_TIME_OF_DAY
+        ) / weight - alert_penalty(near)))) * 2.55)
+        for o, d, near in zip(owners, distance_col, severities)
+    ))
+    flags_col = array("B", (
+        (15 if d < 0 else min(14, int(d / 25))) |
+        (16 if near else 0) |
+        band_col[o] << 5 |
+        low_visibility_col[o] << 7
+        for o, d, near in zip(owners, distance_col, severities)
+    ))
+
+    profiles, start = [], 0
+    for step, count in steps:
+        if not count:
+            profiles.append(None)
+            continue
+        packed = array("B", bytes(2 * count))
+        packed[0::2] = risk_col[start:start + count]
+        packed[1::2] = flags_col[start:start + count]
+        profiles.append({
+            "step": step,
+            "samples": count,
+            "data": base64.b64encode(packed.tobytes()).decode("ascii"),
+        })
+        start += count
+    return profiles
+
+
+def _callbox_meters(route: RouteCandidate, context: ScoringContext) -> Optional[float]:
+    """Closest approach to a callbox: from the distance field, else the route's callbox list."""
+    if context.field is not None:
+        distance = context.field.route_distance(route.points)
+        if distance is not None:
+            return distance
+    if route.callboxes:
+        return min(c.distance_meters for c in route.callboxes)
+    return None
+
+
+def _describe(
+    route: RouteCandidate,
+    visibility: float,
+    visibility_ratio: float,
+    length_ratio: float,
+    score: int,
+    zone_titles: List[str]
+) -> Tuple[List[str], List[str]]:
+    """Tags and explanation of a route score, before the alert zone penalty."""
+    tags = _route_tags(visibility_ratio, length_ratio, visibility)
+    explanation = _route_explanation(
+        route.distance_meters, route.duration_seconds, visibility, visibility_ratio, length_ratio, score
+    )
+    if zone_titles:
+        tags.append("Active alert on route")
+        explanation = (
+            explanation[:1] + [f"This route passes near an active UW Alert ({', '.join(zone_titles)})."]
+            + explanation[1:]
+        )[:4]
+    return tags, explanation
+
+
+def _route_tags(visibility_ratio: float, length_ratio: float, visibility: float) -> List[str]:
+    tags = []
+    if visibility_ratio > 0.7:
+        tags.append("Good visibility")
+    elif visibility_ratio < 0.3:
+        tags.append("Poor visibility")
+    if length_ratio > 0.7:
+        tags.append("Short route")
+    if visibility < LOW_VISIBILITY_METERS:
+        tags.append("Low visibility conditions")
+    return tags
+
+
+def _route_explanation(distance, duration, visibility, visibility_ratio, length_ratio, score) -> List[str]:
+    """Two to four sentences describing the route score."""
+    eta_minutes = int(duration / 60)
+    explanation = []
+    if distance <= 1000:
+        explanation.append(f"This is a short route of {distance}m, taking approximately {eta_minutes} minutes.")
+    elif distance <= 2000:
+        explanation.append(f"This route is {distance}m long and takes approximately {eta_minutes} minutes.")
+    else:
+        explanation.append(f"This is a longer route of {distance}m, taking approximately {eta_minutes} minutes.")
+
+    if visibility_ratio > 0.7:
+        explanation.append(f"Excellent visibility conditions ({int(visibility)}m) make this route safer.")
+    elif visibility_ratio > 0.3:
+        explanation.append(f"Moderate visibility ({int(visibility)}m) is acceptable for walking.")
+    else:
+        explanation.append(f"Poor visibility ({int(visibility)}m) reduces safety, especially at night.")
+
+    if length_ratio > 0.7:
+        explanation.append("The short distance minimizes exposure time.")
+    elif length_ratio < 0.3:
+        explanation.append("The longer distance increases overall risk.")
+
+    if score >= 80:
+        explanation.append("Overall, this route has a high safety score.")
+    elif score >= 60:
+        explanation.append("This route has a moderate safety score.")
+    else:
+        explanation.append("This route has a lower safety score due to visibility and distance factors.")
+
+    if len(explanation) > 4:
+        explanation = explanation[:4]
+    elif len(explanation) < 2:
+        explanation.append("Consider your comfort level with the route conditions.")
+    return explanation
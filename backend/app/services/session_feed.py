@@ -0,0 +1,145 @@
+"""
+Sequenced per-session event feed for resuming companions.
+
+The RoomEventDispatcher records every event it emits to a session room here.
+Each session keeps a small replay buffer of its most recent events, numbered
+by a per-session sequence, so SSE and long-poll clients can wait for the next
+event, and any client (including a reconnecting Socket.IO companion) can
+resume from the last sequence it saw. Waiters block on a green
+event rather than a thread each, so thousands of idle companions are cheap.
+"""
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class SessionFeed:
+    """Per-session replay buffers plus wake-ups for waiting readers."""
+
+    def __init__(self, buffer_size: int = 64):
+        """
+        Args:
+            buffer_size: Events kept per session for resuming readers
+        """
+        self.buffer_size = buffer_size
+        self._create_event: Callable = threading.Event
+        self._buffers: Dict[str, deque] = {}  # room -> deque of (seq, event, payload)
+        self._seqs: Dict[str, int] = {}  # room -> last assigned sequence number
+        self._waiters: Dict[str, set] = {}  # room -> events of blocked readers
+        self._lock = threading.Lock()
+        self._counters = {"recorded": 0, "wakeups": 0, "resumes": 0, "gaps": 0}
+
+    def use_event_factory(self, create_event: Callable):
+        """
+        Use the async framework's event type for waiters (e.g. green events
+        under eventlet) instead of threading.Event.
+        """
+        self._create_event = create_event
+
+    def record(self, room: str, event: str, payload: dict) -> int:
+        """
+        Append an event to a session's buffer and wake its waiters.
+
+        Args:
+            room: Room name (the session ID)
+            event: Event name
+            payload: Event data
+
+        Returns:
+            The event's sequence number within the session
+        """
+        with self._lock:
+            seq = self._seqs.get(room, 0) + 1
+            self._seqs[room] = seq
+            buffer = self._buffers.get(room)
+            if buffer is None:
+                buffer = self._buffers[room] = deque(maxlen=self.buffer_size)
+            buffer.append((seq, event, payload))
+            waiters = self._waiters.pop(room, ())
+            self._counters["recorded"] += 1
+            self._counters["wakeups"] += len(waiters)
+        for waiter in waiters:
+            waiter.set()
+        return seq
+
+    def latest(self, room: str) -> int:
+        """Sequence number of the newest event for a session (0 if none)."""
+        return self._seqs.get(room, 0)
+
+    def since(self, room: str, seq: int) -> Optional[List[Tuple[int, str, dict]]]:
+        """
+        Events after a sequence number.
+
+        Args:
+            room: Room name (the session ID)
+            seq: Last sequence number the reader has seen
+
+        Returns:
+            List of (seq, event, payload), oldest first, or None if events after
+            seq have already left the buffer and the reader needs a snapshot
+        """
+        with self._lock:
+            latest = self._seqs.get(room, 0)
+            if seq == latest:
+                return []
+            buffer = self._buffers.get(room) or ()
+            # seq ahead of latest means the numbering restarted (server restart)
+            if seq > latest or not buffer or buffer[0][0] > seq + 1:
+                self._counters["gaps"] += 1
+                return None
+            self._counters["resumes"] += 1
+            return [entry for entry in buffer if entry[0] > seq]
+
+    def wait(
+        self,
+        room: str,
+        seq: int,
+        timeout: float
+    ) -> Optional[List[Tuple[int, str, dict]]]:
+        """
+        Block until a session has events after seq, or the timeout passes.
+
+        Args:
+            room: Room name (the session ID)
+            seq: Last sequence number the reader has seen
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Same as since(); an empty list on timeout
+        """
+        events = self.since(room, seq)
+        if events != []:
+            return events
+
+        waiter = self._create_event()
+        with self._lock:
+            if self._seqs.get(room, 0) > seq:
+                waiter = None
+            else:
+                self._waiters.setdefault(room, set()).add(waiter)
+        if waiter is not None:
+            waiter.wait(timeout)
+            with self._lock:
+                waiters = self._waiters.get(room)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._waiters[room]
+        return self.since(room, seq)
+
+    def discard(self, room: str):
+        """Drop a session's buffer when it is evicted, waking any waiters."""
+        with self._lock:
+            self._buffers.pop(room, None)
+            self._seqs.pop(room, None)
+            waiters = self._waiters.pop(room, ())
+        for waiter in waiters:
+            waiter.set()
+
+    def metrics(self) -> dict:
+        """Buffered sessions, blocked readers and counters."""
+        with self._lock:
+            counters = dict(self._counters)
+            waiting = sum(len(waiters) for waiters in self._waiters.values())
+            sessions = len(self._buffers)
+        return {"sessions": sessions, "waiting": waiting, **counters}
@@ -0,0 +1,279 @@
+"""
+Append-only session event log for crash recovery.
+
+Every session mutation is appended as one compact JSON line to the current
+log segment. Appends only touch an in-memory buffer; a flusher thread writes
+and fsyncs the buffer as one group commit every few milliseconds, so request
+handlers never wait on disk. Periodic snapshots capture all live sessions,
+start a new segment and delete the segments they cover, so restart replays at
+most one snapshot plus the segments written since.
+
+Each record gets the next log sequence number ("seq"), and a snapshot stores
+the last sequence number it reflects. Callers apply a mutation and append its
+record inside mutation(), which snapshots wait on, so every record at or below
+the snapshot's seq is already in its sessions and is skipped on replay.
+
+Layout of the log directory:
+    segment-000007.log   records appended after snapshot-000007 was taken
+    snapshot-000007.json all sessions as of the start of segment 7
+"""
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+_SEGMENT_RE = re.compile(r"^segment-(\d{6})\.log$")
+_SNAPSHOT_RE = re.compile(r"^snapshot-(\d{6})\.json$")
+
+
+class SessionEventLog:
+    """Segmented append-only log with group commit, snapshots and compaction."""
+
+    def __init__(
+        self,
+        directory: str,
+        flush_interval_seconds: float = 0.05,
+        snapshot_interval_seconds: float = 300.0
+    ):
+        self.directory = directory
+        self.flush_interval_seconds = flush_interval_seconds
+        self.snapshot_interval_seconds = snapshot_interval_seconds
+        self._buffer: List[str] = []
+        self._buffer_lock = threading.Lock()
+        self._file_lock = threading.Lock()  # Serializes flushes and segment rotation
+        self._mutation_lock = threading.RLock()  # Held by mutations while snapshots read the sessions
+        self._seq = 0  # Sequence number of the last appended record
+        self._segment = None
+        self._file = None
+        self._thread = None
+        self._records_since_snapshot = 0
+        self._last_commit_records = 0
+
+    # Writing
+
+    @contextmanager
+    def mutation(self):
+        """
+        Hold while applying a mutation in memory and appending its record, so a
+        snapshot sees either both or neither. Reentrant.
+        """
+        with self._mutation_lock:
+            yield
+
+    def append(self, record: dict) -> int:
+        """
+        Buffer a record for the next group commit. Never blocks on disk.
+
+        Args:
+            record: JSON-serializable mutation record with an "op" key
+
+        Returns:
+            The record's sequence number
+        """
+        with self._buffer_lock:
+            self._seq += 1
+            self._buffer.append(json.dumps({**record, "seq": self._seq}, separators=(",", ":")))
+            return self._seq
+
+    def flush(self):
+        """Write and fsync all buffered records to the current segment."""
+        with self._file_lock:
+            with self._buffer_lock:
+                lines, self._buffer = self._buffer, []
+            if not lines or self._file is None:
+                if lines:
+                    # Not opened yet; keep the records for the first commit
+                    with self._buffer_lock:
+                        self._buffer[:0] = lines
+                return
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._records_since_snapshot += len(lines)
+            self._last_commit_records = len(lines)
+
+    def snapshot(self, states: Callable[[], List[dict]]):
+        """
+        Take a snapshot and compact the log.
+
+        Rotates to a new segment first and only then captures the session
+        states, together with the last sequence number appended, while no
+        mutation is in progress. Every record up to that number is reflected
+        in the snapshot; records in the new segment at or below it are skipped
+        on replay.
+
+        Args:
+            states: Callable returning the durable state of every live session
+        """
+        with self._file_lock:
+            with self._buffer_lock:
+                lines, self._buffer = self._buffer, []
+            if lines and self._file is not None:
+                self._file.write("\n".join(lines) + "\n")
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            segment = self._open_segment(self._segment + 1)
+
+        with self._mutation_lock:
+            seq = self._seq
+            sessions = states()
+        self._write_json_atomic(self._snapshot_path(segment), {
+            "segment": segment,
+            "seq": seq,
+            "takenAt": time.time(),
+            "sessions": sessions,
+        })
+        self._records_since_snapshot = 0
+
+        # Compaction: everything before the new segment is covered by the snapshot
+        for name in os.listdir(self.directory):
+            match = _SEGMENT_RE.match(name) or _SNAPSHOT_RE.match(name)
+            if match and int(match.group(1)) < segment:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError as e:
+                    print(f"Error compacting session log file {name}: {e}")
+
+    # Recovery
+
+    def recover(self) -> Tuple[List[dict], Iterator[dict]]:
+        """
+        Load the newest snapshot and open the log for appending.
+
+        Returns:
+            Tuple of (session states from the snapshot, iterator over the
+            records logged after it, oldest first). Consume the records
+            before appending, so new sequence numbers continue after them.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        snapshots = self._numbered(_SNAPSHOT_RE)
+        segments = self._numbered(_SEGMENT_RE)
+
+        states: List[dict] = []
+        covered = 0  # Last sequence number reflected in the snapshot
+        start = segments[0] if segments else 0
+        for number in reversed(snapshots):
+            try:
+                with open(self._snapshot_path(number), encoding="utf-8") as f:
+                    snapshot = json.load(f)
+                states = snapshot.get("sessions", [])
+                covered = snapshot.get("seq", 0)
+                start = number
+                break
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable session snapshot {number}: {e}")
+
+        replay = []
+        for number in segments:
+            if number < start:
+                continue
+            path = self._segment_path(number)
+            if os.path.getsize(path) == 0:
+                # Left by a restart with nothing to log since
+                os.remove(path)
+                continue
+            replay.append(number)
+        last = max(segments + snapshots + [start])
+        with self._file_lock:
+            # Append to a fresh segment; older segments are only read
+            self._open_segment(last + 1)
+        self._seq = covered
+        return states, self._read_segments(replay, covered)
+
+    # Background group commit
+
+    def start(self, states: Callable[[], List[dict]]):
+        """
+        Start the flusher thread that commits buffered records and takes snapshots.
+
+        Args:
+            states: Callable returning the durable state of every live session
+        """
+        if self._thread is not None:
+            return
+
+        def run():
+            last_snapshot = time.time()
+            while True:
+                time.sleep(self.flush_interval_seconds)
+                try:
+                    self.flush()
+                    if time.time() - last_snapshot >= self.snapshot_interval_seconds:
+                        self.snapshot(states)
+                        last_snapshot = time.time()
+                except Exception as e:
+                    print(f"Error committing session log: {e}")
+
+        self._thread = threading.Thread(target=run, name="session-log", daemon=True)
+        self._thread.start()
+
+    def metrics(self) -> dict:
+        """Current segment, pending records and records since the last snapshot."""
+        with self._buffer_lock:
+            pending = len(self._buffer)
+        return {
+            "segment": self._segment,
+            "pendingRecords": pending,
+            "lastCommitRecords": self._last_commit_records,
+            "recordsSinceSnapshot": self._records_since_snapshot,
+        }
+
+    # Helpers
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"segment-{number:06d}.log")
+
+    def _snapshot_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"snapshot-{number:06d}.json")
+
+    def _numbered(self, pattern) -> List[int]:
+        numbers = []
+        for name in os.listdir(self.directory):
+            match = pattern.match(name)
+            if match:
+                numbers.append(int(match.group(1)))
+        return sorted(numbers)
+
+    def _open_segment(self, number: int) -> int:
+        if self._file is not None:
+            self._file.close()
+        self._segment = number
+        self._file = open(self._segment_path(number), "a", encoding="utf-8")
+        return number
+
+    def _read_segments(self, numbers: List[int], covered: int) -> Iterator[dict]:
+        for number in numbers:
+            try:
+                with open(self._segment_path(number), encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # Torn write at the tail of a crashed segment
+                            continue
+                        seq = record.get("seq")
+                        if seq is not None:
+                            if seq <= covered:
+                                continue  # Already in the snapshot
+                            self._seq = max(self._seq, seq)
+                        yield record
+            except OSError as e:
+                print(f"Skipping unreadable session log segment {number}: {e}")
+
+    def _write_json_atomic(self, path: str, data: dict):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+def open_session_log(directory: Optional[str], **kwargs) -> Optional[SessionEventLog]:
+    """Create the session log, or None when durability is disabled (empty directory)."""
+    if not directory:
+        return None
+    return SessionEventLog(directory, **kwargs)
@@ -0,0 +1,173 @@
+"""
+In-memory store for live walk sessions with TTL-based eviction and archival.
+"""
+import json
+import os
+import threading
+import time
+from typing import Callable, Iterator, List, Optional
+from app.models.session import SessionStatus, WalkSession
+from app.utils.timestamps import isoformat
+
+
+class SessionArchive:
+    """Append-only JSON Lines archive of evicted sessions."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, sessions: List[WalkSession], evicted_at: Optional[float] = None):
+        """
+        Append evicted sessions to the archive, one JSON object per line.
+
+        Args:
+            sessions: Sessions being evicted
+            evicted_at: Eviction time (defaults to now)
+        """
+        if not sessions or not self.path:
+            return
+
+        evicted_at = evicted_at if evicted_at is not None else time.time()
+        lines = []
+        for session in sessions:
+            record = session.to_dict()
+            record["evictedAt"] = isoformat(evicted_at)
+            lines.append(json.dumps(record, separators=(",", ":")))
+
+        directory = os.path.dirname(self.path)
+        with self._lock:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+class SessionStore:
+    """
+    Live walk sessions indexed by ID and share token.
+
+    Sessions move through explicit lifecycle states. A periodic sweep marks
+    silent active walks as abandoned and evicts terminal sessions (arrived,
+    panic resolved, abandoned) once they have been inactive past the TTL, so
+    memory scales with active walkers rather than walkers served since boot.
+    Sessions in panic are never evicted automatically.
+    """
+
+    def __init__(
+        self,
+        archive: Optional[SessionArchive] = None,
+        ttl_seconds: float = 30 * 60,
+        abandon_seconds: float = 60 * 60,
+        on_abandon: Optional[Callable[[WalkSession, float], None]] = None
+    ):
+        """
+        Args:
+            archive: Where evicted sessions are written, or None to drop them
+            ttl_seconds: Idle time after which terminal sessions are evicted
+            abandon_seconds: Idle time after which active sessions are abandoned
+            on_abandon: Called with (session, now) to abandon a silent active
+                session, so the transition takes the same path as any other
+                (defaults to setting the status directly)
+        """
+        self.archive = archive
+        self.ttl_seconds = ttl_seconds
+        self.abandon_seconds = abandon_seconds
+        self.on_abandon = on_abandon
+        self._sessions = {}  # session_id -> WalkSession
+        self._by_token = {}  # share_token -> session_id
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def values(self) -> List[WalkSession]:
+        """Snapshot of all live sessions."""
+        return list(self._sessions.values())
+
+    def __iter__(self) -> Iterator[WalkSession]:
+        return iter(self.values())
+
+    def add(self, session: WalkSession) -> WalkSession:
+        """Register a new session."""
+        with self._lock:
+            self._sessions[session.id] = session
+            self._by_token[session.share_token] = session.id
+        return session
+
+    def get(self, session_id: str) -> Optional[WalkSession]:
+        """Look up a session by ID."""
+        return self._sessions.get(session_id)
+
+    def get_by_share_token(self, token: str) -> Optional[WalkSession]:
+        """Look up a session by share token."""
+        session_id = self._by_token.get(token)
+        if session_id is None:
+            return None
+        return self._sessions.get(session_id)
+
+    def remove(self, session_id: str) -> Optional[WalkSession]:
+        """Remove a session without archiving it."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._by_token.pop(session.share_token, None)
+        return session
+
+    def sweep(self, now: Optional[float] = None) -> List[WalkSession]:
+        """
+        Apply lifecycle transitions and evict expired sessions.
+
+        Active sessions with no activity for `abandon_seconds` become abandoned.
+        Terminal sessions with no activity for `ttl_seconds` are archived and removed.
+
+        Args:
+            now: Current epoch time (defaults to now)
+
+        Returns:
+            List of evicted sessions
+        """
+        now = now if now is not None else time.time()
+        expired = []
+        abandoned = []
+
+        with self._lock:
+            for session in self._sessions.values():
+                idle = now - session.last_activity_at
+                if session.status == SessionStatus.ACTIVE and idle > self.abandon_seconds:
+                    abandoned.append(session)
+                elif session.is_terminal and idle > self.ttl_seconds:
+                    expired.append(session)
+
+        # Outside the lock: the transition reaches other services
+        for session in abandoned:
+            # A fix may have arrived since the scan
+            if session.status != SessionStatus.ACTIVE or now - session.last_activity_at <= self.abandon_seconds:
+                continue
+            if self.on_abandon:
+                self.on_abandon(session, now)
+            else:
+                session.set_status(SessionStatus.ABANDONED, now)
+
+        if not expired:
+            return []
+
+        # Archive before removal so an evicted walk is never lost
+        if self.archive is not None:
+            try:
+                self.archive.append(expired, now)
+            except OSError as e:
+                print(f"Error archiving sessions, keeping them in memory: {e}")
+                return []
+
+        with self._lock:
+            for session in expired:
+                self._sessions.pop(session.id, None)
+                self._by_token.pop(session.share_token, None)
+
+        return expired
@@ -33,16 +33,26 @@ class UWAlertsService:
             response = requests.get(self.alerts_url, timeout=10)
             response.raise_for_status()
             
-            # Parse HTML to extract alerts
-            soup = BeautifulSoup(response.content, 'html.parser')
-            alerts = self._parse_alerts_html(soup, location)
-            
-            return alerts
+            return self.parse_alerts(response.content, location)
         
         except (requests.RequestException, Exception) as e:
             # Fallback to stub data on error
             return self._get_stub_alerts()
     
+    def parse_alerts(self, content: bytes, location: Optional[dict] = None) -> List[UWAlert]:
+        """
+        Parse alerts from the alerts page HTML.
+        
+        Args:
+            content: Raw page body
+            location: Optional location filter (see get_active_alerts)
+        
+        Returns:
+            List of active UWAlert objects
+        """
+        soup = BeautifulSoup(content, 'html.parser')
+        return self._parse_alerts_html(soup, location)
+    
     def _parse_alerts_html(self, soup: BeautifulSoup, location: Optional[dict] = None) -> List[UWAlert]:
         """
         Parse HTML to extract alert information.
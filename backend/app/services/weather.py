@@ -1,7 +1,9 @@
 """
 Weather service module that integrates with WeatherAPI.com.
+Conditions come from the shared geo-bucketed weather cache.
 """
 import requests
+from app.services.weather_cache import weather_cache
 from config import WEATHER_API_KEY
 
 
@@ -17,6 +19,7 @@ def get_weather_visibility(lat: float, lng: float) -> dict:
         Dictionary with:
         - "visibility": visibility in meters (defaults to 10000 if missing)
         - "condition": main weather condition string (e.g., "Clear", "Rain")
+        - "cacheAgeSeconds": age of the cached conditions (None for defaults)
     
     Raises:
         Exception: If API request fails
@@ -25,22 +28,12 @@ def get_weather_visibility(lat: float, lng: float) -> dict:
         # Return default values if API key not configured
         return {
             "visibility": 10000,
-            "condition": "Clear"
+            "condition": "Clear",
+            "cacheAgeSeconds": None
         }
     
-    url = "https://api.weatherapi.com/v1/current.json"
-    params = {
-        "key": WEATHER_API_KEY,
-        "q": f"{lat},{lng}",
-        "aqi": "no"
-    }
-    
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        current = data.get("current", {})
+        current, age = weather_cache.get(lat, lng)
         condition_data = current.get("condition", {})
         
         # Extract visibility (WeatherAPI.com returns in km, convert to meters)
@@ -68,14 +61,16 @@ def get_weather_visibility(lat: float, lng: float) -> dict:
         
         return {
             "visibility": visibility,
-            "condition": condition
+            "condition": condition,
+            "cacheAgeSeconds": round(age)
         }
     
     except requests.RequestException as e:
         # Return default values on error
         return {
             "visibility": 10000,
-            "condition": "Clear"
+            "condition": "Clear",
+            "cacheAgeSeconds": None
         }
 
 
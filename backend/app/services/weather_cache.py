@@ -0,0 +1,201 @@
+"""
+Shared cache of current weather conditions, keyed by coarse geo bucket.
+
+Weather is the same across campus for minutes at a time, so conditions are
+fetched once per grid bucket (2 km by default) and reused by every caller in
+that bucket. Fresh entries are served as is; entries past their TTL are still
+served while a single background refresh replaces them, so once a bucket is
+warm no request waits on WeatherAPI. Only a cold bucket is fetched inline,
+and concurrent requests for it share that one fetch, waiting on an event from
+the server's event factory (green under eventlet, so a waiter never blocks
+the hub). Background refreshes run in OS threads and are never waited on.
+Buckets kept fresh by the WeatherPoller are never refreshed from the request
+path.
+"""
+import threading
+import time
+from math import floor
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+import requests
+from app.services import metrics
+from app.utils.distance import METERS_PER_DEGREE, meters_per_degree_lng
+from config import (
+    WEATHER_API_KEY,
+    WEATHER_API_BASE_URL,
+    WEATHER_BUCKET_METERS,
+    WEATHER_TTL_SECONDS,
+    WEATHER_MAX_STALE_SECONDS,
+)
+
+BucketKey = Tuple[int, int]
+
+# Campus reference latitude; fixes the longitude size of a bucket
+ORIGIN_LAT = 47.655
+
+
+def fetch_current_weather(lat: float, lng: float) -> dict:
+    """
+    Fetch current conditions from WeatherAPI.com.
+
+    Returns:
+        The "current" object of the WeatherAPI response
+
+    Raises:
+        requests.RequestException: If the request fails
+    """
+    response = requests.get(
+        f"{WEATHER_API_BASE_URL or 'https://api.weatherapi.com/v1'}/current.json",
+        params={"key": WEATHER_API_KEY, "q": f"{lat},{lng}", "aqi": "no"},
+        timeout=10
+    )
+    response.raise_for_status()
+    return response.json().get("current", {})
+
+
+class WeatherCache:
+    """TTL cache with stale-while-revalidate over a lat/lng bucket grid."""
+
+    def __init__(
+        self,
+        fetch: Callable[[float, float], dict],
+        bucket_meters: float = 2000.0,
+        ttl_seconds: float = 600.0,
+        max_stale_seconds: float = 3600.0
+    ):
+        """
+        Args:
+            fetch: Callable(lat, lng) returning current conditions
+            bucket_meters: Grid size of a cache bucket
+            ttl_seconds: Age after which an entry is refreshed in the background
+            max_stale_seconds: Age after which an entry is no longer served
+        """
+        self.fetch = fetch
+        self.bucket_meters = bucket_meters
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self._lat_step = bucket_meters / METERS_PER_DEGREE
+        self._lng_step = bucket_meters / meters_per_degree_lng(ORIGIN_LAT)
+        self._entries: Dict[BucketKey, Tuple[dict, float]] = {}  # key -> (conditions, fetched_at)
+        self._create_event: Callable = threading.Event
+        self._inflight: Dict[BucketKey, object] = {}  # Bucket fetched on the request path -> its waiters' event
+        self._refreshing: Set[BucketKey] = set()  # Buckets refreshed in a background thread
+        self._prefetched: FrozenSet[BucketKey] = frozenset()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "staleHits": 0, "misses": 0, "fetches": 0, "errors": 0}
+
+    def use_event_factory(self, create_event: Callable):
+        """
+        Use the async framework's event type for requests waiting on a cold
+        bucket (e.g. green events under eventlet) instead of threading.Event.
+        """
+        self._create_event = create_event
+
+    def bucket_of(self, lat: float, lng: float) -> BucketKey:
+        """Bucket containing a point."""
+        return floor(lat / self._lat_step), floor(lng / self._lng_step)
+
+    def bucket_center(self, key: BucketKey) -> Tuple[float, float]:
+        """Center of a bucket; conditions are fetched for this point."""
+        return (key[0] + 0.5) * self._lat_step, (key[1] + 0.5) * self._lng_step
+
+    def get(self, lat: float, lng: float) -> Tuple[dict, float]:
+        """
+        Current conditions for a point.
+
+        Returns:
+            Tuple of (conditions, age in seconds)
+
+        Raises:
+            requests.RequestException: If the bucket is cold and the fetch fails
+        """
+        key = self.bucket_of(lat, lng)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry[1]
+                if age <= self.ttl_seconds:
+                    self._counters["hits"] += 1
+                    return entry[0], age
+                if age <= self.max_stale_seconds:
+                    self._counters["staleHits"] += 1
+                    if key not in self._prefetched:
+                        self._start_refresh_locked(key)
+                    return entry[0], age
+            self._counters["misses"] += 1
+            waiter = self._inflight.get(key)
+            if waiter is None:
+                self._inflight[key] = self._create_event()
+
+        if waiter is not None:
+            # Another request is already fetching this bucket
+            waiter.wait(15)
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is None:
+                raise requests.RequestException("Weather fetch for bucket failed")
+            return entry[0], time.time() - entry[1]
+
+        conditions = self._refresh(key)
+        if conditions is None:
+            raise requests.RequestException("Weather fetch for bucket failed")
+        return conditions, 0.0
+
+    def set_prefetched(self, keys: Iterable[BucketKey]):
+        """Buckets refreshed by a prefetcher rather than by requests."""
+        self._prefetched = frozenset(keys)
+
+    def put(self, key: BucketKey, conditions: dict, fetched_at: Optional[float] = None):
+        """Store conditions for a bucket (used by prefetchers)."""
+        with self._lock:
+            self._entries[key] = (conditions, fetched_at if fetched_at is not None else time.time())
+
+    def metrics(self) -> dict:
+        """Bucket count, hit/miss counters and the age of the oldest entry."""
+        now = time.time()
+        with self._lock:
+            counters = dict(self._counters)
+            ages = [now - fetched_at for _, fetched_at in self._entries.values()]
+        return {
+            "buckets": len(ages),
+            "oldestAgeSeconds": round(max(ages)) if ages else None,
+            **counters,
+        }
+
+    def _start_refresh_locked(self, key: BucketKey):
+        if key in self._inflight or key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        threading.Thread(
+            target=self._refresh, args=(key, True), name="weather-refresh", daemon=True
+        ).start()
+
+    def _refresh(self, key: BucketKey, background: bool = False) -> Optional[dict]:
+        """Fetch a bucket (caller has registered it as in flight or refreshing)."""
+        lat, lng = self.bucket_center(key)
+        conditions = None
+        try:
+            conditions = self.fetch(lat, lng)
+            self.put(key, conditions)
+        except Exception as e:
+            # Keep serving the stale entry, if any, until max_stale_seconds
+            print(f"Error refreshing weather for bucket {key}: {e}")
+        with self._lock:
+            self._counters["fetches" if conditions is not None else "errors"] += 1
+            if background:
+                self._refreshing.discard(key)
+                return conditions
+            done = self._inflight.pop(key, None)
+        if done is not None:
+            done.set()
+        return conditions
+
+
+# Shared by get_weather_visibility and WeatherService
+weather_cache = WeatherCache(
+    fetch_current_weather,
+    bucket_meters=WEATHER_BUCKET_METERS,
+    ttl_seconds=WEATHER_TTL_SECONDS,
+    max_stale_seconds=WEATHER_MAX_STALE_SECONDS,
+)
+metrics.register("weatherCache", weather_cache.metrics)
@@ -0,0 +1,138 @@
+"""
+Background prefetch of weather conditions for configured regions.
+
+Keeps every weather cache bucket covering the configured regions (plus a
+ring of neighbouring buckets) fresh at a fixed interval, so requests inside
+those regions never wait on WeatherAPI, even right after an entry expires.
+Fetches are spaced to stay under the API rate limit and the interval is
+jittered so several servers do not poll in lockstep.
+"""
+import random
+import threading
+import time
+from typing import List, Set, Tuple
+from app.services import metrics
+from app.services.weather_cache import BucketKey, WeatherCache, weather_cache
+from config import (
+    WEATHER_PREFETCH_REGIONS,
+    WEATHER_PREFETCH_SECONDS,
+    WEATHER_PREFETCH_JITTER_SECONDS,
+    WEATHER_API_MAX_PER_MINUTE,
+)
+
+Region = Tuple[float, float, float, float]  # (south, west, north, east)
+
+
+def parse_regions(value: str) -> List[Region]:
+    """
+    Parse regions from "south,west,north,east;south,west,north,east".
+
+    Raises:
+        ValueError: If a region is malformed
+    """
+    regions = []
+    for part in value.split(";"):
+        if not part.strip():
+            continue
+        south, west, north, east = (float(v) for v in part.split(","))
+        if south > north or west > east:
+            raise ValueError(f"Region must be south,west,north,east: {part}")
+        regions.append((south, west, north, east))
+    return regions
+
+
+class WeatherPoller:
+    """Periodically refreshes the weather cache buckets of configured regions."""
+
+    def __init__(
+        self,
+        cache: WeatherCache,
+        regions: List[Region],
+        interval_seconds: float = 300.0,
+        max_requests_per_minute: int = 30,
+        jitter_seconds: float = 30.0,
+        margin_buckets: int = 1
+    ):
+        """
+        Args:
+            cache: The weather cache to fill
+            regions: Bounding boxes to keep fresh
+            interval_seconds: Time between polls (keep below the cache TTL)
+            max_requests_per_minute: Upper bound on WeatherAPI requests
+            jitter_seconds: Random extra delay added to each interval
+            margin_buckets: Rings of neighbouring buckets also prefetched
+        """
+        self.cache = cache
+        self.regions = regions
+        self.interval_seconds = interval_seconds
+        self.max_requests_per_minute = max_requests_per_minute
+        self.jitter_seconds = jitter_seconds
+        self.buckets = self._region_buckets(margin_buckets)
+        self._thread = None
+        self._last_poll_at = None
+        self._last_poll_seconds = None
+        self._counters = {"polls": 0, "fetched": 0, "errors": 0}
+
+    def start(self):
+        """Mark the region buckets as prefetched and start polling (idempotent)."""
+        if self._thread is not None or not self.buckets:
+            return
+        self.cache.set_prefetched(self.buckets)
+        self._thread = threading.Thread(target=self._run, name="weather-poller", daemon=True)
+        self._thread.start()
+
+    def poll_once(self):
+        """Fetch every region bucket once, spaced by the rate limit."""
+        spacing = 60.0 / max(self.max_requests_per_minute, 1)
+        started = time.time()
+        for i, key in enumerate(sorted(self.buckets)):
+            if i:
+                time.sleep(spacing)
+            lat, lng = self.cache.bucket_center(key)
+            try:
+                self.cache.put(key, self.cache.fetch(lat, lng))
+                self._counters["fetched"] += 1
+            except Exception as e:
+                self._counters["errors"] += 1
+                print(f"Error prefetching weather for bucket {key}: {e}")
+        self._last_poll_at = time.time()
+        self._last_poll_seconds = self._last_poll_at - started
+        self._counters["polls"] += 1
+
+    def metrics(self) -> dict:
+        """Prefetched bucket count, last poll time and duration, counters."""
+        return {
+            "buckets": len(self.buckets),
+            "lastPollAt": self._last_poll_at,
+            "lastPollSeconds": round(self._last_poll_seconds, 2) if self._last_poll_seconds is not None else None,
+            **self._counters,
+        }
+
+    def _run(self):
+        while True:
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"Error polling weather: {e}")
+            time.sleep(self.interval_seconds + random.uniform(0, self.jitter_seconds))
+
+    def _region_buckets(self, margin: int) -> Set[BucketKey]:
+        buckets = set()
+        for south, west, north, east in self.regions:
+            lo_y, lo_x = self.cache.bucket_of(south, west)
+            hi_y, hi_x = self.cache.bucket_of(north, east)
+            for y in range(lo_y - margin, hi_y + margin + 1):
+                for x in range(lo_x - margin, hi_x + margin + 1):
+                    buckets.add((y, x))
+        return buckets
+
+
+# Keeps the shared weather cache warm for the configured regions
+weather_poller = WeatherPoller(
+    weather_cache,
+    parse_regions(WEATHER_PREFETCH_REGIONS),
+    interval_seconds=WEATHER_PREFETCH_SECONDS,
+    max_requests_per_minute=WEATHER_API_MAX_PER_MINUTE,
+    jitter_seconds=WEATHER_PREFETCH_JITTER_SECONDS,
+)
+metrics.register("weatherPoller", weather_poller.metrics)
@@ -5,6 +5,7 @@ import os
 import requests
 from typing import Optional, Dict
 from datetime import datetime
+from app.services.weather_cache import weather_cache
 from config import WEATHER_API_KEY, WEATHER_API_BASE_URL
 
 
@@ -30,22 +31,11 @@ class WeatherService:
             # Return stub data if API key not configured
             return self._get_stub_weather()
         
-        params = {
-            "key": self.api_key,
-            "q": f"{lat},{lng}",
-            "aqi": "no"
-        }
-        
         try:
-            response = requests.get(
-                f"{self.base_url}/current.json",
-                params=params,
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            current = data.get("current", {})
+            if self._uses_shared_cache():
+                current, age = weather_cache.get(lat, lng)
+            else:
+                current, age = self._fetch_current(lat, lng), 0.0
             condition = current.get("condition", {})
             
             # WeatherAPI.com returns visibility in km, convert to meters
@@ -59,13 +49,30 @@ class WeatherService:
                 "clouds_percent": current.get("cloud", 0),
                 "wind_speed": current.get("wind_kph", 0) / 3.6,  # Convert km/h to m/s
                 "temperature": current.get("temp_c", 20),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now().isoformat(),
+                "cache_age_seconds": round(age)
             }
         
         except requests.RequestException as e:
             # Fallback to stub data on error
             return self._get_stub_weather()
     
+    def _uses_shared_cache(self) -> bool:
+        """The shared cache holds conditions fetched with the configured account."""
+        return self.api_key == WEATHER_API_KEY and self.base_url == (
+            WEATHER_API_BASE_URL or "https://api.weatherapi.com/v1"
+        )
+    
+    def _fetch_current(self, lat: float, lng: float) -> Dict:
+        """Fetch current conditions directly (custom API key or base URL)."""
+        response = requests.get(
+            f"{self.base_url}/current.json",
+            params={"key": self.api_key, "q": f"{lat},{lng}", "aqi": "no"},
+            timeout=10
+        )
+        response.raise_for_status()
+        return response.json().get("current", {})
+    
     def _get_stub_weather(self) -> Dict:
         """Return stub weather data for development/testing."""
         return {
@@ -75,6 +82,7 @@ class WeatherService:
             "clouds_percent": 0,
             "wind_speed": 0,
             "temperature": 20,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now().isoformat(),
+            "cache_age_seconds": None
         }
 
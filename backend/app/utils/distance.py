@@ -4,6 +4,14 @@ Distance calculation utilities using Haversine formula.
 from math import radians, sin, cos, sqrt, atan2
 from app.models.route import Coordinate
 
+# Meters per degree of latitude (spherical Earth, R = 6371000)
+METERS_PER_DEGREE = 111195.0
+
+
+def meters_per_degree_lng(lat: float) -> float:
+    """Meters per degree of longitude at a latitude (local flat-Earth projection)."""
+    return METERS_PER_DEGREE * cos(radians(lat))
+
 
 def haversine_distance(coord1: Coordinate, coord2: Coordinate) -> float:
     """
@@ -0,0 +1,164 @@
+"""
+Progress tracking along a planned walking route.
+
+Snaps GPS fixes onto the route polyline to get distance walked, distance
+remaining and an ETA from the walker's observed pace. Segment endpoints are
+projected once to local meters with cumulative distances precomputed, and each
+fix is searched only in a small window around the previous projection, so the
+per-fix cost is amortized O(1). A full scan is used only when the fix falls
+outside the window (walker deviated or GPS jumped).
+"""
+from array import array
+from math import sqrt
+from typing import List, Tuple
+from app.utils.distance import METERS_PER_DEGREE, meters_per_degree_lng
+
+DEFAULT_WALKING_SPEED = 1.4  # m/s
+MIN_WALKING_SPEED = 0.5  # m/s - floor so a pause doesn't push the ETA to infinity
+MAX_WALKING_SPEED = 3.0  # m/s - cap to ignore GPS jumps
+PACE_SMOOTHING = 0.3  # EWMA weight of the newest pace sample
+
+
+class RouteProgress:
+    """Planned route geometry plus the walker's current projection and pace."""
+
+    __slots__ = (
+        "lng_scale",
+        "_xs",
+        "_ys",
+        "_cumulative",
+        "total_meters",
+        "segment_index",
+        "along_meters",
+        "offset_meters",
+        "speed",
+        "_last_along",
+        "_last_time",
+    )
+
+    # Segments searched behind / ahead of the previous projection
+    WINDOW_BACK = 2
+    WINDOW_AHEAD = 8
+    # Farther than this from the windowed match triggers a full scan
+    DEVIATION_METERS = 30.0
+
+    def __init__(self, coordinates: List[Tuple[float, float]]):
+        """
+        Args:
+            coordinates: Route as a list of (lat, lng) tuples (at least two points)
+        """
+        if len(coordinates) < 2:
+            raise ValueError("A route needs at least two points")
+
+        self.lng_scale = meters_per_degree_lng(coordinates[0][0])
+        self._xs = array("d", (lng * self.lng_scale for _, lng in coordinates))
+        self._ys = array("d", (lat * METERS_PER_DEGREE for lat, _ in coordinates))
+
+        # cumulative[i] is the distance along the route to point i
+        self._cumulative = array("d", [0.0])
+        for i in range(1, len(coordinates)):
+            dx = self._xs[i] - self._xs[i - 1]
+            dy = self._ys[i] - self._ys[i - 1]
+            self._cumulative.append(self._cumulative[-1] + sqrt(dx * dx + dy * dy))
+        self.total_meters = self._cumulative[-1]
+
+        self.segment_index = 0
+        self.along_meters = 0.0
+        self.offset_meters = None
+        self.speed = DEFAULT_WALKING_SPEED
+        self._last_along = None
+        self._last_time = None
+
+    def coordinates(self) -> List[Tuple[float, float]]:
+        """Route vertices as (lat, lng) tuples (inverse of the local projection)."""
+        return [
+            (y / METERS_PER_DEGREE, x / self.lng_scale)
+            for x, y in zip(self._xs, self._ys)
+        ]
+
+    @property
+    def remaining_meters(self) -> float:
+        """Distance left along the route from the current projection."""
+        return max(0.0, self.total_meters - self.along_meters)
+
+    def _best_in_range(self, x: float, y: float, start: int, end: int) -> Tuple[float, int, float]:
+        """Closest projection onto segments [start, end); returns (dist_sq, index, along)."""
+        xs, ys, cumulative = self._xs, self._ys, self._cumulative
+        best = (float("inf"), start, cumulative[start])
+        for i in range(start, end):
+            x1, y1 = xs[i], ys[i]
+            dx, dy = xs[i + 1] - x1, ys[i + 1] - y1
+            len_sq = dx * dx + dy * dy
+            t = 0.0
+            if len_sq > 0:
+                t = max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / len_sq))
+            px, py = x1 + t * dx - x, y1 + t * dy - y
+            dist_sq = px * px + py * py
+            if dist_sq < best[0]:
+                best = (dist_sq, i, cumulative[i] + t * (cumulative[i + 1] - cumulative[i]))
+        return best
+
+    def snap(self, lat: float, lng: float) -> Tuple[float, float]:
+        """
+        Project a fix onto the route, searching near the previous projection first.
+
+        Args:
+            lat: Latitude
+            lng: Longitude
+
+        Returns:
+            Tuple of (distance along route in meters, distance off the route in meters)
+        """
+        x, y = lng * self.lng_scale, lat * METERS_PER_DEGREE
+        segments = len(self._xs) - 1
+
+        start = max(0, self.segment_index - self.WINDOW_BACK)
+        end = min(segments, self.segment_index + self.WINDOW_AHEAD)
+        dist_sq, index, along = self._best_in_range(x, y, start, end)
+
+        if dist_sq > self.DEVIATION_METERS ** 2 and (start > 0 or end < segments):
+            dist_sq, index, along = self._best_in_range(x, y, 0, segments)
+
+        self.segment_index = index
+        self.along_meters = along
+        self.offset_meters = sqrt(dist_sq)
+        return along, self.offset_meters
+
+    def update(self, lat: float, lng: float, timestamp: float) -> float:
+        """
+        Snap a fix and fold the progress made since the previous fix into the pace.
+
+        Args:
+            lat: Latitude
+            lng: Longitude
+            timestamp: Epoch seconds of the fix
+
+        Returns:
+            Remaining distance in meters
+        """
+        along, _ = self.snap(lat, lng)
+
+        if self._last_time is not None:
+            elapsed = timestamp - self._last_time
+            if elapsed >= 1.0:
+                sample = max(0.0, along - self._last_along) / elapsed
+                sample = min(sample, MAX_WALKING_SPEED)
+                self.speed = (1 - PACE_SMOOTHING) * self.speed + PACE_SMOOTHING * sample
+                self._last_along, self._last_time = along, timestamp
+        else:
+            self._last_along, self._last_time = along, timestamp
+
+        return self.remaining_meters
+
+    def eta_seconds(self) -> float:
+        """Seconds to arrival at the observed pace."""
+        return self.remaining_meters / max(self.speed, MIN_WALKING_SPEED)
+
+    def to_dict(self) -> dict:
+        """Serialize progress for API responses."""
+        return {
+            "totalMeters": round(self.total_meters),
+            "remainingMeters": round(self.remaining_meters),
+            "offRouteMeters": round(self.offset_meters) if self.offset_meters is not None else None,
+            "speedMps": round(self.speed, 2),
+        }
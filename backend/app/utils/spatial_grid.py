@@ -0,0 +1,210 @@
+"""
+Uniform grid spatial indexes over lat/lng.
+
+GridIndex registers items in every grid cell their bounding box overlaps, so
+a point query only inspects the items of a single cell. PointIndex keeps
+moving points in a single cell each, so a move is O(1) and nearest-neighbour
+and radius queries only inspect the cells around the query point.
+"""
+from math import floor, hypot
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+from app.utils.distance import METERS_PER_DEGREE, meters_per_degree_lng
+
+# Campus reference latitude; fixes the longitude scale of the grid
+DEFAULT_ORIGIN_LAT = 47.655
+
+
+class GridIndex:
+    """Bounding-box grid index keyed by arbitrary hashable item keys."""
+
+    def __init__(self, cell_meters: float = 250.0, origin_lat: float = DEFAULT_ORIGIN_LAT):
+        self.cell_meters = cell_meters
+        self._lat_step = cell_meters / METERS_PER_DEGREE
+        self._lng_step = cell_meters / meters_per_degree_lng(origin_lat)
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self._item_cells: Dict[Hashable, List[Tuple[int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._item_cells)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._item_cells
+
+    def cell_of(self, lat: float, lng: float) -> Tuple[int, int]:
+        """Grid cell containing a point."""
+        return floor(lat / self._lat_step), floor(lng / self._lng_step)
+
+    def insert(self, key: Hashable, min_lat: float, min_lng: float, max_lat: float, max_lng: float):
+        """
+        Register an item by bounding box, replacing any previous registration.
+
+        Args:
+            key: Item key
+            min_lat, min_lng, max_lat, max_lng: Bounding box of the item
+        """
+        self.remove(key)
+        lo_y, lo_x = self.cell_of(min_lat, min_lng)
+        hi_y, hi_x = self.cell_of(max_lat, max_lng)
+        cells = []
+        for cy in range(lo_y, hi_y + 1):
+            for cx in range(lo_x, hi_x + 1):
+                self._cells.setdefault((cy, cx), set()).add(key)
+                cells.append((cy, cx))
+        self._item_cells[key] = cells
+
+    def remove(self, key: Hashable):
+        """Unregister an item (no-op if unknown)."""
+        for cell in self._item_cells.pop(key, ()):
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._cells[cell]
+
+    def query_point(self, lat: float, lng: float) -> Set[Hashable]:
+        """Keys of items whose bounding box may contain the point."""
+        return self._cells.get(self.cell_of(lat, lng), set())
+
+    def query_bbox(self, min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> Set[Hashable]:
+        """Keys of items whose bounding box may overlap the given box."""
+        lo_y, lo_x = self.cell_of(min_lat, min_lng)
+        hi_y, hi_x = self.cell_of(max_lat, max_lng)
+        found = set()
+        for cy in range(lo_y, hi_y + 1):
+            for cx in range(lo_x, hi_x + 1):
+                found.update(self._cells.get((cy, cx), ()))
+        return found
+
+    def clear(self):
+        """Remove all items."""
+        self._cells.clear()
+        self._item_cells.clear()
+
+
+class PointIndex:
+    """Grid index of moving points with O(1) moves, radius and k-nearest queries."""
+
+    def __init__(self, cell_meters: float = 100.0, origin_lat: float = DEFAULT_ORIGIN_LAT):
+        self.cell_meters = cell_meters
+        self._lat_step = cell_meters / METERS_PER_DEGREE
+        self._lng_step = cell_meters / meters_per_degree_lng(origin_lat)
+        self._lng_meters = meters_per_degree_lng(origin_lat)
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self._points: Dict[Hashable, Tuple[float, float, Tuple[int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._points
+
+    def cell_of(self, lat: float, lng: float) -> Tuple[int, int]:
+        """Grid cell containing a point."""
+        return floor(lat / self._lat_step), floor(lng / self._lng_step)
+
+    def get(self, key: Hashable) -> Optional[Tuple[float, float]]:
+        """Current (lat, lng) of a point, or None if unknown."""
+        point = self._points.get(key)
+        return (point[0], point[1]) if point is not None else None
+
+    def move(self, key: Hashable, lat: float, lng: float):
+        """Insert a point or move it to a new position."""
+        cell = self.cell_of(lat, lng)
+        previous = self._points.get(key)
+        if previous is not None and previous[2] != cell:
+            self._discard(key, previous[2])
+        if previous is None or previous[2] != cell:
+            self._cells.setdefault(cell, set()).add(key)
+        self._points[key] = (lat, lng, cell)
+
+    def remove(self, key: Hashable):
+        """Remove a point (no-op if unknown)."""
+        previous = self._points.pop(key, None)
+        if previous is not None:
+            self._discard(key, previous[2])
+
+    def clear(self):
+        """Remove all points."""
+        self._cells.clear()
+        self._points.clear()
+
+    def distance_meters(self, lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+        """Planar distance in meters, accurate at campus scale."""
+        return hypot((lat2 - lat1) * METERS_PER_DEGREE, (lng2 - lng1) * self._lng_meters)
+
+    def within(self, lat: float, lng: float, radius_meters: float) -> List[Tuple[float, Hashable]]:
+        """
+        Points within a radius.
+
+        Returns:
+            List of (distance in meters, key), nearest first
+        """
+        rings = int(radius_meters // self.cell_meters) + 1
+        found = []
+        for ring in range(rings + 1):
+            for key, distance in self._ring(lat, lng, ring):
+                if distance <= radius_meters:
+                    found.append((distance, key))
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        k: int,
+        max_meters: Optional[float] = None
+    ) -> List[Tuple[float, Hashable]]:
+        """
+        The k nearest points, searching outward ring by ring of cells.
+
+        Args:
+            lat, lng: Query point
+            k: Number of points to return
+            max_meters: Ignore points farther than this
+
+        Returns:
+            List of up to k (distance in meters, key), nearest first
+        """
+        if k <= 0 or not self._points:
+            return []
+        found = []
+        ring = 0
+        while True:
+            # Once the rings cover more cells than are occupied, scanning is cheaper
+            if (2 * ring + 1) ** 2 > len(self._cells):
+                found = [
+                    (self.distance_meters(lat, lng, p_lat, p_lng), key)
+                    for key, (p_lat, p_lng, _) in self._points.items()
+                ]
+                break
+            found.extend((distance, key) for key, distance in self._ring(lat, lng, ring))
+            # Points in later rings are at least ring * cell_meters away
+            reach = ring * self.cell_meters
+            if max_meters is not None and reach > max_meters:
+                break
+            if len(found) >= k and sorted(found, key=lambda item: item[0])[k - 1][0] <= reach:
+                break
+            ring += 1
+        if max_meters is not None:
+            found = [item for item in found if item[0] <= max_meters]
+        found.sort(key=lambda item: item[0])
+        return found[:k]
+
+    def _ring(self, lat: float, lng: float, ring: int):
+        """Yield (key, distance) for points in cells exactly `ring` cells away."""
+        cy, cx = self.cell_of(lat, lng)
+        for y in range(cy - ring, cy + ring + 1):
+            edge = y in (cy - ring, cy + ring)
+            step = 1 if edge else 2 * ring
+            for x in range(cx - ring, cx + ring + 1, step or 1):
+                for key in self._cells.get((y, x), ()):
+                    p_lat, p_lng, _ = self._points[key]
+                    yield key, self.distance_meters(lat, lng, p_lat, p_lng)
+
+    def _discard(self, key: Hashable, cell: Tuple[int, int]):
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[cell]
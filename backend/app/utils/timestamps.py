@@ -0,0 +1,12 @@
+"""
+Timestamp helpers. Live state stores epoch seconds; APIs expose ISO 8601 strings.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def isoformat(timestamp: Optional[float]) -> Optional[str]:
+    """Convert an epoch timestamp to an ISO 8601 UTC string (None stays None)."""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
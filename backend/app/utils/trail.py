@@ -0,0 +1,162 @@
+"""
+Bounded location trail for walk sessions.
+
+Stores (lat, lng, timestamp) fixes in fixed-capacity arrays. When the arrays
+fill up, the older half of the trail is simplified in place with
+Douglas-Peucker, so the recent path stays at full resolution, the start of
+the walk is never lost, and memory stays constant however long the walk lasts.
+"""
+from array import array
+from math import sqrt
+from typing import List, Optional, Tuple
+import polyline
+from app.utils.distance import METERS_PER_DEGREE, meters_per_degree_lng
+from app.utils.timestamps import isoformat
+
+
+def _perpendicular_distance(
+    lat: float, lng: float,
+    lat1: float, lng1: float,
+    lat2: float, lng2: float,
+    lng_scale: float
+) -> float:
+    """Distance in meters from a point to a segment using a local flat projection."""
+    x, y = lng * lng_scale, lat * METERS_PER_DEGREE
+    x1, y1 = lng1 * lng_scale, lat1 * METERS_PER_DEGREE
+    x2, y2 = lng2 * lng_scale, lat2 * METERS_PER_DEGREE
+    dx, dy = x2 - x1, y2 - y1
+    len_sq = dx * dx + dy * dy
+    if len_sq == 0:
+        return sqrt((x - x1) ** 2 + (y - y1) ** 2)
+    t = max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / len_sq))
+    px, py = x1 + t * dx, y1 + t * dy
+    return sqrt((x - px) ** 2 + (y - py) ** 2)
+
+
+def douglas_peucker(points: List[Tuple[float, float, float]], tolerance_meters: float) -> List[int]:
+    """
+    Simplify a path with the Douglas-Peucker algorithm.
+
+    Args:
+        points: List of (lat, lng, timestamp) tuples
+        tolerance_meters: Maximum allowed deviation from the simplified path
+
+    Returns:
+        Sorted indices of the points to keep (always includes both endpoints)
+    """
+    n = len(points)
+    if n <= 2:
+        return list(range(n))
+
+    lng_scale = meters_per_degree_lng(points[0][0])
+    keep = [False] * n
+    keep[0] = keep[n - 1] = True
+    stack = [(0, n - 1)]
+
+    while stack:
+        start, end = stack.pop()
+        lat1, lng1 = points[start][0], points[start][1]
+        lat2, lng2 = points[end][0], points[end][1]
+        max_dist, max_idx = 0.0, -1
+        for i in range(start + 1, end):
+            dist = _perpendicular_distance(
+                points[i][0], points[i][1], lat1, lng1, lat2, lng2, lng_scale
+            )
+            if dist > max_dist:
+                max_dist, max_idx = dist, i
+        if max_idx != -1 and max_dist > tolerance_meters:
+            keep[max_idx] = True
+            stack.append((start, max_idx))
+            stack.append((max_idx, end))
+
+    return [i for i in range(n) if keep[i]]
+
+
+class LocationTrail:
+    """Fixed-capacity, array-backed buffer of location fixes with online downsampling."""
+
+    __slots__ = ("capacity", "tolerance_meters", "_lats", "_lngs", "_times", "_count")
+
+    def __init__(self, capacity: int = 256, tolerance_meters: float = 5.0):
+        if capacity < 8:
+            raise ValueError(f"Trail capacity must be at least 8, got {capacity}")
+        self.capacity = capacity
+        self.tolerance_meters = tolerance_meters
+        self._lats = array("d", bytes(8 * capacity))
+        self._lngs = array("d", bytes(8 * capacity))
+        self._times = array("d", bytes(8 * capacity))
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, lat: float, lng: float, timestamp: float):
+        """
+        Add a fix to the trail, compacting older points when the buffer is full.
+
+        Args:
+            lat: Latitude
+            lng: Longitude
+            timestamp: Epoch seconds of the fix
+        """
+        if self._count == self.capacity:
+            self._compact()
+
+        idx = self._count
+        self._lats[idx] = lat
+        self._lngs[idx] = lng
+        self._times[idx] = timestamp
+        self._count += 1
+
+    def points(self) -> List[Tuple[float, float, float]]:
+        """Trail points from oldest to newest as (lat, lng, timestamp) tuples."""
+        n = self._count
+        return list(zip(self._lats[:n], self._lngs[:n], self._times[:n]))
+
+    def encode(self) -> str:
+        """Trail as a Google encoded polyline string."""
+        return polyline.encode([(lat, lng) for lat, lng, _ in self.points()])
+
+    def to_dict(self) -> Optional[dict]:
+        """Serialize the trail for API responses, or None when empty."""
+        if not self._count:
+            return None
+        points = self.points()
+        return {
+            "polyline": self.encode(),
+            "points": len(points),
+            "startTimestamp": isoformat(points[0][2]),
+            "endTimestamp": isoformat(points[-1][2]),
+        }
+
+    def _compact(self):
+        """
+        Downsample the older half of the trail in place.
+
+        The tolerance is doubled until the older half shrinks by at least a
+        quarter of the capacity; if it never does, every other point is dropped.
+        """
+        points = self.points()
+        split = self._count // 2
+        older, recent = points[:split + 1], points[split + 1:]
+        target = len(older) - self.capacity // 4
+
+        tolerance = self.tolerance_meters
+        kept = None
+        for _ in range(8):
+            indices = douglas_peucker(older, tolerance)
+            if len(indices) <= target:
+                kept = [older[i] for i in indices]
+                break
+            tolerance *= 2
+        if kept is None:
+            kept = older[::2]
+            if kept[-1] is not older[-1]:
+                kept.append(older[-1])
+
+        self._count = 0
+        for lat, lng, timestamp in kept + recent:
+            self._lats[self._count] = lat
+            self._lngs[self._count] = lng
+            self._times[self._count] = timestamp
+            self._count += 1
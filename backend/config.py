@@ -18,6 +18,17 @@ WEATHER_API_BASE_URL = os.getenv(
     "https://api.weatherapi.com/v1"
 )
 
+# Weather cache (conditions are shared per grid bucket)
+WEATHER_BUCKET_METERS = float(os.getenv("WEATHER_BUCKET_METERS", "2000"))
+WEATHER_TTL_SECONDS = int(os.getenv("WEATHER_TTL_SECONDS", "600"))  # Refreshed in the background after this
+WEATHER_MAX_STALE_SECONDS = int(os.getenv("WEATHER_MAX_STALE_SECONDS", "3600"))  # Never served past this
+
+# Weather prefetch ("south,west,north,east;..."; defaults to the UW Seattle campus)
+WEATHER_PREFETCH_REGIONS = os.getenv("WEATHER_PREFETCH_REGIONS", "47.648,-122.320,47.667,-122.290")
+WEATHER_PREFETCH_SECONDS = int(os.getenv("WEATHER_PREFETCH_SECONDS", "300"))
+WEATHER_PREFETCH_JITTER_SECONDS = int(os.getenv("WEATHER_PREFETCH_JITTER_SECONDS", "30"))
+WEATHER_API_MAX_PER_MINUTE = int(os.getenv("WEATHER_API_MAX_PER_MINUTE", "30"))  # Prefetch rate limit
+
 # UW Alerts
 UW_ALERTS_URL = os.getenv("UW_ALERTS_URL", "https://emergency.uw.edu/")
 UW_ALERTS_ENABLED = os.getenv("UW_ALERTS_ENABLED", "true").lower() == "true"
@@ -26,6 +37,23 @@ UW_ALERTS_ENABLED = os.getenv("UW_ALERTS_ENABLED", "true").lower() == "true"
 UW_CALLBOXES_GEOJSON_URL = os.getenv("UW_CALLBOXES_GEOJSON_URL", "")
 UW_CALLBOXES_GEOJSON_PATH = os.getenv("UW_CALLBOXES_GEOJSON_PATH", "")
 
+# Callbox distance field (raster over the campus, "south,west,north,east")
+CAMPUS_BBOX = os.getenv("CAMPUS_BBOX", "47.648,-122.320,47.667,-122.290")
+CALLBOX_FIELD_CELL_METERS = float(os.getenv("CALLBOX_FIELD_CELL_METERS", "10"))
+CALLBOX_FIELD_MAX_METERS = float(os.getenv("CALLBOX_FIELD_MAX_METERS", "500"))  # Distances are capped here
+CALLBOX_FIELD_PATH = os.getenv("CALLBOX_FIELD_PATH", "data/callbox_field.bin")  # Empty disables persistence
+CALLBOX_REFRESH_SECONDS = int(os.getenv("CALLBOX_REFRESH_SECONDS", "3600"))  # Dataset re-check interval (0 loads once)
+
+# Safety heatmap tiles
+TILE_CACHE_MEMORY_TILES = int(os.getenv("TILE_CACHE_MEMORY_TILES", "512"))
+TILE_CACHE_DISK_TILES = int(os.getenv("TILE_CACHE_DISK_TILES", "10000"))
+TILE_CACHE_DIR = os.getenv("TILE_CACHE_DIR", "data/tiles")  # Empty disables the disk tier
+
+# Route scoring
+RISK_PROFILE_SAMPLES = int(os.getenv("RISK_PROFILE_SAMPLES", "50"))  # Max risk profile samples per route
+SCORE_CACHE_SIZE = int(os.getenv("SCORE_CACHE_SIZE", "5000"))  # 0 disables the cache
+SCORE_CACHE_VISIBILITY_BAND_METERS = float(os.getenv("SCORE_CACHE_VISIBILITY_BAND_METERS", "100"))  # Cache key step; a hit reuses scores from within half a step
+
 # Flask Configuration
 FLASK_ENV = os.getenv("FLASK_ENV", "development")
 FLASK_DEBUG = os.getenv("FLASK_DEBUG", "True").lower() == "true"
@@ -37,3 +65,54 @@ CORS_ORIGINS = os.getenv(
     "http://localhost:5173,http://localhost:8081,exp://localhost:8081"
 ).split(",")
 
+# Walk Sessions
+SESSION_TTL_MINUTES = int(os.getenv("SESSION_TTL_MINUTES", "30"))  # Evict finished walks after this long
+SESSION_ABANDON_MINUTES = int(os.getenv("SESSION_ABANDON_MINUTES", "60"))  # Silent active walks become abandoned
+SESSION_SWEEP_SECONDS = int(os.getenv("SESSION_SWEEP_SECONDS", "60"))
+SESSION_ARCHIVE_PATH = os.getenv("SESSION_ARCHIVE_PATH", "data/session_archive.jsonl")
+TRAIL_CAPACITY = int(os.getenv("TRAIL_CAPACITY", "256"))  # Max stored points per session trail
+TRAIL_TOLERANCE_METERS = float(os.getenv("TRAIL_TOLERANCE_METERS", "5"))  # Initial downsampling tolerance
+ALERT_ZONE_REFRESH_SECONDS = int(os.getenv("ALERT_ZONE_REFRESH_SECONDS", "300"))  # Geofence alert zone reload interval
+ALERT_INDEX_CELL_METERS = float(os.getenv("ALERT_INDEX_CELL_METERS", "250"))  # Alert zone grid cell size
+ALERT_CORRIDOR_METERS = float(os.getenv("ALERT_CORRIDOR_METERS", "50"))  # Route corridor half-width for alert penalties
+ALERT_NEARBY_METERS = float(os.getenv("ALERT_NEARBY_METERS", "200"))  # Walkers this close to a new alert zone are told
+
+# Notifications
+NOTIFY_WORKERS = int(os.getenv("NOTIFY_WORKERS", "4"))
+NOTIFY_QUEUE_SIZE = int(os.getenv("NOTIFY_QUEUE_SIZE", "1000"))
+NOTIFY_RESERVED_SLOTS = int(os.getenv("NOTIFY_RESERVED_SLOTS", "100"))  # Queue room kept for panics
+NOTIFY_WEBHOOK_ALLOWED_HOSTS = [  # Hosts webhook contacts may target; empty allows any public https host
+    host.strip() for host in os.getenv("NOTIFY_WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()
+]
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")  # e.g. a local debugging SMTP server
+SMTP_PORT = int(os.getenv("SMTP_PORT", "1025"))
+SMTP_SENDER = os.getenv("SMTP_SENDER", "safewalk@localhost")
+
+# Session durability (set SESSION_LOG_DIR to an empty string to disable)
+SESSION_LOG_DIR = os.getenv("SESSION_LOG_DIR", "data/session_log")
+SESSION_LOG_FLUSH_MS = int(os.getenv("SESSION_LOG_FLUSH_MS", "50"))  # Group commit interval
+SESSION_SNAPSHOT_SECONDS = int(os.getenv("SESSION_SNAPSHOT_SECONDS", "300"))  # Snapshot + compaction interval
+
+# Companion fallback (SSE and long-poll)
+COMPANION_FEED_BUFFER = int(os.getenv("COMPANION_FEED_BUFFER", "64"))  # Events kept per session for resume
+COMPANION_POLL_TIMEOUT_SECONDS = int(os.getenv("COMPANION_POLL_TIMEOUT_SECONDS", "25"))
+COMPANION_SSE_KEEPALIVE_SECONDS = int(os.getenv("COMPANION_SSE_KEEPALIVE_SECONDS", "15"))
+
+# Security console and admin APIs
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")  # Required from consoles and admin callers; both are refused while empty
+CONSOLE_FRAME_SECONDS = float(os.getenv("CONSOLE_FRAME_SECONDS", "1.0"))  # Aggregated frame interval
+CONSOLE_MAX_AREAS = int(os.getenv("CONSOLE_MAX_AREAS", "64"))  # Distinct console bounding boxes at once
+
+# Per-client Socket.IO backpressure
+CLIENT_QUEUE_SIZE = int(os.getenv("CLIENT_QUEUE_SIZE", "64"))  # Routine messages queued per connection
+CLIENT_TRANSPORT_BACKLOG = int(os.getenv("CLIENT_TRANSPORT_BACKLOG", "16"))  # Unsent packets before holding back
+
+# Adaptive location reporting
+REPORT_INTERVAL_MIN_SECONDS = float(os.getenv("REPORT_INTERVAL_MIN_SECONDS", "1"))
+REPORT_INTERVAL_MAX_SECONDS = float(os.getenv("REPORT_INTERVAL_MAX_SECONDS", "30"))
+REPORT_DISTANCE_METERS = float(os.getenv("REPORT_DISTANCE_METERS", "25"))  # Walked between routine reports
+REPORT_LOAD_BACKLOG = int(os.getenv("REPORT_LOAD_BACKLOG", "500"))  # Queued room events counted as full load
+
+# Proximity index of live positions
+PROXIMITY_CELL_METERS = float(os.getenv("PROXIMITY_CELL_METERS", "100"))
+PANIC_NEARBY_COUNT = int(os.getenv("PANIC_NEARBY_COUNT", "3"))  # Callboxes/walkers/responders in panic payload
@@ -0,0 +1,489 @@
+"""
+Frozen copies of the route scorers as they were before the batch scoring
+engine, kept as the reference for the parity tests. Do not change them to
+follow the engine. The scorer takes the alert index and callbox field it
+used to import as arguments.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+import polyline
+from app.models.route import Route
+from app.models.safety import (
+    SafetyScore,
+    SafetyFactors,
+    SafetyTag,
+    CallboxLocation,
+    UWAlert
+)
+
+
+
+
+def normalize(value: float, min_val: float, max_val: float) -> float:
+    """
+    Normalize a value to the range [0, 1] using min-max normalization.
+    
+    Args:
+        value: Value to normalize
+        min_val: Minimum value (maps to 0)
+        max_val: Maximum value (maps to 1)
+    
+    Returns:
+        Normalized value between 0 and 1
+    """
+    if max_val == min_val:
+        return 1.0
+    
+    normalized = (value - min_val) / (max_val - min_val)
+    return max(0.0, min(1.0, normalized))  # Clamp between 0 and 1
+
+
+def baseline_compute_safety_score(
+    route: Dict,
+    visibility_meters: float
+) -> Dict:
+    """
+    Compute a safety score (0-100) for a Google Maps walking route.
+    
+    Args:
+        route: Google Maps route object (from get_candidate_routes)
+            Must contain:
+            - "overview_polyline" with "points" key
+            - "legs" array with distance and duration
+        visibility_meters: Current weather visibility in meters
+    
+    Returns:
+        Dictionary with:
+        - safetyScore: int (0-100)
+        - explanation: List[str] (2-4 human-readable sentences)
+        - tags: List[str]
+        - polyline: str (original encoded polyline)
+        - etaMinutes: int
+        - distanceMeters: int
+    """
+    # Extract route data
+    overview_polyline = route.get("overview_polyline", {})
+    encoded_polyline = overview_polyline.get("points", "")
+    
+    # Decode polyline to get coordinates
+    try:
+        coordinates = polyline.decode(encoded_polyline)
+        # Sample up to ~50 points along the route using slicing
+        if len(coordinates) > 50:
+            step = len(coordinates) // 50
+            sampled_coordinates = coordinates[::step][:50]
+        else:
+            sampled_coordinates = coordinates
+    except Exception:
+        # If polyline decoding fails, use empty list
+        sampled_coordinates = []
+    
+    # Extract distance and duration from route legs
+    legs = route.get("legs", [])
+    distance_meters = 0
+    duration_seconds = 0
+    
+    for leg in legs:
+        distance_meters += leg.get("distance", {}).get("value", 0)
+        duration_seconds += leg.get("duration", {}).get("value", 0)
+    
+    eta_minutes = int(duration_seconds / 60)
+    
+    # Compute visibility score (normalize visibility between 2000 and 10000 meters)
+    # visibility < 2000 → very low (score ~0)
+    # visibility >= 10000 → max score = 1
+    visibility_score = normalize(visibility_meters, min_val=2000, max_val=10000)
+    
+    # Compute length score
+    # Shorter routes are safer
+    # Use maxDistance = 2000 meters (2km). Any route longer than that gets lengthScore = 0
+    max_distance = 2000  # meters
+    if distance_meters > max_distance:
+        length_score = 0.0
+    else:
+        # Normalize: maxDistance - distanceMeters, where distanceMeters=0 gives max score
+        length_score = normalize(max_distance - distance_meters, min_val=0, max_val=max_distance)
+    
+    # Combine with weights
+    w_vis = 0.6
+    w_len = 0.4
+    
+    risk = (
+        w_vis * (1 - visibility_score) +
+        w_len * (1 - length_score)
+    )
+    
+    safety_score = max(0, int(100 - risk * 100))
+    
+    # Produce tags
+    tags = []
+    if visibility_score > 0.7:
+        tags.append("Good visibility")
+    elif visibility_score < 0.3:
+        tags.append("Poor visibility")
+    
+    if length_score > 0.7:
+        tags.append("Short route")
+    
+    # Add nighttime penalty tag if visibility < 4000m
+    if visibility_meters < 4000:
+        tags.append("Low visibility conditions")
+    
+    # Produce explanation list with 2-4 human-readable sentences
+    explanation = []
+    
+    # Distance explanation
+    if distance_meters <= 1000:
+        explanation.append(f"This is a short route of {distance_meters}m, taking approximately {eta_minutes} minutes.")
+    elif distance_meters <= 2000:
+        explanation.append(f"This route is {distance_meters}m long and takes approximately {eta_minutes} minutes.")
+    else:
+        explanation.append(f"This is a longer route of {distance_meters}m, taking approximately {eta_minutes} minutes.")
+    
+    # Visibility explanation
+    if visibility_score > 0.7:
+        explanation.append(f"Excellent visibility conditions ({int(visibility_meters)}m) make this route safer.")
+    elif visibility_score > 0.3:
+        explanation.append(f"Moderate visibility ({int(visibility_meters)}m) is acceptable for walking.")
+    else:
+        explanation.append(f"Poor visibility ({int(visibility_meters)}m) reduces safety, especially at night.")
+    
+    # Length impact
+    if length_score > 0.7:
+        explanation.append("The short distance minimizes exposure time.")
+    elif length_score < 0.3:
+        explanation.append("The longer distance increases overall risk.")
+    
+    # Safety score summary
+    if safety_score >= 80:
+        explanation.append("Overall, this route has a high safety score.")
+    elif safety_score >= 60:
+        explanation.append("This route has a moderate safety score.")
+    else:
+        explanation.append("This route has a lower safety score due to visibility and distance factors.")
+    
+    # Ensure explanation has 2-4 sentences
+    if len(explanation) > 4:
+        explanation = explanation[:4]
+    elif len(explanation) < 2:
+        explanation.append("Consider your comfort level with the route conditions.")
+    
+    return {
+        "safetyScore": safety_score,
+        "explanation": explanation,
+        "tags": tags,
+        "polyline": encoded_polyline,
+        "etaMinutes": eta_minutes,
+        "distanceMeters": distance_meters
+    }
+
+
+# Alias for compatibility
+def baseline_score_route(route: Dict, weather: Dict) -> Dict:
+    """
+    Alias for compute_safety_score that takes weather dict.
+    
+    Args:
+        route: Google Maps route object
+        weather: Weather dict with "visibility" key (in meters)
+    
+    Returns:
+        Safety score dictionary
+    """
+    visibility_meters = weather.get("visibility", 10000)
+    return baseline_compute_safety_score(route, visibility_meters)
+
+
+
+
+class BaselineSafetyScorer:
+    """Service for calculating safety scores based on multiple factors."""
+    
+    def __init__(self, zones, field=None):
+        # The shared callbox field and alert index, passed in rather than imported
+        self.zones = zones
+        self.field = field
+    
+    # Scoring weights (sum should be ~1.0)
+    WEIGHT_CALLBOX = 0.35
+    WEIGHT_VISIBILITY = 0.25
+    WEIGHT_ALERTS = 0.25
+    WEIGHT_TIME_OF_DAY = 0.10
+    WEIGHT_ROUTE_LENGTH = 0.05
+    
+    # Thresholds
+    CALLBOX_OPTIMAL_DISTANCE = 50.0  # meters - ideal distance
+    CALLBOX_MAX_DISTANCE = 200.0  # meters - beyond this, no benefit
+    VISIBILITY_GOOD = 10000  # meters
+    VISIBILITY_POOR = 1000  # meters
+    ROUTE_LENGTH_PREFERRED = 500.0  # meters - shorter is slightly better
+    
+    def calculate_safety_score(
+        self,
+        route: Route,
+        callboxes: List[CallboxLocation],
+        weather_data: dict,
+        alerts: List[UWAlert],
+        time_of_day: Optional[datetime] = None
+    ) -> SafetyScore:
+        """
+        Calculate a comprehensive safety score for a route.
+        
+        Args:
+            route: The route to score
+            callboxes: Callboxes along/near the route
+            weather_data: Weather data from WeatherService
+            alerts: Active UW alerts (only campus-wide alerts and those whose
+                zone lies along the route count against it)
+            time_of_day: Current time (defaults to now)
+        
+        Returns:
+            SafetyScore object with score, explanation, tags, and factors
+        """
+        if time_of_day is None:
+            time_of_day = datetime.now()
+        
+        points = self._route_points(route)
+        alerts = self.zones.route_alerts(alerts, points)
+        
+        # Calculate individual factor scores
+        field_distance = self.field.route_distance(points) if self.field is not None else None
+        callbox_score = self._score_callbox_proximity(callboxes, field_distance)
+        visibility_score = self._score_weather_visibility(weather_data)
+        alerts_penalty = self._score_alerts(alerts)
+        time_score = self._score_time_of_day(time_of_day)
+        length_score = self._score_route_length(route.distance_meters)
+        
+        factors = SafetyFactors(
+            callbox_proximity_score=callbox_score,
+            weather_visibility_score=visibility_score,
+            alerts_penalty=alerts_penalty,
+            time_of_day_score=time_score,
+            route_length_score=length_score
+        )
+        
+        # Calculate weighted overall score
+        base_score = (
+            callbox_score * self.WEIGHT_CALLBOX +
+            visibility_score * self.WEIGHT_VISIBILITY +
+            time_score * self.WEIGHT_TIME_OF_DAY +
+            length_score * self.WEIGHT_ROUTE_LENGTH
+        )
+        
+        # Apply alerts penalty (subtract from score)
+        final_score = max(0, min(100, base_score - alerts_penalty))
+        
+        # Generate tags
+        tags = self._generate_tags(
+            callboxes, weather_data, alerts, time_of_day, route.distance_meters
+        )
+        
+        # Generate explanation
+        explanation = self._generate_explanation(
+            callboxes, weather_data, alerts, time_of_day, factors
+        )
+        
+        return SafetyScore(
+            score=round(final_score, 1),
+            explanation=explanation,
+            tags=tags,
+            factors=factors
+        )
+    
+    def _score_callbox_proximity(
+        self,
+        callboxes: List[CallboxLocation],
+        field_distance: Optional[float] = None
+    ) -> float:
+        """
+        Score based on proximity to emergency callboxes.
+        
+        Args:
+            callboxes: Callboxes along/near the route
+            field_distance: Closest approach of the route to a callbox from the
+                precomputed distance field, used instead of the list when known
+        """
+        if field_distance is not None:
+            distance = field_distance
+        elif not callboxes:
+            return 30.0  # Low score if no callboxes nearby
+        else:
+            # Use the closest callbox
+            closest = min(callboxes, key=lambda x: x.distance_meters)
+            distance = closest.distance_meters
+        
+        if distance <= self.CALLBOX_OPTIMAL_DISTANCE:
+            return 100.0
+        elif distance <= self.CALLBOX_MAX_DISTANCE:
+            # Linear interpolation between optimal and max
+            ratio = (self.CALLBOX_MAX_DISTANCE - distance) / (
+                self.CALLBOX_MAX_DISTANCE - self.CALLBOX_OPTIMAL_DISTANCE
+            )
+            return 50.0 + (ratio * 50.0)
+        else:
+            return 30.0
+    
+    def _score_weather_visibility(self, weather_data: dict) -> float:
+        """Score based on weather visibility."""
+        visibility = weather_data.get("visibility_meters", 10000)
+        weather_condition = weather_data.get("weather_condition", "Clear").lower()
+        
+        # Check for poor weather conditions
+        poor_conditions = ["fog", "mist", "haze", "rain", "snow", "storm"]
+        is_poor_weather = any(cond in weather_condition for cond in poor_conditions)
+        
+        if visibility >= self.VISIBILITY_GOOD and not is_poor_weather:
+            return 100.0
+        elif visibility >= self.VISIBILITY_POOR:
+            # Linear interpolation
+            ratio = (visibility - self.VISIBILITY_POOR) / (
+                self.VISIBILITY_GOOD - self.VISIBILITY_POOR
+            )
+            base_score = 50.0 + (ratio * 50.0)
+            # Reduce if poor weather condition
+            return base_score * (0.7 if is_poor_weather else 1.0)
+        else:
+            return 30.0
+    
+    def _score_alerts(self, alerts: List[UWAlert]) -> float:
+        """Calculate penalty based on active alerts."""
+        if not alerts:
+            return 0.0
+        
+        # Sum up penalties based on alert severity
+        total_penalty = 0.0
+        for alert in alerts:
+            if not alert.active:
+                continue
+            
+            severity_penalties = {
+                "low": 5.0,
+                "medium": 15.0,
+                "high": 30.0,
+                "critical": 50.0
+            }
+            total_penalty += severity_penalties.get(alert.severity, 15.0)
+        
+        # Cap penalty at 50 points
+        return min(50.0, total_penalty)
+    
+    def _route_points(self, route: Route) -> List[tuple]:
+        """Route geometry as (lat, lng) points, from waypoints or the polyline."""
+        if route.waypoints:
+            return [(w.lat, w.lng) for w in route.waypoints]
+        try:
+            return polyline.decode(route.polyline) if route.polyline else []
+        except Exception:
+            return []
+    
+    def _score_time_of_day(self, time_of_day: datetime) -> float:
+        """Score based on time of day (daylight vs nighttime)."""
+        hour = time_of_day.hour
+        
+        # Daylight hours (roughly 6 AM to 8 PM)
+        if 6 <= hour < 20:
+            return 100.0
+        # Dusk/dawn (5-6 AM, 8-9 PM)
+        elif (5 <= hour < 6) or (20 <= hour < 21):
+            return 70.0
+        # Nighttime
+        else:
+            return 40.0
+    
+    def _score_route_length(self, distance_meters: float) -> float:
+        """Score based on route length (shorter is slightly better)."""
+        if distance_meters <= self.ROUTE_LENGTH_PREFERRED:
+            return 100.0
+        else:
+            # Slight penalty for longer routes
+            ratio = min(1.0, self.ROUTE_LENGTH_PREFERRED / distance_meters)
+            return 70.0 + (ratio * 30.0)
+    
+    def _generate_tags(
+        self,
+        callboxes: List[CallboxLocation],
+        weather_data: dict,
+        alerts: List[UWAlert],
+        time_of_day: datetime,
+        route_length: float
+    ) -> List[SafetyTag]:
+        """Generate safety tags based on route characteristics."""
+        tags = []
+        
+        # Callbox tags
+        if len(callboxes) >= 2:
+            tags.append(SafetyTag.MULTIPLE_CALLBOXES)
+        elif len(callboxes) == 1:
+            tags.append(SafetyTag.CALLBOX_NEARBY)
+        else:
+            tags.append(SafetyTag.NO_CALLBOXES)
+        
+        # Time of day tags
+        hour = time_of_day.hour
+        if 6 <= hour < 20:
+            tags.append(SafetyTag.DAYLIGHT)
+        else:
+            tags.append(SafetyTag.NIGHTTIME)
+        
+        # Visibility tags
+        visibility = weather_data.get("visibility_meters", 10000)
+        if visibility >= self.VISIBILITY_GOOD:
+            tags.append(SafetyTag.GOOD_VISIBILITY)
+        else:
+            tags.append(SafetyTag.POOR_VISIBILITY)
+        
+        # Alert tags
+        if alerts:
+            tags.append(SafetyTag.ACTIVE_ALERTS)
+        else:
+            tags.append(SafetyTag.NO_ALERTS)
+        
+        # Route length tags
+        if route_length <= self.ROUTE_LENGTH_PREFERRED:
+            tags.append(SafetyTag.SHORT_ROUTE)
+        else:
+            tags.append(SafetyTag.LONGER_ROUTE)
+        
+        return tags
+    
+    def _generate_explanation(
+        self,
+        callboxes: List[CallboxLocation],
+        weather_data: dict,
+        alerts: List[UWAlert],
+        time_of_day: datetime,
+        factors: SafetyFactors
+    ) -> str:
+        """Generate a human-readable explanation of the safety score."""
+        parts = []
+        
+        # Callbox explanation
+        if callboxes:
+            count = len(callboxes)
+            closest = min(callboxes, key=lambda x: x.distance_meters)
+            parts.append(f"Route passes near {count} emergency callbox{'es' if count > 1 else ''} (closest: {int(closest.distance_meters)}m away)")
+        else:
+            parts.append("No emergency callboxes nearby")
+        
+        # Weather explanation
+        visibility = weather_data.get("visibility_meters", 10000)
+        condition = weather_data.get("weather_description", "clear")
+        if visibility >= self.VISIBILITY_GOOD:
+            parts.append(f"good visibility ({condition})")
+        else:
+            parts.append(f"reduced visibility ({condition}, {int(visibility/1000)}km)")
+        
+        # Alerts explanation
+        if alerts:
+            parts.append(f"{len(alerts)} active alert{'s' if len(alerts) > 1 else ''} along the route")
+        else:
+            parts.append("no active alerts")
+        
+        # Time explanation
+        hour = time_of_day.hour
+        if 6 <= hour < 20:
+            parts.append("daylight hours")
+        else:
+            parts.append("nighttime")
+        
+        return ", ".join(parts).capitalize() + "."
@@ -0,0 +1,14 @@
+"""
+Shared pytest setup: make the backend importable and keep module-level
+singletons off the network and the disk.
+"""
+import os
+import sys
+
+os.environ.setdefault("UW_ALERTS_ENABLED", "false")
+os.environ.setdefault("SESSION_LOG_DIR", "")
+os.environ.setdefault("CALLBOX_FIELD_PATH", "")
+os.environ.setdefault("TILE_CACHE_DIR", "")
+os.environ.setdefault("WEATHER_API_KEY", "")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
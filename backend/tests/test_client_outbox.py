@@ -0,0 +1,85 @@
+"""Tests for per-client outbound queues: what may be dropped when a queue is full."""
+from app.services.client_outbox import ClientOutboxes
+from app.services.room_events import COALESCED_EVENTS, PRIORITY_EVENTS
+
+
+class FakeServer:
+    """Just enough of a python-socketio server: one room, one client, no transport."""
+
+    def __init__(self, participants):
+        self.participants = participants
+        self.emitted = []
+        self.manager = self
+        self.eio = type("Eio", (), {"sockets": {}})()
+
+    def get_participants(self, namespace, room):
+        return [(sid, sid) for sid in self.participants.get(room, [])]
+
+    def is_connected(self, sid, namespace):
+        return True
+
+    def emit(self, event, payload, to=None, namespace=None):
+        self.emitted.append((event, payload))
+
+
+def make(capacity=4):
+    return ClientOutboxes(
+        PRIORITY_EVENTS, COALESCED_EVENTS, capacity=capacity,
+        resync_events={"console_frame": "console_resync"},
+    )
+
+
+def test_full_queue_drops_only_location_updates():
+    server = FakeServer({"s1": ["c"], "s2": ["c"]})
+    outboxes = make(capacity=4)
+    outboxes.fanout(server, "s1", "location_update", {"n": 1})
+    outboxes.fanout(server, "s1", "trail_note", {"n": 2})
+    outboxes.fanout(server, "s2", "location_update", {"n": 3})
+    outboxes.fanout(server, "s2", "trail_note", {"n": 4})
+    # Full: the oldest location update makes room, then the next one
+    outboxes.fanout(server, "s1", "trail_note", {"n": 5})
+    outboxes.fanout(server, "s2", "trail_note", {"n": 6})
+    # No location update left: kept beyond the capacity
+    outboxes.fanout(server, "s1", "trail_note", {"n": 7})
+
+    outboxes.flush(server)
+
+    assert [p["n"] for _, p in server.emitted] == [2, 4, 5, 6, 7]
+    assert outboxes.metrics()["dropped"] == 2
+    assert outboxes.metrics()["overCapacity"] == 1
+
+
+def test_geofence_transitions_are_never_dropped():
+    server = FakeServer({"s1": ["c"]})
+    outboxes = make(capacity=2)
+    for n, event in enumerate(["off_route", "zone_entered", "zone_exited"] * 3):
+        outboxes.fanout(server, "s1", event, {"n": n})
+        outboxes.fanout(server, "s1", "location_update", {"n": 100 + n})
+
+    outboxes.flush(server)
+
+    transitions = [p["n"] for e, p in server.emitted if e != "location_update"]
+    assert transitions == list(range(9))
+    assert [p["n"] for e, p in server.emitted if e == "location_update"] == [108]
+
+
+def test_overflowing_console_frames_force_a_resync():
+    server = FakeServer({"console:all": ["c"], "s1": ["c"]})
+    outboxes = make(capacity=3)
+    outboxes.fanout(server, "s1", "off_route", {"n": 0})
+    outboxes.fanout(server, "s1", "location_update", {"n": 1})
+    for frame in range(1, 5):
+        outboxes.fanout(server, "console:all", "console_frame", {"frame": frame})
+    outboxes.fanout(server, "s1", "location_update", {"n": 2})
+
+    outboxes.flush(server)
+
+    # Frame 3 displaced the location update; frame 4 cut the stream
+    assert server.emitted == [
+        ("off_route", {"n": 0}),
+        ("console_resync", {"room": "console:all"}),
+        ("location_update", {"n": 2}),
+    ]
+    metrics = outboxes.metrics()
+    assert metrics["resyncs"] == 1
+    assert metrics["dropped"] == 5
@@ -0,0 +1,57 @@
+"""Tests for console subscriptions and how console frames are emitted."""
+import pytest
+from app.services.console_feed import ConsoleAggregator
+from app.services.room_events import RoomEventDispatcher
+from app.services.session_feed import SessionFeed
+
+AREA_A = (47.65, -122.32, 47.66, -122.30)
+AREA_B = (47.66, -122.32, 47.67, -122.30)
+
+
+def test_new_areas_are_refused_past_the_cap():
+    console = ConsoleAggregator(max_areas=1)
+    room, _ = console.subscribe("sid1", AREA_A)
+
+    with pytest.raises(ValueError):
+        console.subscribe("sid2", AREA_B)
+    assert console.subscribe("sid2", AREA_A)[0] == room  # Existing areas are shared
+    assert console.metrics()["areas"] == 1
+
+
+def test_sole_subscriber_may_move_to_a_new_area():
+    console = ConsoleAggregator(max_areas=1)
+    console.subscribe("sid1", AREA_A)
+    room, _ = console.subscribe("sid1", AREA_B)
+
+    assert console.subscription("sid1") == room
+    assert console.metrics()["areas"] == 1
+
+
+def test_refused_console_keeps_its_subscription():
+    console = ConsoleAggregator(max_areas=1)
+    room, _ = console.subscribe("sid1", AREA_A)
+    console.subscribe("sid2", AREA_A)
+
+    with pytest.raises(ValueError):
+        console.subscribe("sid1", AREA_B)
+    assert console.subscription("sid1") == room
+
+
+def test_console_frames_skip_the_session_feed():
+    class FakeSocketIO:
+        def __init__(self):
+            self.emitted = []
+
+        def emit(self, event, payload, room=None):
+            self.emitted.append((room, event, payload))
+
+    feed = SessionFeed()
+    dispatcher = RoomEventDispatcher(feed=feed)
+    dispatcher.socketio = FakeSocketIO()
+
+    dispatcher.publish("console:all", "console_frame", {"frame": 1})
+    dispatcher.publish("s1", "location_update", {"lat": 47.65})
+
+    assert dispatcher.socketio.emitted[0] == ("console:all", "console_frame", {"frame": 1})
+    assert feed.latest("console:all") == 0
+    assert feed.latest("s1") == 1
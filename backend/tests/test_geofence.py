@@ -0,0 +1,57 @@
+"""Alert zone enter/exit detection against the shared zone index."""
+from types import SimpleNamespace
+from app.models.safety import UWAlert
+from app.services.alert_zones import AlertZoneIndex
+from app.services.geofence import GeofenceEngine
+from app.utils.distance import METERS_PER_DEGREE
+
+SQUARE = [[47.6550, -122.3050], [47.6550, -122.3030], [47.6540, -122.3030], [47.6540, -122.3050]]
+
+
+def make_engine(*alerts):
+    zones = AlertZoneIndex()
+    zones.update(alerts)
+    return GeofenceEngine(zones), zones
+
+
+def walker():
+    return SimpleNamespace(geofence=None, route_progress=None)
+
+
+def names(events):
+    return [name for name, _ in events]
+
+
+def test_polygon_zone_enter_and_exit():
+    engine, _ = make_engine(UWAlert("p", "Police activity", "", {"polygon": SQUARE}, "high"))
+    session = walker()
+
+    assert engine.evaluate(session, 47.6560, -122.3040) == []
+    events = engine.evaluate(session, 47.6545, -122.3040)
+    assert names(events) == ["zone_entered"]
+    assert events[0][1]["zone"]["polygon"][0] == SQUARE[0]
+    # Just outside the edge, within the exit margin: still inside
+    assert engine.evaluate(session, 47.65505, -122.3040) == []
+    assert names(engine.evaluate(session, 47.6560, -122.3040)) == ["zone_exited"]
+
+
+def test_circle_zone_exit_hysteresis():
+    engine, _ = make_engine(UWAlert("c", "Fire", "", {"lat": 47.6545, "lng": -122.3040, "radius_meters": 50}))
+    session = walker()
+
+    assert names(engine.evaluate(session, 47.6545, -122.3040)) == ["zone_entered"]
+    # 60 m from the center: outside the radius, inside the 20 m exit margin
+    assert engine.evaluate(session, 47.6545 + 60 / METERS_PER_DEGREE, -122.3040) == []
+    assert names(engine.evaluate(session, 47.6545 + 80 / METERS_PER_DEGREE, -122.3040)) == ["zone_exited"]
+
+
+def test_removed_zone_is_forgotten_without_event():
+    alert = UWAlert("c", "Fire", "", {"lat": 47.6545, "lng": -122.3040, "radius_meters": 50})
+    engine, zones = make_engine(alert)
+    session = walker()
+    engine.evaluate(session, 47.6545, -122.3040)
+
+    zones.update([])
+
+    assert engine.evaluate(session, 47.6545, -122.3040) == []
+    assert session.geofence.inside_zones == set()
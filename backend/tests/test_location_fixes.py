@@ -0,0 +1,43 @@
+"""Tests for location fix parsing: malformed fixes are rejected before any mutation."""
+import pytest
+from app.routes.sessions import parse_location_fix
+
+NOW = 1_000_000.0
+
+
+@pytest.mark.parametrize("raw", [
+    {"lat": "nan", "lng": -122.3},
+    {"lat": 47.65, "lng": "inf"},
+    {"lat": float("-inf"), "lng": -122.3},
+    {"lat": 91, "lng": -122.3},
+    {"lat": 47.65, "lng": -180.5},
+    {"lat": 47.65, "lng": -122.3, "seq": "nan"},
+    {"lat": 47.65, "lng": -122.3, "seq": 1e400},
+    {"lat": 47.65, "lng": -122.3, "timestamp": "nan"},
+    {"lat": "north", "lng": -122.3},
+])
+def test_malformed_fixes_are_rejected(raw):
+    with pytest.raises(ValueError):
+        parse_location_fix(raw, NOW)
+
+
+def test_valid_fix_is_parsed():
+    assert parse_location_fix({"lat": "47.65", "lng": -122.3, "seq": 3, "timestamp": NOW + 60}, NOW) == (
+        3, 47.65, -122.3, NOW
+    )
+
+
+def test_rest_endpoint_rejects_nan_without_touching_the_session():
+    from app import create_app
+    from app.routes import sessions as walks
+
+    client = create_app().test_client()
+    session_id = client.post("/api/sessions", json={"userName": "Ana"}).get_json()["sessionId"]
+    session = walks.sessions.get(session_id)
+    try:
+        response = client.post(f"/api/sessions/{session_id}/location", json={"lat": "nan", "lng": -122.3})
+        assert response.status_code == 400
+        assert len(session.trail) == 0
+        assert session.last_lat is None
+    finally:
+        walks.sessions.remove(session_id)
@@ -0,0 +1,181 @@
+"""Tests for NotificationDispatcher deduplication and partial-batch retries."""
+import smtplib
+import pytest
+from app.models.notification import Notification
+from app.services.notification_service import (
+    DeliveryError, NotificationDispatcher, RejectedRecipient, SmtpAdapter, WebhookAdapter, check_webhook_url
+)
+
+
+class RecordingAdapter:
+    """Records batches; fails the first `fail_after` sends of the first call."""
+
+    def __init__(self, fail_after=None):
+        self.sent = []
+        self.fail_after = fail_after
+
+    def send_batch(self, recipient, notifications):
+        sent = []
+        for notification in notifications:
+            if self.fail_after is not None and len(sent) == self.fail_after:
+                self.fail_after = None
+                raise DeliveryError(sent, RuntimeError("connection reset"))
+            sent.append(notification)
+            self.sent.append(notification)
+
+
+def make(event, occurrence, session_id="s1"):
+    return Notification(session_id, event, "sms", "+15550100", f"{event} message", occurrence=occurrence)
+
+
+@pytest.fixture
+def dispatcher():
+    return NotificationDispatcher({"default": RecordingAdapter()}, workers=0, backoff_seconds=0)
+
+
+def test_repeat_of_same_occurrence_is_suppressed(dispatcher):
+    assert dispatcher.submit(make("arrival", 100.0))
+    assert not dispatcher.submit(make("arrival", 100.0))
+    assert dispatcher.metrics()["deduplicated"] == 1
+
+
+def test_new_occurrence_is_sent(dispatcher):
+    assert dispatcher.submit(make("inactivity", 100.0))
+    assert dispatcher.submit(make("inactivity", 250.0))
+
+
+def test_panic_resolve_panic_sends_both_panics(dispatcher):
+    assert dispatcher.submit(make("panic", 100.0))
+    assert dispatcher.submit(make("panic", 100.0))
+    assert dispatcher.metrics()["submitted"] == 2
+    assert dispatcher.metrics()["deduplicated"] == 0
+
+
+def test_partial_failure_retries_only_undelivered(monkeypatch):
+    adapter = RecordingAdapter(fail_after=2)
+    dispatcher = NotificationDispatcher({"default": adapter}, workers=0)
+    retried = []
+    monkeypatch.setattr(dispatcher, "_retry", retried.append)
+    batch = [make("arrival", float(i), session_id=f"s{i}") for i in range(4)]
+
+    dispatcher._deliver("sms", "+15550100", batch)
+
+    assert adapter.sent == batch[:2]
+    assert retried == batch[2:]
+    assert dispatcher.metrics()["delivered"] == 2
+
+
+def test_total_failure_retries_whole_batch(monkeypatch):
+    dispatcher = NotificationDispatcher({}, workers=0)
+    retried = []
+    monkeypatch.setattr(dispatcher, "_retry", retried.append)
+    batch = [make("arrival", 1.0), make("panic", 2.0)]
+
+    dispatcher._deliver("sms", "+15550100", batch)
+
+    assert retried == batch
+    assert dispatcher.metrics()["delivered"] == 0
+
+
+def test_smtp_adapter_reports_messages_sent_before_failure(monkeypatch):
+    class FakeSmtp:
+        sent = 0
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def send_message(self, message):
+            if FakeSmtp.sent == 1:
+                raise smtplib.SMTPServerDisconnected("gone")
+            FakeSmtp.sent += 1
+
+    monkeypatch.setattr(smtplib, "SMTP", FakeSmtp)
+    batch = [make("arrival", 1.0), make("inactivity", 2.0)]
+    with pytest.raises(DeliveryError) as error:
+        SmtpAdapter("localhost", 25, "safewalk@localhost").send_batch("a@b.c", batch)
+    assert error.value.delivered == batch[:1]
+
+
+def test_full_queue_still_accepts_panics():
+    dispatcher = NotificationDispatcher({"default": RecordingAdapter()}, workers=0, queue_size=2, reserved_slots=1)
+    assert dispatcher.submit(make("arrival", 1.0, session_id="a"))
+    assert dispatcher.submit(make("arrival", 1.0, session_id="b"))
+    assert not dispatcher.submit(make("arrival", 1.0, session_id="c"))
+
+    assert dispatcher.submit(make("panic", 2.0))
+    assert dispatcher.metrics()["urgentDropped"] == 0
+
+
+def test_panic_lost_past_reserved_capacity_is_counted(capsys):
+    dispatcher = NotificationDispatcher({"default": RecordingAdapter()}, workers=0, queue_size=1, reserved_slots=1)
+    assert dispatcher.submit(make("panic", 1.0))
+    assert dispatcher.submit(make("panic", 2.0))
+    assert not dispatcher.submit(make("panic", 3.0))
+
+    metrics = dispatcher.metrics()
+    assert metrics["urgentDropped"] == 1
+    assert metrics["dropped"] == 1
+    assert "CRITICAL" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("url", [
+    "http://example.com/hook",
+    "ftp://example.com/hook",
+    "https:///hook",
+    "https://127.0.0.1/hook",
+    "https://10.0.0.5/hook",
+    "https://169.254.169.254/latest/meta-data",
+    "https://[::1]/hook",
+    "https://[::ffff:192.168.1.1]/hook",
+])
+def test_unsafe_webhook_urls_are_rejected(url):
+    with pytest.raises(RejectedRecipient):
+        check_webhook_url(url, resolve=False)
+
+
+def test_webhook_host_names_are_checked_after_resolution(monkeypatch):
+    monkeypatch.setattr(
+        "socket.getaddrinfo", lambda *args, **kwargs: [(None, None, None, "", ("192.168.0.10", 443))]
+    )
+    check_webhook_url("https://hooks.example.com/x", resolve=False)
+    with pytest.raises(RejectedRecipient):
+        check_webhook_url("https://hooks.example.com/x")
+
+
+def test_webhook_allow_list():
+    check_webhook_url("https://93.184.216.34/x", resolve=False)
+    check_webhook_url("https://Hooks.Example.com/x", ["hooks.example.com"], resolve=False)
+    with pytest.raises(RejectedRecipient):
+        check_webhook_url("https://other.example.com/x", ["hooks.example.com"], resolve=False)
+
+
+def test_rejected_webhook_is_not_posted_or_retried(monkeypatch):
+    posted = []
+    monkeypatch.setattr("requests.post", lambda *args, **kwargs: posted.append(args))
+    dispatcher = NotificationDispatcher({"webhook": WebhookAdapter()}, workers=0)
+    retried = []
+    monkeypatch.setattr(dispatcher, "_retry", retried.append)
+    notification = Notification("s1", "panic", "webhook", "https://127.0.0.1:8080/admin", "panic message")
+
+    dispatcher._deliver("webhook", notification.recipient, [notification])
+
+    assert posted == []
+    assert retried == []
+    assert dispatcher.metrics()["failed"] == 1
+
+
+def test_session_with_private_webhook_is_refused():
+    from app import create_app
+
+    client = create_app().test_client()
+    response = client.post("/api/sessions", json={
+        "userName": "Ana",
+        "autoNotify": {"enabled": True, "contactChannel": "webhook", "contactValue": "http://10.0.0.1/hook"},
+    })
+    assert response.status_code == 400
@@ -0,0 +1,37 @@
+"""Tests for the recommended location reporting interval."""
+import pytest
+from app.models.session import SessionStatus, WalkSession
+from app.services.geofence import GeofenceState
+from app.services.report_interval import recommend_report_interval
+
+
+def session_in(status=SessionStatus.ACTIVE, off_route=False):
+    session = WalkSession(user_name="Ana")
+    session.status = status
+    if off_route:
+        session.geofence = GeofenceState()
+        session.geofence.off_route = True
+    return session
+
+
+@pytest.mark.parametrize("min_seconds, expected", [(0.5, 1), (0.0, 1), (1.0, 1), (1.5, 2), (4.0, 4)])
+def test_panic_interval_rounds_minimum_up(min_seconds, expected):
+    session = session_in(SessionStatus.PANIC)
+    assert recommend_report_interval(session, min_seconds=min_seconds) == expected
+
+
+def test_interval_never_below_fractional_minimum():
+    session = session_in(off_route=True)
+    assert recommend_report_interval(session, min_seconds=2.5) == 3
+
+
+def test_routine_interval_respects_bounds():
+    session = session_in()
+    # Default pace: 25 m at 1.4 m/s is about 18 s, doubled under full load
+    assert recommend_report_interval(session) == 18
+    assert recommend_report_interval(session, load=1.0) == 30
+    assert recommend_report_interval(session, min_seconds=0.2, meters_per_report=0.1) == 1
+
+
+def test_no_reports_after_walk_ends():
+    assert recommend_report_interval(session_in(SessionStatus.ARRIVED)) is None
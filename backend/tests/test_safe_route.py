@@ -0,0 +1,35 @@
+"""Tests for the /safe-route handler."""
+import polyline
+from app.routes import safe_route
+from app.services import scoring_engine
+
+POINTS = [(47.6553, -122.3035), (47.6545, -122.3040), (47.6530, -122.3045)]
+
+
+def google_route(distance):
+    return {
+        "overview_polyline": {"points": polyline.encode(POINTS)},
+        "legs": [{"distance": {"value": distance}, "duration": {"value": distance}}],
+    }
+
+
+def test_route_that_fails_to_score_is_skipped(monkeypatch):
+    from app import create_app
+
+    def score_routes(candidates, context):
+        if any(candidate.distance_meters == 666 for candidate in candidates):
+            raise ValueError("bad geometry")
+        return scoring_engine.score_routes(candidates, context, use_cache=False)
+
+    monkeypatch.setattr(safe_route, "get_candidate_routes", lambda start, end: [google_route(666), google_route(900)])
+    monkeypatch.setattr(safe_route, "get_weather_visibility", lambda lat, lng: {
+        "visibility": 10000, "condition": "Clear", "cacheAgeSeconds": None
+    })
+    monkeypatch.setattr(safe_route, "score_routes", score_routes)
+
+    response = create_app().test_client().post("/safe-route", json={
+        "start": {"lat": 47.6553, "lng": -122.3035}, "end": {"lat": 47.6530, "lng": -122.3045},
+    })
+
+    assert response.status_code == 200
+    assert [route["distanceMeters"] for route in response.get_json()["allRoutes"]] == [900]
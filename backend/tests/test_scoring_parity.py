@@ -0,0 +1,123 @@
+"""
+Parity of the scoring engine wrappers with the scorers they replaced.
+
+The route score wrappers and SafetyScorer are compared with the frozen
+baseline copies in baseline_scorers.py. Both scorers get an empty alert
+index and no callbox field, so the results do not depend on the shared
+singletons' runtime state.
+"""
+import base64
+from datetime import datetime
+import polyline
+import pytest
+from app.models.route import Route, Waypoint
+from app.models.safety import CallboxLocation, UWAlert
+from app.services.alert_zones import AlertZoneIndex
+from app.services.safety_score import compute_safety_score, score_route
+from app.services.safety_scorer import SafetyScorer
+from app.services.scoring_engine import RouteCandidate, ScoringContext, score_cache, score_routes
+from baseline_scorers import BaselineSafetyScorer, baseline_compute_safety_score, baseline_score_route
+
+POINTS = [(47.6553, -122.3035), (47.6545, -122.3040), (47.6530, -122.3045)]
+ENCODED = polyline.encode(POINTS)
+
+CALLBOXES = [
+    CallboxLocation(47.6550, -122.3037, 25.0, "c1"),
+    CallboxLocation(47.6540, -122.3050, 120.0, "c2"),
+    CallboxLocation(47.6600, -122.3100, 450.0, "c3"),
+]
+ALERTS = [
+    UWAlert("w1", "Campus advisory", "", None, "low"),
+    UWAlert("w2", "Power outage", "", None, "high"),
+    UWAlert("w3", "Ended", "", None, "critical", active=False),
+    UWAlert("a1", "Fire", "", {"lat": 47.6545, "lng": -122.3041, "radius_meters": 50}, "high"),
+    UWAlert("a2", "Far", "", {"lat": 47.70, "lng": -122.2}, "critical"),
+]
+WEATHER = [
+    {"visibility_meters": 10000, "weather_condition": "Clear", "weather_description": "clear sky"},
+    {"visibility_meters": 12000, "weather_condition": "Rain", "weather_description": "light rain"},
+    {"visibility_meters": 6000, "weather_condition": "Haze", "weather_description": "haze"},
+    {"visibility_meters": 4000, "weather_condition": "Clouds", "weather_description": "overcast"},
+    {"visibility_meters": 4949, "weather_condition": "Mist", "weather_description": "mist"},
+    {"visibility_meters": 3050, "weather_condition": "Clouds", "weather_description": "broken clouds"},
+    {"visibility_meters": 500, "weather_condition": "Fog", "weather_description": "fog"},
+]
+
+
+@pytest.fixture(autouse=True)
+def clear_score_cache():
+    score_cache.clear()
+    yield
+    score_cache.clear()
+
+
+def google_route(distance, duration):
+    return {
+        "overview_polyline": {"points": ENCODED},
+        "legs": [{"distance": {"value": distance}, "duration": {"value": duration}}],
+    }
+
+
+@pytest.mark.parametrize("distance", [0, 300, 450, 999, 1000, 1500, 2000, 2001, 2600])
+@pytest.mark.parametrize("visibility", [0, 1500, 2000, 2550, 3000, 3999, 4000, 6000, 7777, 8000, 10000, 12000])
+def test_compute_safety_score_matches_baseline(distance, visibility):
+    route = google_route(distance, distance * 0.73)
+    expected = baseline_compute_safety_score(route, visibility)
+    assert compute_safety_score(route, visibility) == expected
+    assert compute_safety_score(route, visibility) == expected  # Served from the score cache
+
+
+@pytest.mark.parametrize("weather", [{}, {"visibility": 3000}, {"visibility": 3049}, {"visibility": 10000}])
+def test_score_route_matches_baseline(weather):
+    route = google_route(1200, 900)
+    assert score_route(route, weather) == baseline_score_route(route, weather)
+
+
+def test_undecodable_polyline_matches_baseline():
+    route = {"overview_polyline": {"points": "???"}, "legs": []}
+    assert compute_safety_score(route, 8000) == baseline_compute_safety_score(route, 8000)
+
+
+def assert_same_score(actual, expected):
+    assert actual.score == expected.score
+    assert actual.tags == expected.tags
+    assert actual.explanation == expected.explanation
+    assert vars(actual.factors) == pytest.approx(vars(expected.factors))
+
+
+@pytest.mark.parametrize("callboxes", [[], CALLBOXES[:1], CALLBOXES[1:2], CALLBOXES[2:], CALLBOXES])
+@pytest.mark.parametrize("weather", WEATHER)
+@pytest.mark.parametrize("alerts", [[], ALERTS[:1], ALERTS[:3], ALERTS[3:], ALERTS])
+@pytest.mark.parametrize("hour", [3, 5, 12, 20, 22])
+@pytest.mark.parametrize("distance", [300, 500, 1500])
+def test_safety_scorer_matches_baseline(callboxes, weather, alerts, hour, distance):
+    route = Route("r", distance, distance / 1.4, ENCODED, [Waypoint(lat, lng) for lat, lng in POINTS])
+    when = datetime(2026, 1, 1, hour)
+    scorer = SafetyScorer(zones=AlertZoneIndex())
+    expected = BaselineSafetyScorer(AlertZoneIndex()).calculate_safety_score(route, callboxes, weather, alerts, when)
+    assert_same_score(scorer.calculate_safety_score(route, callboxes, weather, alerts, when), expected)
+
+
+
+@pytest.mark.parametrize("filled, requested", [(3000, 3049), (3999, 4049), (4049, 3999)])
+def test_cache_hit_describes_the_callers_visibility(filled, requested):
+    route = google_route(1200, 900)
+    compute_safety_score(route, filled)
+    hits = score_cache.metrics()["hits"]
+    result = compute_safety_score(route, requested)
+    expected = baseline_compute_safety_score(route, requested)
+
+    assert score_cache.metrics()["hits"] == hits + 1
+    assert result["tags"] == expected["tags"]
+    assert f"({requested}m)" in " ".join(result["explanation"])
+    assert f"({filled}m)" not in " ".join(result["explanation"])
+
+
+@pytest.mark.parametrize("visibility, weather, low", [
+    (3999, "Clear", True), (4000, "Clear", False), (9000, "Clear", False), (10000, "Fog", False), (500, "Fog", True),
+])
+def test_risk_profile_visibility_bit_uses_meters(visibility, weather, low):
+    context = ScoringContext(visibility_meters=visibility, weather_condition=weather, alerts=[])
+    profile = score_routes([RouteCandidate(POINTS, ENCODED, 300, 200)], context, use_cache=False)[0].risk_profile
+    flags = base64.b64decode(profile["data"])[1::2]
+    assert all(bool(flag & 128) == low for flag in flags)
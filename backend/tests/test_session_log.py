@@ -0,0 +1,124 @@
+"""Tests for session log sequencing, snapshots and replay."""
+import pytest
+from app.models.session import SessionStatus
+from app.services.session_log import SessionEventLog
+
+
+def reopen(directory):
+    log = SessionEventLog(str(directory))
+    states, records = log.recover()
+    return log, states, list(records)
+
+
+def test_records_are_numbered_and_replayed_in_order(tmp_path):
+    log, _, _ = reopen(tmp_path)
+    assert log.append({"op": "create", "s": {"id": "a"}}) == 1
+    assert log.append({"op": "loc", "id": "a"}) == 2
+    log.flush()
+
+    _, states, records = reopen(tmp_path)
+
+    assert states == []
+    assert [(r["op"], r["seq"]) for r in records] == [("create", 1), ("loc", 2)]
+
+
+def test_records_covered_by_snapshot_are_skipped(tmp_path):
+    log, _, _ = reopen(tmp_path)
+    log.append({"op": "create", "s": {"id": "a"}})
+    # Buffered when the snapshot is taken: written to the old segment, covered
+    log.append({"op": "loc", "id": "a"})
+    log.snapshot(lambda: [{"id": "a"}])
+    log.append({"op": "loc", "id": "a"})
+    log.flush()
+
+    log, states, records = reopen(tmp_path)
+
+    assert states == [{"id": "a"}]
+    assert [r["seq"] for r in records] == [3]
+    # Numbering continues after the replayed records
+    assert log.append({"op": "evict", "id": "a"}) == 4
+
+
+def test_records_in_new_segment_at_or_below_snapshot_seq_are_skipped(tmp_path):
+    log, _, _ = reopen(tmp_path)
+    log.append({"op": "create", "s": {"id": "a"}})
+    log.append({"op": "loc", "id": "a"})
+    log.snapshot(lambda: [{"id": "a"}])
+    # Records reflected in the snapshot that landed after the rotation
+    segment = tmp_path / f"segment-{log._segment:06d}.log"
+    segment.write_text('{"op":"loc","id":"a","seq":1}\n{"op":"loc","id":"a","seq":2}\n')
+    log.append({"op": "loc", "id": "a"})
+    log.flush()
+
+    _, _, records = reopen(tmp_path)
+
+    assert [r["seq"] for r in records] == [3]
+
+
+def test_records_without_seq_are_replayed(tmp_path):
+    (tmp_path / "segment-000001.log").write_text('{"op":"create","s":{"id":"a"}}\n{"op":"loc"\n')
+
+    _, _, records = reopen(tmp_path)
+
+    assert records == [{"op": "create", "s": {"id": "a"}}]
+
+
+@pytest.fixture
+def walks(tmp_path, monkeypatch):
+    from app.routes import sessions as walks
+
+    def install_log():
+        log = SessionEventLog(str(tmp_path))
+        monkeypatch.setattr(log, "start", lambda states: None)
+        monkeypatch.setattr(walks, "session_log", log)
+        return log
+
+    def clear():
+        for session in walks.sessions.values():
+            walks.cancel_inactivity_check(session.id)
+            walks.sessions.remove(session.id)
+            walks.proximity.remove_walker(session.id)
+            walks.alert_join.routes.remove(session.id)
+
+    walks.install_log = install_log
+    walks.clear = clear
+    install_log().recover()
+    yield walks
+    clear()
+
+
+def test_recovery_does_not_duplicate_trail_points(walks):
+    session = walks.create_session({
+        "userName": "Ana",
+        "startLocation": {"lat": 47.655, "lng": -122.303},
+        "endLocation": {"lat": 47.660, "lng": -122.310},
+    })
+    t = session.created_at
+    walks.ingest_location_fixes(session, [(None, 47.6550, -122.3030, t + 1)])
+    walks.ingest_location_fixes(session, [(None, 47.6560, -122.3045, t + 2)])
+    walks.session_log.snapshot(walks.live_session_states)
+    walks.ingest_location_fixes(session, [(None, 47.6575, -122.3070, t + 3)])
+    walks.change_status(session, SessionStatus.ARRIVED, t + 4)
+    walks.session_log.flush()
+    expected = session.trail.to_dict()
+
+    walks.clear()
+    walks.install_log()
+    assert walks.recover_sessions() == 1
+
+    recovered = walks.sessions.get(session.id)
+    assert recovered.trail.to_dict() == expected
+    assert recovered.status == SessionStatus.ARRIVED
+    assert recovered.arrived_at == t + 4
+
+
+def test_abandon_is_logged(walks):
+    session = walks.create_session({"userName": "Ana"})
+    walks.sweep_sessions(now=session.last_activity_at + walks.sessions.abandon_seconds + 1)
+    walks.session_log.flush()
+
+    walks.clear()
+    walks.install_log()
+    walks.recover_sessions()
+
+    assert walks.sessions.get(session.id).status == SessionStatus.ABANDONED
@@ -0,0 +1,129 @@
+"""Tests for SessionStore lifecycle sweeps and the abandon transition."""
+import json
+import pytest
+from app.models.session import SessionStatus, WalkSession
+from app.services.session_store import SessionArchive, SessionStore
+
+T0 = 1_000_000.0
+
+
+def make_session(status=SessionStatus.ACTIVE, at=T0):
+    session = WalkSession(user_name="Ana", created_at=at)
+    if status != SessionStatus.ACTIVE:
+        session.set_status(status, at)
+    return session
+
+
+def test_silent_walk_is_abandoned_through_hook():
+    calls = []
+
+    def abandon(session, now):
+        calls.append((session.id, now))
+        session.set_status(SessionStatus.ABANDONED, now)
+
+    store = SessionStore(ttl_seconds=60, abandon_seconds=120, on_abandon=abandon)
+    silent = store.add(make_session())
+    fresh = store.add(make_session(at=T0 + 100))
+
+    assert store.sweep(now=T0 + 121) == []
+    assert calls == [(silent.id, T0 + 121)]
+    assert silent.status == SessionStatus.ABANDONED
+    assert fresh.status == SessionStatus.ACTIVE
+
+
+def test_abandon_without_hook_sets_status():
+    store = SessionStore(abandon_seconds=120)
+    session = store.add(make_session())
+
+    store.sweep(now=T0 + 121)
+
+    assert session.status == SessionStatus.ABANDONED
+    assert session.status_changed_at == T0 + 121
+
+
+def test_terminal_sessions_evicted_after_ttl_and_archived(tmp_path):
+    path = tmp_path / "archive.jsonl"
+    store = SessionStore(SessionArchive(str(path)), ttl_seconds=60)
+    arrived = store.add(make_session(SessionStatus.ARRIVED))
+    panic = store.add(make_session(SessionStatus.PANIC))
+
+    assert store.sweep(now=T0 + 30) == []
+    assert store.sweep(now=T0 + 61) == [arrived]
+
+    assert arrived.id not in store
+    assert store.get_by_share_token(arrived.share_token) is None
+    assert panic.id in store  # Panics are never evicted automatically
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [arrived.id]
+
+
+def test_failed_archive_keeps_sessions(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    store = SessionStore(SessionArchive(str(blocker / "archive.jsonl")), ttl_seconds=60)
+    session = store.add(make_session(SessionStatus.ARRIVED))
+
+    assert store.sweep(now=T0 + 61) == []
+    assert session.id in store
+
+
+@pytest.fixture
+def walks(monkeypatch):
+    from app.routes import sessions as walks
+
+    class Notifier:
+        def __init__(self):
+            self.submitted = []
+
+        def start(self):
+            pass
+
+        def submit(self, notification):
+            self.submitted.append(notification)
+            return True
+
+    monkeypatch.setattr(walks, "notifier", Notifier())
+    yield walks
+    for session in walks.sessions.values():
+        walks.sessions.remove(session.id)
+        walks.proximity.remove_walker(session.id)
+        walks.alert_join.routes.remove(session.id)
+
+
+def test_sweep_abandon_takes_the_status_change_path(walks):
+    session = walks.create_session({
+        "userName": "Ana",
+        "startLocation": {"lat": 47.655, "lng": -122.303},
+        "endLocation": {"lat": 47.660, "lng": -122.310},
+        "autoNotify": {"enabled": True, "contactValue": "+15550100"},
+    })
+    walks.apply_location_fixes(session, [(None, 47.655, -122.303, session.created_at)])
+    assert session.id in walks.proximity.walkers
+    assert len(walks.alert_join.routes) == 1
+
+    walks.sweep_sessions(now=session.last_activity_at + walks.sessions.abandon_seconds + 1)
+
+    assert session.status == SessionStatus.ABANDONED
+    assert session.id not in walks.proximity.walkers
+    assert len(walks.alert_join.routes) == 0
+    assert [n.event for n in walks.notifier.submitted] == ["abandoned"]
+    assert walks.notifier.submitted[0].occurrence == session.status_changed_at
+
+
+def test_repeated_arrive_sends_one_notification(walks):
+    from app import create_app
+
+    client = create_app().test_client()
+    session = walks.create_session({
+        "userName": "Ana",
+        "autoNotify": {"enabled": True, "contactValue": "+15550100"},
+    })
+
+    assert client.post(f"/api/sessions/{session.id}/arrive").status_code == 200
+    arrived_at = session.arrived_at
+    changed_at = session.status_changed_at
+    assert client.post(f"/api/sessions/{session.id}/arrive").status_code == 200
+
+    assert session.arrived_at == arrived_at
+    assert session.status_changed_at == changed_at
+    assert [n.event for n in walks.notifier.submitted] == ["arrival"]
@@ -0,0 +1,59 @@
+"""Tests for PointIndex k-nearest and radius queries against a brute-force scan."""
+import random
+import pytest
+from app.utils.spatial_grid import PointIndex
+
+CENTER = (47.6553, -122.3035)
+
+
+@pytest.fixture
+def scattered():
+    rng = random.Random(7)
+    index = PointIndex(cell_meters=50.0)
+    for i in range(400):
+        index.move(f"p{i}", CENTER[0] + rng.uniform(-0.01, 0.01), CENTER[1] + rng.uniform(-0.015, 0.015))
+    return index
+
+
+def brute_force(index, lat, lng, k, max_meters=None):
+    found = sorted(
+        (index.distance_meters(lat, lng, *index.get(key)), key)
+        for key in [f"p{i}" for i in range(400)] if key in index
+    )
+    if max_meters is not None:
+        found = [item for item in found if item[0] <= max_meters]
+    return found[:k]
+
+
+@pytest.mark.parametrize("k", [1, 3, 10, 50])
+@pytest.mark.parametrize("query", [CENTER, (47.6620, -122.2900), (47.6400, -122.3300)])
+def test_nearest_matches_brute_force(scattered, k, query):
+    assert scattered.nearest(*query, k=k) == brute_force(scattered, *query, k)
+
+
+@pytest.mark.parametrize("max_meters", [10.0, 60.0, 250.0])
+def test_nearest_respects_max_distance(scattered, max_meters):
+    result = scattered.nearest(*CENTER, k=20, max_meters=max_meters)
+    assert result == brute_force(scattered, *CENTER, 20, max_meters)
+
+
+def test_nearest_follows_moves_and_removals(scattered):
+    closest = scattered.nearest(*CENTER, k=1)[0][1]
+    scattered.remove(closest)
+    scattered.move("p1", *CENTER)
+
+    assert scattered.nearest(*CENTER, k=1) == [(0.0, "p1")]
+    assert closest not in [key for _, key in scattered.nearest(*CENTER, k=400)]
+    assert len(scattered.nearest(*CENTER, k=1000)) == 399
+
+
+def test_nearest_on_empty_index_or_zero_k():
+    index = PointIndex()
+    assert index.nearest(*CENTER, k=5) == []
+    index.move("a", *CENTER)
+    assert index.nearest(*CENTER, k=0) == []
+
+
+def test_within_matches_brute_force(scattered):
+    expected = brute_force(scattered, *CENTER, 400, 120.0)
+    assert scattered.within(*CENTER, 120.0) == expected
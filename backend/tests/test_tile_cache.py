@@ -0,0 +1,90 @@
+"""Tests for the two-tier safety tile cache."""
+import os
+from datetime import datetime
+from app.models.safety import UWAlert
+from app.services.alert_zones import AlertZoneIndex
+from app.services.safety_tiles import SafetyTiles, TileCache, tile_bounds
+
+VERSIONS = ("aaaa", "bbbb")
+KEY = ("day", 16, 10490, 22885)
+NEIGHBOR = ("day", 16, 10491, 22885)
+FAR = ("day", 16, 10400, 22800)
+
+
+def test_invalidate_drops_only_overlapping_tiles(tmp_path):
+    cache = TileCache(disk_dir=str(tmp_path))
+    for key in (KEY, FAR):
+        cache.put(key, b"png", versions=VERSIONS)
+    south, west, north, east = tile_bounds(*KEY[1:])
+    inner = (south + 1e-4, west + 1e-4, north - 1e-4, east - 1e-4)
+
+    assert cache.invalidate(inner) == 2  # memory and disk copies of KEY
+    assert cache.get(KEY, VERSIONS) is None
+    assert cache.get(FAR, VERSIONS) == b"png"
+
+
+def test_put_after_invalidation_is_discarded():
+    cache = TileCache()
+    generation = cache.generation
+    cache.invalidate(tile_bounds(*KEY[1:]))
+    cache.put(KEY, b"stale", generation)
+    assert cache.get(KEY) is None
+
+
+def test_disk_tier_survives_restart_for_same_versions(tmp_path):
+    TileCache(disk_dir=str(tmp_path)).put(KEY, b"png", versions=VERSIONS)
+
+    restarted = TileCache(disk_dir=str(tmp_path))
+    assert restarted.get(KEY, VERSIONS) == b"png"
+    assert restarted.metrics()["diskHits"] == 1
+    assert TileCache(disk_dir=str(tmp_path)).get(KEY, ("aaaa", "cccc")) is None
+
+
+def test_never_deletes_foreign_files(tmp_path):
+    (tmp_path / "notes.txt").write_text("keep me")
+    cache = TileCache(disk_dir=str(tmp_path), disk_tiles=1)
+    cache.put(KEY, b"one", versions=VERSIONS)
+    cache.put(NEIGHBOR, b"two", versions=VERSIONS)
+    cache.invalidate((-90, -180, 90, 180))
+    assert (tmp_path / "notes.txt").read_text() == "keep me"
+    assert os.listdir(tmp_path) == ["notes.txt"]
+
+
+def test_disk_lru_evicts_stale_files(tmp_path):
+    cache = TileCache(memory_tiles=0, disk_dir=str(tmp_path), disk_tiles=2)
+    cache.put(KEY, b"old", versions=("aaaa", "0000"))
+    cache.put(KEY, b"new", versions=VERSIONS)
+    cache.put(FAR, b"far", versions=VERSIONS)
+
+    assert len(os.listdir(tmp_path)) == 2
+    assert cache.get(KEY, VERSIONS) == b"new"
+    assert cache.get(KEY, ("aaaa", "0000")) is None
+    assert cache.metrics()["evicted"] == 1
+
+
+NOON = datetime(2026, 1, 1, 12)
+
+
+class FlatField:
+    version = "f1"
+    max_meters = 500.0
+
+    def distance(self, lat, lng):
+        return 100.0
+
+
+def test_alert_elsewhere_keeps_disk_tiles_valid(tmp_path):
+    zones = AlertZoneIndex()
+    south, west, north, east = tile_bounds(*KEY[1:])
+    tiles = SafetyTiles(FlatField(), zones, TileCache(disk_dir=str(tmp_path)), (south, west, north, east))
+    tiles.get_tile(*KEY[1:], NOON)
+
+    zones.update([UWAlert("far", "Fire", "", {"lat": south - 0.01, "lng": west - 0.01, "radius_meters": 50})])
+    tiles.cache = TileCache(disk_dir=str(tmp_path))  # Restart
+    tiles.get_tile(*KEY[1:], NOON)
+    assert tiles.cache.metrics()["diskHits"] == 1
+
+    zones.update([UWAlert("near", "Fire", "", {"lat": (south + north) / 2, "lng": (west + east) / 2})])
+    tiles.cache = TileCache(disk_dir=str(tmp_path))
+    tiles.get_tile(*KEY[1:], NOON)
+    assert tiles.cache.metrics()["diskHits"] == 0
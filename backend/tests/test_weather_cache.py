@@ -0,0 +1,63 @@
+"""Tests for WeatherCache cold-bucket fetches and background refreshes."""
+import threading
+import time
+from app.services.weather_cache import WeatherCache
+
+LAT, LNG = 47.655, -122.303
+
+
+def test_cold_bucket_waiters_use_the_event_factory():
+    started, release = threading.Event(), threading.Event()
+    created = []
+
+    def fetch(lat, lng):
+        started.set()
+        release.wait(5)
+        return {"vis_km": 10}
+
+    def create_event():
+        event = threading.Event()
+        created.append(event)
+        return event
+
+    cache = WeatherCache(fetch)
+    cache.use_event_factory(create_event)
+    results = []
+    first = threading.Thread(target=lambda: results.append(cache.get(LAT, LNG)))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=lambda: results.append(cache.get(LAT, LNG)))
+    second.start()
+    time.sleep(0.05)
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert len(created) == 1
+    assert [conditions for conditions, _ in results] == [{"vis_km": 10}] * 2
+    assert cache.metrics()["fetches"] == 1
+
+
+def test_cold_request_does_not_wait_on_a_background_refresh():
+    release = threading.Event()
+    calls = []
+
+    def fetch(lat, lng):
+        calls.append(threading.current_thread().name)
+        if threading.current_thread().name == "weather-refresh":
+            release.wait(5)
+        return {"vis_km": len(calls)}
+
+    cache = WeatherCache(fetch, ttl_seconds=10, max_stale_seconds=20)
+    key = cache.bucket_of(LAT, LNG)
+    cache.put(key, {"vis_km": 0}, time.time() - 15)
+    assert cache.get(LAT, LNG)[0] == {"vis_km": 0}  # Stale: starts a background refresh
+
+    cache.put(key, {"vis_km": 0}, time.time() - 30)  # Now too old to serve
+    try:
+        conditions, age = cache.get(LAT, LNG)
+    finally:
+        release.set()
+
+    assert conditions == {"vis_km": 2}
+    assert age == 0.0